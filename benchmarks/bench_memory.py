@@ -0,0 +1,180 @@
+"""
+Measure the peak RSS of resolving a large multi-file schema.
+
+Each mode runs in a fresh interpreter, so the peak RSS it reports belongs
+to that mode alone:
+
+- shared: `resolve_references` as it is, sharing unchanged subtrees and one
+  expanded object per reference target.
+- copied: the same result turned into an unshared tree, which is what
+  resolution produced before structural sharing.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_memory.py --documents 40
+"""
+
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import click
+
+from bench_suite import StandInServer
+
+MODES = ("copied", "shared")
+
+
+def multi_file_schema(documents: int, definitions: int, uses: int):
+    """
+    Build a root schema referencing definitions spread over many documents.
+    """
+    files = {}
+    for d in range(documents):
+        files[f"doc_{d}.json"] = {
+            "definitions": {
+                f"def{i}": {
+                    "type": "object",
+                    "description": f"Definition {i} of document {d}.",
+                    "properties": {
+                        "name": {"type": "string", "maxLength": 64},
+                        "size": {"type": "integer", "minimum": 0},
+                        "tags": {"type": "array", "items": {"type": "string"}},
+                        "next": {"$ref": f"#/definitions/def{(i + 1) % 4}"},
+                    },
+                }
+                for i in range(definitions)
+            }
+        }
+    root = {
+        "properties": {
+            f"item{u}": {
+                "$ref": f"./doc_{u % documents}.json"
+                f"#/definitions/def{u % definitions}"
+            }
+            for u in range(uses)
+        }
+    }
+    return root, files
+
+
+def unshare(node):
+    """
+    Copy a tree so that no container object appears in it twice.
+    """
+    if isinstance(node, dict):
+        return {key: unshare(value) for key, value in node.items()}
+    if isinstance(node, list):
+        return [unshare(value) for value in node]
+    return node
+
+
+def count_nodes(tree) -> tuple[int, int]:
+    """
+    Count the containers of a tree, in total and as distinct objects.
+    """
+    total = 0
+    distinct = set()
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            values = node.values()
+        elif isinstance(node, list):
+            values = node
+        else:
+            continue
+        total += 1
+        distinct.add(id(node))
+        stack.extend(values)
+    return total, len(distinct)
+
+
+def run_mode(mode: str, base_url: str, documents, definitions, uses):
+    from validate_devschema.utils import configure_session
+    from validate_devschema.validate_schema import (
+        ResolutionMemo,
+        prefetch_references,
+        resolve_references,
+    )
+
+    configure_session()
+    root, _ = multi_file_schema(documents, definitions, uses)
+    memo = ResolutionMemo()
+    prefetch_references(root, base_url, memo)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    resolved = resolve_references(root, base_url, memo=memo)
+    if mode == "copied":
+        resolved = unshare(resolved)
+    seconds = time.perf_counter() - start
+
+    total, distinct = count_nodes(resolved)
+    return {
+        "mode": mode,
+        "seconds": seconds,
+        "rss_before_kib": before,
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "nodes": total,
+        "distinct_nodes": distinct,
+    }
+
+
+@click.command()
+@click.option("--documents", default=40, show_default=True)
+@click.option("--definitions", default=50, show_default=True)
+@click.option("--uses", default=20000, show_default=True)
+@click.option("--mode", type=click.Choice(MODES), hidden=True)
+@click.option("--base-url", hidden=True)
+def main(documents, definitions, uses, mode, base_url):
+    """
+    Compare the peak RSS of shared and copied resolution.
+    """
+    if mode:
+        result = run_mode(mode, base_url, documents, definitions, uses)
+        click.echo(json.dumps(result))
+        return
+
+    _, files = multi_file_schema(documents, definitions, uses)
+    results = []
+    with StandInServer() as server:
+        server.serve(files)
+        for name in MODES:
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--documents",
+                    str(documents),
+                    "--definitions",
+                    str(definitions),
+                    "--uses",
+                    str(uses),
+                    "--mode",
+                    name,
+                    "--base-url",
+                    server.base_url,
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            results.append(json.loads(output))
+
+    click.echo(
+        f"{'mode':<8} {'ms':>9} {'RSS before':>11} {'peak RSS':>9} "
+        f"{'nodes':>9} {'distinct':>9}"
+    )
+    for r in results:
+        click.echo(
+            f"{r['mode']:<8} {r['seconds'] * 1e3:>9.1f} "
+            f"{r['rss_before_kib'] / 1024:>8.1f} MiB "
+            f"{r['peak_rss_kib'] / 1024:>5.1f} MiB "
+            f"{r['nodes']:>9} {r['distinct_nodes']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
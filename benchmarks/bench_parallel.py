@@ -0,0 +1,105 @@
+"""
+Measure how validation throughput scales with the number of worker
+processes used by `--jobs`.
+
+A set of synthetic devcontainer documents is written to a temporary
+directory and validated against a resolved schema once per job count.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_parallel.py \\
+        --schema path/to/devContainer.schema.json --documents 2000
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+import click
+
+from validate_devschema.batch import validate_files
+from validate_devschema.utils import load_json
+from validate_devschema.validate_schema import CompiledSchema, resolve_schema
+
+SYNTHETIC_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "image": {"type": "string"},
+        "features": {
+            "type": "object",
+            "additionalProperties": {"type": "object"},
+        },
+        "forwardPorts": {
+            "type": "array",
+            "items": {"type": ["integer", "string"], "pattern": "^[0-9]+$"},
+        },
+        "remoteUser": {"type": "string"},
+        "workspaceFolder": {"type": "string", "pattern": "^/"},
+    },
+}
+
+
+def synthetic_document(i: int) -> dict:
+    return {
+        "name": f"service-{i}",
+        "image": "mcr.microsoft.com/devcontainers/python:3",
+        "features": {
+            f"ghcr.io/devcontainers/features/f{j}:1": {} for j in range(20)
+        },
+        "forwardPorts": list(range(8000, 8050)),
+        "remoteUser": "vscode",
+        "workspaceFolder": f"/workspaces/service-{i}",
+    }
+
+
+def job_counts(max_jobs: int) -> list[int]:
+    counts = []
+    jobs = 1
+    while jobs < max_jobs:
+        counts.append(jobs)
+        jobs *= 2
+    counts.append(max_jobs)
+    return counts
+
+
+@click.command()
+@click.option("--schema", default=None, help="Schema to validate against.")
+@click.option("--documents", default=2000, show_default=True)
+@click.option("--max-jobs", default=os.cpu_count() or 1, show_default=True)
+def main(schema, documents, max_jobs):
+    """
+    Benchmark validating many documents with increasing job counts.
+    """
+    if schema:
+        resolved = resolve_schema(load_json(schema), schema)
+    else:
+        resolved = SYNTHETIC_SCHEMA
+    compiled = CompiledSchema(resolved)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(documents):
+            path = os.path.join(directory, f"devcontainer-{i}.json")
+            with open(path, "w") as f:
+                json.dump(synthetic_document(i), f)
+            paths.append(path)
+
+        baseline = None
+        click.echo(f"{'jobs':>6} {'seconds':>9} {'docs/s':>9} {'speedup':>8}")
+        for jobs in job_counts(max_jobs):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                validate_files(compiled, paths, "schema", jobs=jobs)
+                elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            click.echo(
+                f"{jobs:>6} {elapsed:>9.3f} {documents / elapsed:>9.0f} "
+                f"{baseline / elapsed:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Compare how long `load_json` takes to read and parse large documents with
+each installed JSON backend, against the text-mode `json.load` it used
+before.
+
+A generated schema is written to a temporary file; the file rows measure
+`load_json` on it, and the body rows parse the same bytes the way an HTTP
+response body is parsed.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_parse.py --definitions 100000
+"""
+
+import gc
+import json
+import os
+import tempfile
+import time
+
+import click
+
+from validate_devschema import fastjson
+from validate_devschema.utils import load_json
+
+
+def synthetic_schema(definitions: int) -> dict:
+    return {
+        "definitions": {
+            f"def{i}": {
+                "type": "object",
+                "description": f"Definition {i}, with a longer description "
+                "like the ones in the devContainer schema.",
+                "properties": {
+                    "name": {"type": "string", "maxLength": 64},
+                    "kind": {"enum": ["one", "two", "three"]},
+                    "size": {"type": "integer", "minimum": i},
+                },
+            }
+            for i in range(definitions)
+        }
+    }
+
+
+def best_of(rounds: int, func, *args):
+    best = float("inf")
+    # Parsing allocates many containers; keep collections out of the way.
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func(*args)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best
+
+
+def legacy_load(path: str):
+    with open(path, "r") as f:
+        return json.loads(f.read())
+
+
+def installed_backends() -> list[str]:
+    backends = []
+    for name in fastjson.JSON_BACKENDS[1:]:
+        try:
+            fastjson.set_backend(name)
+        except ValueError:
+            continue
+        backends.append(name)
+    return backends
+
+
+@click.command()
+@click.option("--definitions", default=100_000, show_default=True)
+@click.option("--rounds", default=5, show_default=True)
+def main(definitions, rounds):
+    """
+    Run the parsing benchmark.
+    """
+    body = json.dumps(synthetic_schema(definitions), indent=2).encode()
+    expected = json.loads(body)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "schema.json")
+        with open(path, "wb") as f:
+            f.write(body)
+
+        rows = [
+            ("file", "json.load (before)", best_of(rounds, legacy_load, path)),
+            (
+                "body",
+                "decode + json.loads (before)",
+                best_of(rounds, lambda: json.loads(body.decode("utf-8"))),
+            ),
+        ]
+        for name in installed_backends():
+            fastjson.set_backend(name)
+            assert load_json(path) == expected
+            assert fastjson.loads(body) == expected
+            rows.append(
+                (
+                    "file",
+                    f"load_json ({name})",
+                    best_of(rounds, load_json, path),
+                )
+            )
+            rows.append(
+                (
+                    "body",
+                    f"loads ({name})",
+                    best_of(rounds, fastjson.loads, body),
+                )
+            )
+
+    click.echo(f"{len(body) / 2**20:.1f} MiB, {definitions} definitions")
+    click.echo(f"{'source':<7} {'parser':<30} {'ms':>9}")
+    for source, parser, seconds in sorted(rows, key=lambda row: row[0]):
+        click.echo(f"{source:<7} {parser:<30} {seconds * 1e3:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
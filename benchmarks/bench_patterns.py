@@ -0,0 +1,111 @@
+"""
+Compare validating pattern-heavy documents with jsonschema's own `pattern`,
+`patternProperties` and `additionalProperties` keywords, which pass pattern
+strings to `re.search`, against the precompiled patterns of
+`compile_validators`.
+
+The synthetic schema has one property per group of patterns, each using
+three patterns and their alternation. Past 512 distinct patterns the `re`
+module's cache no longer holds them all and the plain keywords recompile
+patterns as they go.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_patterns.py \\
+        --properties 50 --properties 400
+"""
+
+import timeit
+
+import click
+from jsonschema.validators import validator_for
+from referencing import Registry
+
+from validate_devschema.validate_schema import (
+    CompiledSchema,
+    compile_validators,
+)
+
+
+def pattern_schema(properties: int) -> dict:
+    return {
+        "properties": {
+            f"group{i}": {
+                "type": "object",
+                "patternProperties": {
+                    f"^a{i}_[a-z]+$": {"type": "string", "pattern": f"^v{i}-"},
+                    f"^b{i}_[0-9]+$": {"type": "integer"},
+                },
+                "additionalProperties": False,
+            }
+            for i in range(properties)
+        }
+    }
+
+
+def pattern_instance(properties: int) -> dict:
+    return {
+        f"group{i}": {
+            f"a{i}_name": f"v{i}-1",
+            f"a{i}_other": f"v{i}-2",
+            f"b{i}_1": 1,
+        }
+        for i in range(properties)
+    }
+
+
+def plain_validators(schema: dict) -> dict:
+    cls = validator_for(schema)
+    root = cls(schema, registry=Registry())
+    return {
+        key: root.evolve(schema=subschema)
+        for key, subschema in schema["properties"].items()
+    }
+
+
+def validate_all(validators: dict, instance: dict) -> None:
+    for key, value in instance.items():
+        for _ in validators[key].iter_errors(value):
+            raise AssertionError(f"{key} should be valid")
+
+
+def per_document(func, number: int, repeat: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+@click.command()
+@click.option(
+    "--properties",
+    multiple=True,
+    type=int,
+    default=[50, 400],
+    show_default=True,
+    help="Numbers of properties to try; each adds four regexes.",
+)
+@click.option("--number", default=20, show_default=True)
+@click.option("--repeat", default=5, show_default=True)
+def main(properties, number, repeat):
+    """
+    Run the pattern benchmark.
+    """
+    click.echo(f"{'props':>6} {'regexes':>9} {'plain ms':>9} {'ms':>9}")
+    for count in properties:
+        schema = pattern_schema(count)
+        instance = pattern_instance(count)
+        plain = plain_validators(schema)
+        compiled = compile_validators(schema)
+        assert CompiledSchema(schema).check(instance) == []
+
+        before = per_document(
+            lambda: validate_all(plain, instance), number, repeat
+        )
+        after = per_document(
+            lambda: validate_all(compiled, instance), number, repeat
+        )
+        click.echo(
+            f"{count:>6} {count * 4:>9} {before * 1e3:>9.2f} "
+            f"{after * 1e3:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Compare the peak RSS of validating a large data file member by member with
+loading it whole.
+
+A generated document with many top-level members is written to a temporary
+file, and each mode validates it in a fresh interpreter, so the peak RSS it
+reports belongs to that mode alone:
+
+- load: `load_json` followed by `CompiledSchema.validate`, the default.
+- stream: `validate_stream`, as used by `--stream`.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_stream.py --members 200000
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+
+MODES = ("load", "stream")
+
+SCHEMA = {
+    "type": "object",
+    "additionalProperties": {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "size": {"type": "integer", "minimum": 0},
+            "tags": {"type": "array", "items": {"type": "string"}},
+        },
+    },
+}
+
+
+def write_document(path: str, members: int) -> None:
+    """
+    Write a document of `members` top-level members, one at a time.
+    """
+    with open(path, "w") as f:
+        f.write("{\n")
+        for i in range(members):
+            value = {
+                "name": f"member {i}",
+                "size": i,
+                "tags": ["one", "two", "three"],
+            }
+            separator = ",\n" if i < members - 1 else "\n"
+            f.write(f'  "member{i}": {json.dumps(value)}{separator}')
+        f.write("}\n")
+
+
+def run_mode(mode: str, path: str) -> dict:
+    from validate_devschema.stream import validate_stream
+    from validate_devschema.utils import load_json
+    from validate_devschema.validate_schema import CompiledSchema
+
+    compiled = CompiledSchema(SCHEMA)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    if mode == "stream":
+        valid = validate_stream(compiled, path)
+    else:
+        valid = compiled.validate(load_json(path))
+    seconds = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "valid": valid,
+        "seconds": seconds,
+        "rss_before_kib": before,
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+@click.command()
+@click.option("--members", default=200_000, show_default=True)
+@click.option("--mode", type=click.Choice(MODES), hidden=True)
+@click.option("--path", hidden=True)
+def main(members, mode, path):
+    """
+    Compare the peak RSS of streamed and loaded validation.
+    """
+    if mode:
+        click.echo(json.dumps(run_mode(mode, path)))
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "data.json")
+        write_document(path, members)
+        size = os.path.getsize(path)
+        for name in MODES:
+            output = subprocess.run(
+                [sys.executable, __file__, "--mode", name, "--path", path],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            # Validation prints its own messages; the result is last.
+            results.append(json.loads(output.splitlines()[-1]))
+
+    click.echo(f"{size / 2**20:.1f} MiB, {members} top-level members")
+    click.echo(
+        f"{'mode':<8} {'valid':<6} {'ms':>9} {'RSS before':>11} "
+        f"{'peak RSS':>9}"
+    )
+    for r in results:
+        click.echo(
+            f"{r['mode']:<8} {str(r['valid']):<6} "
+            f"{r['seconds'] * 1e3:>9.1f} "
+            f"{r['rss_before_kib'] / 1024:>8.1f} MiB "
+            f"{r['peak_rss_kib'] / 1024:>5.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""
+Benchmark the fetch, resolve, merge, compile and validate phases on
+synthetic workloads.
+
+Every workload is served from a local HTTP stand-in, so the suite runs fully
+offline. Each phase reports its best wall-clock time over several rounds and
+its peak traced memory from a separate traced round.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_suite.py --save-baseline base.json
+    PYTHONPATH=src python benchmarks/bench_suite.py --baseline base.json
+
+With `--baseline`, the suite exits non-zero when a phase got slower than the
+baseline by more than `--threshold`.
+"""
+
+import contextlib
+import copy
+import io
+import json
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import click
+
+from validate_devschema.utils import configure_session
+from validate_devschema.validate_schema import (
+    CompiledSchema,
+    ResolutionMemo,
+    merge_all_of,
+    prefetch_references,
+    resolve_references,
+)
+
+PHASES = ("fetch", "resolve", "merge", "compile", "validate")
+
+# Phases faster than this are too noisy to flag as regressions.
+MIN_REGRESSION_SECONDS = 0.002
+
+
+def deep_ref_chain(depth: int = 60):
+    documents = {}
+    for i in range(depth):
+        properties = {"value": {"type": "integer"}}
+        if i + 1 < depth:
+            properties["next"] = {"$ref": f"./chain_{i + 1}.json"}
+        documents[f"chain_{i}.json"] = {
+            "type": "object",
+            "properties": properties,
+        }
+    root = {"properties": {"chain": {"$ref": "./chain_0.json"}}}
+
+    instance = {"value": depth}
+    for i in range(depth - 1):
+        instance = {"value": i, "next": instance}
+    return root, documents, [{"chain": instance}]
+
+
+def wide_all_of(width: int = 300):
+    parts = [
+        {
+            "type": "object",
+            "properties": {f"p{i}": {"type": "string", "maxLength": 64}},
+        }
+        for i in range(width)
+    ]
+    # Every other entry is an external reference, the rest are inline.
+    documents = {
+        f"part_{i}.json": part for i, part in enumerate(parts) if i % 2
+    }
+    root = {
+        "allOf": [
+            {"$ref": f"./part_{i}.json"} if i % 2 else part
+            for i, part in enumerate(parts)
+        ]
+    }
+    instance = {f"p{i}": "value" for i in range(width)}
+    return root, documents, [instance]
+
+
+def shared_definitions(properties: int = 600, definitions: int = 40):
+    documents = {
+        "defs.json": {
+            "definitions": {
+                f"d{i}": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "size": {"type": "integer", "minimum": 0},
+                        "tags": {"type": "array", "items": {"type": "string"}},
+                    },
+                }
+                for i in range(definitions)
+            }
+        }
+    }
+    root = {
+        "properties": {
+            f"item{i}": {
+                "$ref": f"./defs.json#/definitions/d{i % definitions}"
+            }
+            for i in range(properties)
+        }
+    }
+    instance = {
+        f"item{i}": {"name": "x", "size": i, "tags": ["a", "b"]}
+        for i in range(properties)
+    }
+    return root, documents, [instance]
+
+
+def huge_instance(items: int = 50000):
+    documents = {
+        "item.json": {
+            "type": "object",
+            "properties": {
+                "id": {"type": "integer"},
+                "name": {"type": "string", "pattern": "^[a-z0-9-]+$"},
+                "enabled": {"type": "boolean"},
+            },
+            "required": ["id", "name"],
+        }
+    }
+    root = {
+        "properties": {
+            "items": {"type": "array", "items": {"$ref": "./item.json"}}
+        }
+    }
+    instance = {
+        "items": [
+            {"id": i, "name": f"item-{i}", "enabled": bool(i % 2)}
+            for i in range(items)
+        ]
+    }
+    return root, documents, [instance]
+
+
+def many_small_instances(count: int = 5000):
+    documents = {
+        "base.json": {
+            "properties": {
+                "name": {"type": "string"},
+                "image": {"type": "string"},
+                "forwardPorts": {
+                    "type": "array",
+                    "items": {"type": "integer"},
+                },
+                "remoteUser": {"type": "string"},
+            }
+        }
+    }
+    root = {"allOf": [{"$ref": "./base.json"}]}
+    instances = [
+        {
+            "name": f"service-{i}",
+            "image": "python:3",
+            "forwardPorts": [8000 + i % 100],
+            "remoteUser": "vscode",
+        }
+        for i in range(count)
+    ]
+    return root, documents, instances
+
+
+WORKLOADS = {
+    "deep_ref_chain": deep_ref_chain,
+    "wide_all_of": wide_all_of,
+    "shared_definitions": shared_definitions,
+    "huge_instance": huge_instance,
+    "many_small_instances": many_small_instances,
+}
+
+
+class StandInServer:
+    """
+    Local HTTP server that serves a dictionary of JSON documents.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        documents = self.documents
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                body = documents.get(self.path.lstrip("/"))
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/"
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+    def serve(self, documents: dict) -> None:
+        self.documents.clear()
+        self.documents.update(
+            {name: json.dumps(doc).encode() for name, doc in documents.items()}
+        )
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def run_phases(root: dict, base_url: str, instances: list) -> dict:
+    """
+    Run every phase once and return the result of each.
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    memo = ResolutionMemo()
+    prefetch_references(root, base_url, memo)
+    timings["fetch"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    resolved = resolve_references(root, base_url, memo=memo)
+    timings["resolve"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    merged = merge_all_of(resolved, base_url)
+    timings["merge"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = CompiledSchema(merged)
+    timings["compile"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for instance in instances:
+            compiled.validate(instance)
+    timings["validate"] = time.perf_counter() - start
+    return timings
+
+
+def measure_memory(root: dict, base_url: str, instances: list) -> dict:
+    """
+    Run every phase once under tracemalloc and return each peak in bytes.
+    """
+    peaks = {}
+    tracemalloc.start()
+    try:
+        memo = ResolutionMemo()
+        prefetch_references(root, base_url, memo)
+        peaks["fetch"] = tracemalloc.get_traced_memory()[1]
+
+        tracemalloc.reset_peak()
+        resolved = resolve_references(root, base_url, memo=memo)
+        peaks["resolve"] = tracemalloc.get_traced_memory()[1]
+
+        tracemalloc.reset_peak()
+        merged = merge_all_of(resolved, base_url)
+        peaks["merge"] = tracemalloc.get_traced_memory()[1]
+
+        tracemalloc.reset_peak()
+        compiled = CompiledSchema(merged)
+        peaks["compile"] = tracemalloc.get_traced_memory()[1]
+
+        tracemalloc.reset_peak()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for instance in instances:
+                compiled.validate(instance)
+        peaks["validate"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def run_suite(names: list[str], rounds: int) -> dict:
+    results = {}
+    configure_session()
+    with StandInServer() as server:
+        for name in names:
+            root, documents, instances = WORKLOADS[name]()
+            server.serve(documents)
+
+            best = {phase: float("inf") for phase in PHASES}
+            for _ in range(rounds):
+                timings = run_phases(
+                    copy.deepcopy(root), server.base_url, instances
+                )
+                for phase, seconds in timings.items():
+                    best[phase] = min(best[phase], seconds)
+            peaks = measure_memory(
+                copy.deepcopy(root), server.base_url, instances
+            )
+
+            results[name] = {
+                phase: {"seconds": best[phase], "peak_bytes": peaks[phase]}
+                for phase in PHASES
+            }
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, threshold: float):
+    regressions = []
+    for name, phases in results.items():
+        for phase, result in phases.items():
+            previous = baseline.get(name, {}).get(phase)
+            if previous is None:
+                continue
+            limit = previous["seconds"] * (1 + threshold)
+            if (
+                result["seconds"] > limit
+                and result["seconds"] > MIN_REGRESSION_SECONDS
+            ):
+                regressions.append(
+                    (name, phase, previous["seconds"], result["seconds"])
+                )
+    return regressions
+
+
+@click.command()
+@click.option(
+    "--workload",
+    "workloads",
+    multiple=True,
+    type=click.Choice(sorted(WORKLOADS)),
+    help="Workload to run. Can be repeated; defaults to all.",
+)
+@click.option("--rounds", default=3, show_default=True)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Compare against a saved baseline and fail on regressions.",
+)
+@click.option(
+    "--save-baseline",
+    type=click.Path(dir_okay=False),
+    help="Write the results to a baseline file.",
+)
+@click.option(
+    "--threshold",
+    default=0.25,
+    show_default=True,
+    help="Allowed slowdown relative to the baseline.",
+)
+def main(workloads, rounds, baseline, save_baseline, threshold):
+    """
+    Run the benchmark suite.
+    """
+    results = run_suite(list(workloads) or list(WORKLOADS), rounds)
+
+    click.echo(f"{'workload':<22} {'phase':<9} {'ms':>10} {'peak KiB':>10}")
+    for name, phases in results.items():
+        for phase, result in phases.items():
+            click.echo(
+                f"{name:<22} {phase:<9} {result['seconds'] * 1e3:>10.2f} "
+                f"{result['peak_bytes'] / 1024:>10.0f}"
+            )
+
+    if save_baseline:
+        with open(save_baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if baseline:
+        with open(baseline) as f:
+            regressions = find_regressions(results, json.load(f), threshold)
+        for name, phase, before, after in regressions:
+            click.secho(
+                f"REGRESSION: {name} {phase}: {before * 1e3:.2f} ms -> "
+                f"{after * 1e3:.2f} ms",
+                fg="red",
+            )
+        if regressions:
+            exit(1)
+
+
+if __name__ == "__main__":
+    main()
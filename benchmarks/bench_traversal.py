@@ -0,0 +1,226 @@
+"""
+Compare the explicit-stack traversal of `resolve_references` and
+`collect_refs` with the recursive implementations it replaced, on a
+synthetic schema of about 100k nodes.
+
+The pipeline row measures what `resolve_schema` does: walking the schema
+for references to prefetch, then resolving them. The recursive version
+walks the whole schema twice; the current one walks it once into the
+memo's `RefIndex` and then only follows the paths to references.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_traversal.py --nodes 100000
+"""
+
+import gc
+import sys
+import time
+from urllib.parse import urldefrag, urljoin
+
+import click
+
+from validate_devschema.utils import collect_refs
+from validate_devschema.validate_schema import (
+    ResolutionMemo,
+    prefetch_references,
+    resolve_internal_ref,
+    resolve_references,
+)
+
+
+def legacy_collect_refs(schema, base_url=""):
+    refs = []
+
+    def _collect(schema_part, current_base_url):
+        if isinstance(schema_part, dict):
+            if "$ref" in schema_part:
+                ref = schema_part["$ref"]
+                if (
+                    not ref.startswith(("http://", "https://"))
+                    and current_base_url
+                ):
+                    ref = urljoin(current_base_url, ref)
+                refs.append(ref)
+            for value in schema_part.values():
+                _collect(value, current_base_url)
+        elif isinstance(schema_part, list):
+            for item in schema_part:
+                _collect(item, current_base_url)
+
+    _collect(schema, base_url)
+    return refs
+
+
+def legacy_resolve_references(schema, base_url, memo):
+    return _legacy_resolve(schema, schema, base_url, memo)
+
+
+def _legacy_resolve(schema, root, doc_url, memo):
+    if isinstance(schema, dict):
+        if "$ref" in schema:
+            ref = schema["$ref"]
+            if ref.startswith("#"):
+                try:
+                    resolved = resolve_internal_ref(root, ref)
+                except ValueError:
+                    return {"$ref": ref}
+                key = urldefrag(doc_url).url + ref
+                return _legacy_resolve_target(
+                    key, ref, resolved, root, doc_url, memo
+                )
+            raise ValueError(f"Invalid reference: {ref}")
+        resolved = schema
+        for key, value in schema.items():
+            item = _legacy_resolve(value, root, doc_url, memo)
+            if item is not value:
+                if resolved is schema:
+                    resolved = dict(schema)
+                resolved[key] = item
+        return resolved
+    elif isinstance(schema, list):
+        resolved = schema
+        for index, value in enumerate(schema):
+            item = _legacy_resolve(value, root, doc_url, memo)
+            if item is not value:
+                if resolved is schema:
+                    resolved = list(schema)
+                resolved[index] = item
+        return resolved
+    return schema
+
+
+def _legacy_resolve_target(key, ref, target, root, doc_url, memo):
+    if key in memo.resolved:
+        return memo.resolved[key]
+    if key in memo.in_progress:
+        return {"$ref": ref}
+    memo.in_progress.add(key)
+    try:
+        resolved = _legacy_resolve(target, root, doc_url, memo)
+    finally:
+        memo.in_progress.discard(key)
+    memo.resolved[key] = resolved
+    return resolved
+
+
+def synthetic_schema(nodes: int, definitions: int = 50):
+    """
+    Build a wide schema with roughly `nodes` containers, a tenth of them
+    referencing shared definitions.
+    """
+    defs = {
+        f"d{i}": {"type": "object", "properties": {"v": {"type": "string"}}}
+        for i in range(definitions)
+    }
+    properties = {}
+    count = 0
+    i = 0
+    while count < nodes:
+        if i % 10 == 0:
+            properties[f"p{i}"] = {"$ref": f"#/definitions/d{i % definitions}"}
+            count += 1
+        else:
+            properties[f"p{i}"] = {
+                "type": "object",
+                "properties": {"a": {"type": "integer"}, "b": {"enum": [1]}},
+            }
+            count += 5
+        i += 1
+    return {"properties": properties, "definitions": defs}
+
+
+def deep_schema(depth: int):
+    schema = {"type": "string"}
+    for _ in range(depth):
+        schema = {"type": "object", "properties": {"child": schema}}
+    return schema
+
+
+def legacy_pipeline(schema, base_url):
+    legacy_collect_refs(schema, base_url)
+    return legacy_resolve_references(schema, base_url, ResolutionMemo())
+
+
+def pipeline(schema, base_url):
+    memo = ResolutionMemo()
+    prefetch_references(schema, base_url, memo)
+    return resolve_references(schema, base_url, memo=memo)
+
+
+def best_of(rounds: int, func, *args):
+    best = float("inf")
+    # Like timeit, keep the garbage collector out of the measurements.
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func(*args)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best
+
+
+@click.command()
+@click.option("--nodes", default=100_000, show_default=True)
+@click.option("--rounds", default=10, show_default=True)
+@click.option("--depth", default=5000, show_default=True)
+def main(nodes, rounds, depth):
+    """
+    Run the traversal benchmark.
+    """
+    schema = synthetic_schema(nodes)
+    base_url = "http://bench.local/schema.json"
+
+    assert legacy_collect_refs(schema, base_url) == collect_refs(
+        schema, base_url
+    )
+    assert legacy_pipeline(schema, base_url) == pipeline(schema, base_url)
+
+    rows = [
+        (
+            "collect_refs",
+            best_of(rounds, legacy_collect_refs, schema, base_url),
+            best_of(rounds, collect_refs, schema, base_url),
+        ),
+        (
+            "resolve_references",
+            best_of(
+                rounds,
+                lambda: legacy_resolve_references(
+                    schema, base_url, ResolutionMemo()
+                ),
+            ),
+            best_of(
+                rounds,
+                lambda: resolve_references(
+                    schema, base_url, memo=ResolutionMemo()
+                ),
+            ),
+        ),
+        (
+            "prefetch + resolve",
+            best_of(rounds, legacy_pipeline, schema, base_url),
+            best_of(rounds, pipeline, schema, base_url),
+        ),
+    ]
+    click.echo(f"{'function':<20} {'recursive ms':>13} {'iterative ms':>13}")
+    for name, legacy, current in rows:
+        click.echo(f"{name:<20} {legacy * 1e3:>13.2f} {current * 1e3:>13.2f}")
+
+    nested = deep_schema(depth)
+    try:
+        legacy_resolve_references(nested, base_url, ResolutionMemo())
+        legacy = "ok"
+    except RecursionError:
+        legacy = "RecursionError"
+    resolve_references(nested, base_url, memo=ResolutionMemo())
+    collect_refs(nested, base_url)
+    click.echo(
+        f"nesting depth {depth} (recursion limit {sys.getrecursionlimit()}): "
+        f"recursive {legacy}, iterative ok"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compare the per-document validation cost of the legacy per-key
+`jsonschema.validate` loop with the compiled property validators, and with
+the single-pass `CompiledSchema.check` that collects every error.
+
+The schema is resolved once up front, so only validation is measured.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_validate.py \\
+        --schema path/or/url/to/devContainer.schema.json \\
+        --data .devcontainer/devcontainer.json
+
+The schema defaults to the upstream devContainer schema.
+"""
+
+import timeit
+
+import click
+import jsonschema
+from jsonschema.exceptions import best_match
+
+from validate_devschema.utils import load_json
+from validate_devschema.validate_schema import (
+    CompiledSchema,
+    compile_validators,
+    resolve_schema,
+)
+
+DEFAULT_SCHEMA = (
+    "https://raw.githubusercontent.com/devcontainers/spec/main/schemas/"
+    "devContainer.schema.json"
+)
+
+
+def legacy_validate(schema: dict, instance: dict) -> None:
+    for key, value in instance.items():
+        if "properties" in schema and key in schema["properties"]:
+            try:
+                jsonschema.validate(
+                    {key: value}, {key: schema["properties"][key]}
+                )
+            except jsonschema.ValidationError:
+                pass
+
+
+def compiled_validate(validators: dict, instance: dict) -> None:
+    for key, value in instance.items():
+        validator = validators.get(key)
+        if validator is not None:
+            best_match(validator.iter_errors(value))
+
+
+def per_document(func, number: int, repeat: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+@click.command()
+@click.option("--schema", default=DEFAULT_SCHEMA, show_default=True)
+@click.option(
+    "--data", default=".devcontainer/devcontainer.json", show_default=True
+)
+@click.option("--number", default=200, show_default=True)
+@click.option("--repeat", default=5, show_default=True)
+def main(schema, data, number, repeat):
+    """
+    Benchmark validating DATA against SCHEMA.
+    """
+    resolved = resolve_schema(load_json(schema), schema)
+    instance = load_json(data)
+
+    compile_time = per_document(
+        lambda: compile_validators(resolved), 1, repeat
+    )
+    validators = compile_validators(resolved)
+    legacy = per_document(
+        lambda: legacy_validate(resolved, instance), number, repeat
+    )
+    compiled = per_document(
+        lambda: compiled_validate(validators, instance), number, repeat
+    )
+
+    check = CompiledSchema(resolved).check
+    single_pass = per_document(lambda: check(instance), number, repeat)
+
+    click.echo(f"compile once:        {compile_time * 1e3:9.3f} ms")
+    click.echo(f"legacy per document: {legacy * 1e3:9.3f} ms")
+    click.echo(f"compiled per doc:    {compiled * 1e3:9.3f} ms")
+    click.echo(f"single pass per doc: {single_pass * 1e3:9.3f} ms")
+    click.echo(f"speedup:             {legacy / compiled:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,492 @@
+import io
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import redirect_stdout
+from itertools import repeat
+from typing import Iterator
+import click
+from . import fastjson, jsonc
+from .bundle import schema_hash
+from .cache import HttpCache, ResultCache
+from .stream import validate_stream
+from .profiling import get_profiler
+from .utils import (
+    configure_session,
+    get_http_cache,
+    get_session,
+    get_session_config,
+    is_url,
+    load_json,
+    set_http_cache,
+)
+from .validate_schema import CompiledSchema, LazyCompiledSchema
+
+DEFAULT_PRELOAD_DOCUMENTS = 4
+
+_worker_schema = None
+_worker_results = None
+_worker_stream = False
+
+
+class Preloader:
+    """
+    Loads the first data documents on background threads, so that they
+    arrive while the schema is still being loaded and resolved instead of
+    after it.
+    """
+
+    def __init__(
+        self,
+        data_paths: list[str],
+        verbose: bool = False,
+        limit: int = DEFAULT_PRELOAD_DOCUMENTS,
+    ):
+        from concurrent.futures import ThreadPoolExecutor
+
+        paths = list(dict.fromkeys(data_paths))[:limit]
+        if any(is_url(path) for path in paths):
+            # Create the shared HTTP session up front, rather than letting
+            # the first loads race to create it and each wait for the
+            # import of requests.
+            get_session()
+        self.started = time.monotonic()
+        self.finished = self.started
+        # Sum of the individual load times, i.e. their cost when loaded
+        # one after another.
+        self.seconds = 0.0
+        self.verbose = verbose
+        self._lock = threading.Lock()
+        self._futures = {}
+        if not paths:
+            return
+        executor = ThreadPoolExecutor(max_workers=len(paths))
+        for path in paths:
+            self._futures[path] = executor.submit(self._load, path)
+        # The threads finish their loads and exit on their own.
+        executor.shutdown(wait=False)
+
+    def _load(self, data_path: str):
+        start = time.monotonic()
+        try:
+            return load_json(data_path, verbose=self.verbose)
+        finally:
+            end = time.monotonic()
+            with self._lock:
+                self.seconds += end - start
+                self.finished = max(self.finished, end)
+
+    def take(self, data_path: str) -> Future | None:
+        """
+        Return the pending load of a document, or None if it was not
+        preloaded or was already taken.
+        """
+        return self._futures.pop(data_path, None)
+
+    def report_overlap(
+        self, schema_seconds: float, verbose: bool = False
+    ) -> float:
+        """
+        Record how much wall-clock time loading the documents alongside the
+        schema saved, once every preloaded document has been taken.
+
+        The saving is the schema and document load times added up, as they
+        were spent when run in sequence, minus the wall-clock time until
+        both were done. Loads that compete for the CPU rather than wait on
+        I/O slow each other down, so the saving is an upper bound for them.
+
+        Args:
+            schema_seconds: Time spent loading and compiling the schema,
+                from when the preloader was started.
+            verbose: Flag to enable verbose output.
+
+        Returns:
+            The seconds saved.
+        """
+        with self._lock:
+            loaded = self.seconds
+            finished = self.finished
+        if not loaded:
+            return 0.0
+        wall = max(finished - self.started, schema_seconds)
+        saved = max(0.0, schema_seconds + loaded - wall)
+        get_profiler().save("load", saved)
+        if verbose:
+            click.secho(
+                f"INFO: Loading data alongside the schema saved "
+                f"{saved:.3f} s.",
+                fg="blue",
+            )
+        return saved
+
+
+def schema_fingerprint(compiled: CompiledSchema) -> str:
+    """
+    Identify everything a validation verdict depends on: the resolved
+    schema (with the documents its references point into) and the
+    jsonschema version.
+
+    Args:
+        compiled: The compiled schema.
+
+    Returns:
+        The fingerprint, for keying a `ResultCache`.
+    """
+    from importlib.metadata import version
+
+    content = {"schema": compiled.schema}
+    if isinstance(compiled, LazyCompiledSchema):
+        content["schema_url"] = compiled.schema_url
+        content["documents"] = compiled.memo.documents
+    elif compiled.documents:
+        content["documents"] = compiled.documents
+    return f"{schema_hash(content)} jsonschema-{version('jsonschema')}"
+
+
+def validate_file(
+    compiled: CompiledSchema,
+    data_path: str,
+    schema_path: str,
+    verbose: bool = False,
+    results: ResultCache | None = None,
+    stream: bool = False,
+    preloaded: Future | None = None,
+) -> bool:
+    """
+    Load a single data document and validate it against a compiled schema.
+
+    Args:
+        compiled: The compiled schema.
+        data_path: The path or URL of the document.
+        schema_path: The path or URL of the schema, for messages.
+        verbose: Flag to enable verbose output.
+        results: Cache of verdicts for unchanged local files.
+        stream: Validate local files member by member while reading them,
+            instead of loading them whole. URLs are always loaded whole.
+        preloaded: The pending load of the document, from a `Preloader`.
+
+    Returns:
+        True if the document loaded and validated successfully.
+    """
+    if verbose:
+        data_type = "URL" if is_url(data_path) else "file"
+        click.secho(f"INFO: Data is a {data_type}: {data_path}", fg="blue")
+        click.secho(
+            f"INFO: Validating {data_path} against {schema_path}...",
+            fg="yellow",
+        )
+    if results is not None and not is_url(data_path):
+        return _validate_cached(compiled, data_path, verbose, results, stream)
+    try:
+        if stream and not is_url(data_path):
+            return validate_stream(compiled, data_path, verbose)
+        if preloaded is not None:
+            data = preloaded.result()
+        else:
+            data = load_json(data_path, verbose=verbose)
+        return compiled.validate(data, verbose)
+    except Exception as e:
+        click.secho(f"ERROR: {data_path}: {e}", fg="red")
+        return False
+
+
+def _validate_cached(
+    compiled: CompiledSchema,
+    data_path: str,
+    verbose: bool,
+    results: ResultCache,
+    stream: bool = False,
+) -> bool:
+    try:
+        if stream:
+            key = results.key_file(data_path)
+        else:
+            with open(data_path, "rb") as f:
+                content = f.read()
+            key = results.key(content)
+    except OSError as e:
+        click.secho(f"ERROR: {data_path}: {e}", fg="red")
+        return False
+
+    entry = results.lookup(key)
+    if entry is not None:
+        if verbose:
+            click.secho(
+                f"INFO: {data_path} is unchanged, using the cached result.",
+                fg="blue",
+            )
+        click.echo(entry["output"], nl=False)
+        if entry.get("error") is not None:
+            click.secho(f"ERROR: {data_path}: {entry['error']}", fg="red")
+        return entry["valid"]
+
+    # Validate the bytes that were hashed, so the stored verdict always
+    # matches its key even if the file changes meanwhile. This is also why
+    # the file is read rather than memory-mapped here. A streamed file is
+    # hashed again while it is validated, and the verdict is only stored
+    # if both hashes agree. Files with the same content share the entry,
+    # so only path-free output is captured for it, and verbose messages
+    # are left out of it.
+    if stream and verbose:
+        click.secho(f"INFO: Streaming JSON from file: {data_path}", fg="blue")
+    output = io.StringIO()
+    hasher = results.hasher() if stream else None
+    error = None
+    with redirect_stdout(output):
+        try:
+            if stream:
+                valid = validate_stream(compiled, data_path, hasher=hasher)
+            else:
+                valid = compiled.validate(jsonc.loads(content))
+        except Exception as e:
+            error = str(e)
+            valid = False
+    click.echo(output.getvalue(), nl=False)
+    if error is not None:
+        click.secho(f"ERROR: {data_path}: {error}", fg="red")
+    if hasher is None or hasher.hexdigest() == key:
+        results.store(key, valid, output.getvalue(), error)
+    return valid
+
+
+def validate_files(
+    compiled: CompiledSchema,
+    data_paths: list[str],
+    schema_path: str,
+    verbose: bool = False,
+    jobs: int = 1,
+    results: ResultCache | None = None,
+    stream: bool = False,
+    preloader: Preloader | None = None,
+) -> list[str]:
+    """
+    Validate each data document against a compiled schema, reporting the
+    result for every document in input order.
+
+    With more than one job the documents are spread across a process pool;
+    the output of each document is buffered in its worker and printed in
+    input order.
+
+    Args:
+        compiled: The compiled schema.
+        data_paths: The paths or URLs of the documents to validate.
+        schema_path: The path or URL of the schema, for messages.
+        verbose: Flag to enable verbose output.
+        jobs: Number of worker processes.
+        results: Cache of verdicts for unchanged local files.
+        stream: Validate local files member by member while reading them.
+        preloader: Documents loaded in the background, used when
+            validating in this process.
+
+    Returns:
+        The paths of the documents that failed to load or validate.
+    """
+    if jobs > 1 and len(data_paths) > 1:
+        outcomes = validate_files_parallel(
+            compiled, data_paths, schema_path, verbose, jobs, results, stream
+        )
+    else:
+        outcomes = (
+            (
+                path,
+                validate_file(
+                    compiled,
+                    path,
+                    schema_path,
+                    verbose,
+                    results,
+                    stream,
+                    preloader and preloader.take(path),
+                ),
+                "",
+            )
+            for path in data_paths
+        )
+
+    failed = []
+    for data_path, success, output in outcomes:
+        if output:
+            click.echo(output, nl=False)
+        if len(data_paths) > 1:
+            if success:
+                click.secho(f"✅ {data_path}", fg="green")
+            else:
+                click.secho(f"❌ {data_path}", fg="red")
+        if not success:
+            failed.append(data_path)
+    return failed
+
+
+def check_file(
+    compiled: CompiledSchema,
+    data_path: str,
+    preloaded: Future | None = None,
+) -> dict:
+    """
+    Load a single data document and collect all of its validation errors,
+    without printing anything.
+
+    Args:
+        compiled: The compiled schema.
+        data_path: The path or URL of the document.
+        preloaded: The pending load of the document, from a `Preloader`.
+
+    Returns:
+        A dict with the document's "path", its "valid" flag, the "errors"
+        from `CompiledSchema.check`, and the "error" that kept it from
+        loading, if any.
+    """
+    try:
+        if preloaded is not None:
+            data = preloaded.result()
+        else:
+            data = load_json(data_path)
+        errors = compiled.check(data)
+    except Exception as e:
+        return {
+            "path": data_path,
+            "valid": False,
+            "errors": [],
+            "error": str(e),
+        }
+    return {
+        "path": data_path,
+        "valid": not errors,
+        "errors": errors,
+        "error": None,
+    }
+
+
+def check_files(
+    compiled: CompiledSchema,
+    data_paths: list[str],
+    jobs: int = 1,
+    preloader: Preloader | None = None,
+) -> list[dict]:
+    """
+    Collect the validation errors of each data document, in input order.
+
+    Args:
+        compiled: The compiled schema.
+        data_paths: The paths or URLs of the documents to validate.
+        jobs: Number of worker processes.
+        preloader: Documents loaded in the background, used when
+            validating in this process.
+
+    Returns:
+        The result of `check_file` for every document.
+    """
+    if jobs <= 1 or len(data_paths) <= 1:
+        return [
+            check_file(compiled, path, preloader and preloader.take(path))
+            for path in data_paths
+        ]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(data_paths) // (jobs * 4))
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(compiled, None, False, _worker_config()),
+    ) as executor:
+        return list(
+            executor.map(_check_in_worker, data_paths, chunksize=chunksize)
+        )
+
+
+def validate_files_parallel(
+    compiled: CompiledSchema,
+    data_paths: list[str],
+    schema_path: str,
+    verbose: bool = False,
+    jobs: int | None = None,
+    results: ResultCache | None = None,
+    stream: bool = False,
+) -> Iterator[tuple[str, bool, str]]:
+    """
+    Validate documents on a process pool.
+
+    The compiled schema is sent to every worker once, when the worker
+    starts, and its validators are rebuilt there; tasks only carry the
+    document path. Workers are configured like this process (HTTP session,
+    schema cache and JSON backend), whichever way they are started.
+
+    Args:
+        compiled: The compiled schema.
+        data_paths: The paths or URLs of the documents to validate.
+        schema_path: The path or URL of the schema, for messages.
+        verbose: Flag to enable verbose output.
+        jobs: Number of worker processes, or None for one per CPU.
+        results: Cache of verdicts for unchanged local files.
+        stream: Validate local files member by member while reading them.
+
+    Yields:
+        Tuples of document path, success flag and captured output, in the
+        order of `data_paths`.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = jobs or os.cpu_count() or 1
+    chunksize = max(1, len(data_paths) // (jobs * 4))
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(compiled, results, stream, _worker_config()),
+    ) as executor:
+        yield from executor.map(
+            _validate_in_worker,
+            data_paths,
+            repeat(schema_path),
+            repeat(verbose),
+            chunksize=chunksize,
+        )
+
+
+def _worker_config() -> dict:
+    # Module-level settings are not inherited by spawned or forkserver
+    # workers, so they are sent along with the schema.
+    http_cache = get_http_cache()
+    return {
+        "session": get_session_config(),
+        "cache_dir": http_cache.directory if http_cache else None,
+        "json_backend": fastjson.get_backend(),
+    }
+
+
+def _init_worker(
+    compiled: CompiledSchema,
+    results: ResultCache | None = None,
+    stream: bool = False,
+    config: dict | None = None,
+) -> None:
+    global _worker_schema, _worker_results, _worker_stream
+    _worker_schema = compiled
+    _worker_results = results
+    _worker_stream = stream
+    if config is not None:
+        configure_session(**config["session"])
+        cache_dir = config["cache_dir"]
+        set_http_cache(HttpCache(cache_dir) if cache_dir else None)
+        fastjson.set_backend(config["json_backend"])
+
+
+def _validate_in_worker(
+    data_path: str, schema_path: str, verbose: bool
+) -> tuple[str, bool, str]:
+    output = io.StringIO()
+    with redirect_stdout(output):
+        success = validate_file(
+            _worker_schema,
+            data_path,
+            schema_path,
+            verbose,
+            _worker_results,
+            _worker_stream,
+        )
+    return data_path, success, output.getvalue()
+
+
+def _check_in_worker(data_path: str) -> dict:
+    return check_file(_worker_schema, data_path)
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import click
+from .utils import load_json, set_http_cache
+from .cache import CACHE_DIR_ENV, HttpCache
+from .validate_schema import ResolutionMemo, resolve_schema
+
+BUNDLE_FORMAT = 1
+BUNDLE_ENV = "VALIDATE_DEVSCHEMA_BUNDLE"
+
+
+def schema_hash(schema: dict) -> str:
+    """
+    Compute the content hash of a schema.
+
+    The hash is taken over a canonical serialization, so it does not depend
+    on key order or formatting.
+
+    Args:
+        schema: The JSON schema.
+
+    Returns:
+        The hex-encoded SHA-256 digest, prefixed with "sha256:".
+    """
+    canonical = json.dumps(
+        schema, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return "sha256:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def create_bundle(
+    schema: dict, schema_url: str, verbose: bool = False
+) -> dict:
+    """
+    Resolve a schema into a self-contained bundle.
+
+    Args:
+        schema: The JSON schema.
+        schema_url: The URL or path of the schema.
+        verbose: Flag to enable verbose output.
+
+    Returns:
+        The bundle, holding the resolved schema, the fetched documents that
+        cyclic references left in it point into (if any), and its content
+        hash.
+    """
+    memo = ResolutionMemo()
+    result = {
+        "format": BUNDLE_FORMAT,
+        "source": schema_url,
+        "schema": resolve_schema(schema, schema_url, verbose, memo),
+    }
+    documents = memo.cycle_documents()
+    if documents:
+        result["documents"] = documents
+    result["hash"] = schema_hash(_hashed_content(result))
+    return result
+
+
+def _hashed_content(bundle: dict):
+    # Bundles without documents hash the schema alone, as before.
+    if "documents" not in bundle:
+        return bundle.get("schema")
+    return {"schema": bundle.get("schema"), "documents": bundle["documents"]}
+
+
+def write_bundle(bundle: dict, path: str) -> None:
+    """
+    Write a bundle to a file.
+    """
+    with open(path, "w") as f:
+        json.dump(bundle, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_bundle(path: str, verbose: bool = False) -> dict:
+    """
+    Load a bundle and verify its content hash.
+
+    Args:
+        path: The path or URL of the bundle.
+        verbose: Flag to enable verbose output.
+
+    Returns:
+        The bundle.
+
+    Raises:
+        ValueError: If the file is not a supported bundle or its schema does
+            not match the recorded hash.
+    """
+    bundle = load_json(path, verbose=verbose)
+    if not isinstance(bundle, dict) or bundle.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported schema bundle: {path}")
+    if schema_hash(_hashed_content(bundle)) != bundle.get("hash"):
+        raise ValueError(f"Schema bundle hash mismatch: {path}")
+    if verbose:
+        click.secho(
+            f"INFO: Loaded schema bundle of {bundle['source']} "
+            f"({bundle['hash']})",
+            fg="blue",
+        )
+    return bundle
+
+
+@click.command()
+@click.argument("schema", type=str)
+@click.option(
+    "--output",
+    "-o",
+    required=True,
+    type=click.Path(dir_okay=False, writable=True),
+    help="Path to write the bundle to.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    envvar=CACHE_DIR_ENV,
+    help="Directory for caching fetched schemas between runs.",
+)
+@click.option("--verbose", "-v", is_flag=True, help="Enable verbose output.")
+def bundle(schema, output, cache_dir, verbose):
+    """
+    Resolve a JSON schema file or URL (SCHEMA) and its references into a
+    self-contained bundle for `validate-devschema --bundle`.
+    """
+    if cache_dir:
+        set_http_cache(HttpCache(cache_dir))
+
+    try:
+        result = create_bundle(
+            load_json(schema, verbose=verbose), schema, verbose
+        )
+        write_bundle(result, output)
+    except Exception as e:
+        click.secho(f"ERROR: {e}", fg="red")
+        exit(1)
+
+    click.secho(
+        f"✅ INFO: Wrote schema bundle {output} ({result['hash']}).",
+        fg="green",
+    )
+
+
+if __name__ == "__main__":
+    bundle()
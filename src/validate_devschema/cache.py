@@ -0,0 +1,284 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from . import fastjson
+
+CACHE_DIR_ENV = "VALIDATE_DEVSCHEMA_CACHE_DIR"
+RESULT_CACHE_ENV = "VALIDATE_DEVSCHEMA_RESULT_CACHE_DIR"
+# Bumped when the layout of result cache entries changes.
+RESULT_FORMAT = 2
+
+
+def parse_cache_control(header: str) -> dict:
+    """
+    Parse a `Cache-Control` header into a dictionary of directives.
+
+    Args:
+        header: The raw header value.
+
+    Returns:
+        A mapping of lower-cased directive names to their values. Directives
+        without a value map to True.
+    """
+    directives = {}
+    for part in header.split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') if value else True
+    return directives
+
+
+def freshness_deadline(headers, now: float) -> float | None:
+    """
+    Compute until when a response may be served without revalidation.
+
+    Args:
+        headers: The response headers.
+        now: The current time as a UNIX timestamp.
+
+    Returns:
+        The UNIX timestamp at which the response goes stale, or None if it
+        must be revalidated on every use.
+    """
+    directives = parse_cache_control(headers.get("Cache-Control", ""))
+    if "no-cache" in directives or "no-store" in directives:
+        return None
+
+    max_age = directives.get("max-age")
+    if max_age is not None:
+        try:
+            age = int(headers.get("Age", 0))
+            return now + int(max_age) - age
+        except (TypeError, ValueError):
+            return None
+
+    expires = headers.get("Expires")
+    if expires:
+        from email.utils import parsedate_to_datetime
+
+        try:
+            return parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            return None
+
+    return None
+
+
+class HttpCache:
+    """
+    On-disk cache for JSON documents fetched over HTTP.
+
+    Each entry stores the response body together with its `ETag` and
+    `Last-Modified` validators, so stale entries can be revalidated with a
+    conditional request instead of being downloaded again.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def lookup(self, url: str) -> dict | None:
+        """
+        Return the cache entry for a URL, or None if there is none.
+
+        Unreadable or corrupt entries are treated as missing.
+        """
+        try:
+            with open(self._path(url), "rb") as f:
+                entry = fastjson.loads(f.read())
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not isinstance(entry, dict) or entry.get("url") != url:
+            return None
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        """
+        Check whether an entry can be served without contacting the server.
+        """
+        expires = entry.get("expires")
+        return expires is not None and time.time() < expires
+
+    def request_headers(self, entry: dict | None) -> dict:
+        """
+        Build the conditional request headers for an entry.
+        """
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def serve(self, entry: dict):
+        """
+        Count a cache hit and return the decoded document of an entry.
+        """
+        with self._lock:
+            self.hits += 1
+        return fastjson.loads(entry["body"])
+
+    def revalidate(self, entry: dict, response):
+        """
+        Refresh an entry after a `304 Not Modified` response and return its
+        decoded document.
+        """
+        with self._lock:
+            self.revalidated += 1
+        entry["expires"] = freshness_deadline(response.headers, time.time())
+        entry["etag"] = response.headers.get("ETag", entry.get("etag"))
+        entry["last_modified"] = response.headers.get(
+            "Last-Modified", entry.get("last_modified")
+        )
+        self._write(entry)
+        return self.serve(entry)
+
+    def store(self, url: str, response) -> None:
+        """
+        Count a cache miss and store a successful response, unless the
+        server asked for it not to be stored.
+        """
+        with self._lock:
+            self.misses += 1
+        directives = parse_cache_control(
+            response.headers.get("Cache-Control", "")
+        )
+        if "no-store" in directives:
+            return
+        self._write(
+            {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "expires": freshness_deadline(response.headers, time.time()),
+                "body": response.text,
+            }
+        )
+
+    def _write(self, entry: dict) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(entry["url"]))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def stats(self) -> dict:
+        """
+        Return the hit/miss counters of this cache.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+        }
+
+
+class ResultCache:
+    """
+    On-disk cache of validation verdicts.
+
+    Entries live in a directory per schema fingerprint and are keyed by the
+    hash of the document bytes, so a changed schema or document never
+    matches a stale verdict. As documents with the same content share an
+    entry, its output must not name the document.
+    """
+
+    def __init__(self, directory: str, fingerprint: str):
+        self.root = directory
+        self.fingerprint = fingerprint
+        digest = hashlib.sha256(
+            f"{RESULT_FORMAT} {fingerprint}".encode("utf-8")
+        ).hexdigest()
+        self.directory = os.path.join(directory, digest[:32])
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __reduce__(self):
+        # Sent to worker processes without the lock or the counters.
+        return (self.__class__, (self.root, self.fingerprint))
+
+    def key(self, content: bytes) -> str:
+        """
+        Return the cache key of a document's content.
+        """
+        return hashlib.sha256(content).hexdigest()
+
+    def hasher(self):
+        """
+        Return a hash object whose `hexdigest()` is the cache key of the
+        bytes it was updated with.
+        """
+        return hashlib.sha256()
+
+    def key_file(self, path: str, chunk_size: int = 1 << 20) -> str:
+        """
+        Return the cache key of a file's content, reading it in chunks.
+        """
+        hasher = self.hasher()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def lookup(self, key: str) -> dict | None:
+        """
+        Return the cached verdict for a key, or None if there is none.
+
+        Unreadable or corrupt entries are treated as missing.
+        """
+        try:
+            with open(os.path.join(self.directory, f"{key}.json")) as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            entry = None
+        if not isinstance(entry, dict) or "valid" not in entry:
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def store(
+        self, key: str, valid: bool, output: str, error: str | None = None
+    ) -> None:
+        """
+        Store the verdict and the validation output for a key, with the
+        error that stopped validation, if any.
+        """
+        entry = {"valid": valid, "output": output}
+        if error is not None:
+            entry["error"] = error
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, os.path.join(self.directory, f"{key}.json"))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def stats(self) -> dict:
+        """
+        Return the hit/miss counters of this cache.
+        """
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,157 @@
+import http.client
+import json
+import os
+import socket
+from urllib.parse import urlparse
+import click
+
+# Only the standard library and click are imported at startup; the
+# validation modules are imported when falling back to in-process
+# validation.
+
+DAEMON_ENV = "VALIDATE_DEVSCHEMA_DAEMON"
+DEFAULT_CLIENT_TIMEOUT = 60.0
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    HTTP connection over a Unix socket.
+    """
+
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+def request_validation(
+    address: str, request: dict, timeout: float = DEFAULT_CLIENT_TIMEOUT
+) -> dict | None:
+    """
+    Send a validation request to a running daemon.
+
+    Args:
+        address: A Unix socket path or an http://host:port URL.
+        request: The request for `server.handle_request`.
+        timeout: Seconds to wait for the daemon.
+
+    Returns:
+        The daemon's response, or None if no daemon is reachable.
+
+    Raises:
+        ValueError: If the daemon rejected the request.
+    """
+    if address.startswith("http://"):
+        parsed = urlparse(address)
+        connection = http.client.HTTPConnection(
+            parsed.hostname, parsed.port, timeout=timeout
+        )
+    else:
+        connection = UnixHTTPConnection(address, timeout)
+    try:
+        connection.request(
+            "POST",
+            "/validate",
+            body=json.dumps(request),
+            headers={"Content-Type": "application/json"},
+        )
+        response = connection.getresponse()
+        body = json.loads(response.read())
+    except OSError:
+        return None
+    finally:
+        connection.close()
+    if response.status != 200:
+        raise ValueError(body.get("error", f"HTTP {response.status}"))
+    return body
+
+
+def _absolute(path: str) -> str:
+    # The daemon runs in its own working directory.
+    if urlparse(path).scheme in ("http", "https"):
+        return path
+    return os.path.abspath(path)
+
+
+@click.command()
+@click.argument("schema", type=str)
+@click.argument("data", nargs=-1, required=True, type=str)
+@click.option(
+    "--daemon",
+    type=str,
+    envvar=DAEMON_ENV,
+    help="Unix socket path or http://127.0.0.1:PORT URL of the daemon.",
+)
+@click.option(
+    "--resolution",
+    type=click.Choice(("eager", "lazy")),
+    default="eager",
+    show_default=True,
+    help="Resolution mode, as for validate-devschema.",
+)
+@click.option("--verbose", "-v", is_flag=True, help="Enable verbose output.")
+def client(schema, data, daemon, resolution, verbose):
+    """
+    Validate JSON files (DATA) against a JSON schema (SCHEMA) through a
+    running `validate-devschema-serve` daemon, or in-process if no daemon
+    is available.
+    """
+    response = None
+    if daemon:
+        request = {
+            "schema": _absolute(schema),
+            "data": [_absolute(path) for path in data],
+            "resolution": resolution,
+            "verbose": verbose,
+        }
+        try:
+            response = request_validation(daemon, request)
+        except ValueError as e:
+            click.secho(f"ERROR: {e}", fg="red")
+            exit(1)
+
+    if response is None:
+        if verbose:
+            click.secho(
+                "INFO: Validation daemon not available, validating "
+                "in-process.",
+                fg="blue",
+            )
+        from .main import main
+
+        args = ["--schema", schema, "--resolution", resolution]
+        for path in data:
+            args += ["--data", path]
+        if verbose:
+            args.append("--verbose")
+        main.main(args=args)
+        return
+
+    results = response["results"]
+    for result in results:
+        click.echo(result["output"], nl=False)
+        if len(results) > 1:
+            if result["valid"]:
+                click.secho(f"✅ {result['path']}", fg="green")
+            else:
+                click.secho(f"❌ {result['path']}", fg="red")
+
+    if response["valid"]:
+        click.secho(
+            "✅ INFO: Schema validation completed successfully.", fg="green"
+        )
+        exit(0)
+    click.secho(
+        "❌ ERROR: Schema validation failed. Please check the errors.",
+        fg="red",
+    )
+    exit(1)
+
+
+if __name__ == "__main__":
+    client()
@@ -0,0 +1,150 @@
+import json
+import mmap
+import os
+from contextlib import contextmanager
+
+# Optional JSON parsers, in order of preference. They are imported when the
+# first document is parsed, so the CLI starts without them.
+
+JSON_BACKEND_ENV = "VALIDATE_DEVSCHEMA_JSON_BACKEND"
+JSON_BACKENDS = ("auto", "orjson", "msgspec", "json")
+
+# Smaller files are read into memory; mapping them costs more than it saves.
+MMAP_THRESHOLD = 1 << 20
+
+# orjson turns integers beyond 64 bits into floats instead of failing, so
+# documents with runs of 19 or more digits are left to the standard
+# library. Mapping every digit to "0" lets a plain substring search find
+# them much faster than a regular expression would.
+_LONG_DIGITS = 19
+_DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+_DIGITS_TO_ZERO_STR = str.maketrans("123456789", "000000000")
+_SCAN_CHUNK = 1 << 20
+
+_backend = None
+
+
+def _import_backend(name: str):
+    """
+    Return the name, parse function and error types of a backend, or None
+    if it is not installed.
+    """
+    if name == "orjson":
+        try:
+            import orjson
+        except ImportError:
+            return None
+        return name, orjson.loads, (orjson.JSONDecodeError,)
+    if name == "msgspec":
+        try:
+            import msgspec
+        except ImportError:
+            return None
+        return name, msgspec.json.decode, (msgspec.DecodeError,)
+    return "json", json.loads, ()
+
+
+def set_backend(name: str = "auto") -> str:
+    """
+    Select the parser used for JSON documents.
+
+    Args:
+        name: One of `JSON_BACKENDS`. "auto" picks orjson, then msgspec,
+            whichever is installed, and the standard library otherwise.
+
+    Returns:
+        The name of the selected backend.
+
+    Raises:
+        ValueError: If the backend is unknown or not installed.
+    """
+    global _backend
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    if name == "auto":
+        for candidate in JSON_BACKENDS[1:]:
+            backend = _import_backend(candidate)
+            if backend is not None:
+                break
+    else:
+        backend = _import_backend(name)
+        if backend is None:
+            raise ValueError(f"JSON backend is not installed: {name}")
+    _backend = backend
+    return backend[0]
+
+
+def get_backend() -> str:
+    """
+    Return the name of the JSON backend, selecting it from the environment
+    on first use.
+    """
+    return (_backend or _select_default())[0]
+
+
+def _select_default():
+    set_backend(os.environ.get(JSON_BACKEND_ENV) or "auto")
+    return _backend
+
+
+def loads(data):
+    """
+    Parse a JSON document with the selected backend.
+
+    Documents the backend rejects, or may parse differently, go to the
+    standard library, so results match `json.loads` for input such as NaN,
+    integers beyond 64 bits or non-UTF-8 encodings, and errors are always
+    `json.JSONDecodeError` with a line and column.
+
+    Args:
+        data: The document as str, bytes or an mmap.
+
+    Returns:
+        The parsed JSON value.
+    """
+    name, parse, errors = _backend or _select_default()
+    if name != "json" and not (name == "orjson" and _long_digits(data)):
+        try:
+            if isinstance(data, (str, bytes)):
+                return parse(data)
+            with memoryview(data) as view:
+                return parse(view)
+        except errors:
+            pass
+    if not isinstance(data, (str, bytes)):
+        data = bytes(data)
+    return json.loads(data)
+
+
+def _long_digits(data) -> bool:
+    if isinstance(data, str):
+        return "0" * _LONG_DIGITS in data.translate(_DIGITS_TO_ZERO_STR)
+    # Chunks overlap so that runs across their boundaries are found, and
+    # keep the copies small for memory-mapped files.
+    for start in range(0, len(data), _SCAN_CHUNK):
+        end = start + _SCAN_CHUNK + _LONG_DIGITS - 1
+        chunk = data[start:end]
+        if b"0" * _LONG_DIGITS in chunk.translate(_DIGITS_TO_ZERO):
+            return True
+    return False
+
+
+@contextmanager
+def read_file(path: str):
+    """
+    Read a file as bytes, memory-mapping files of `MMAP_THRESHOLD` bytes or
+    more instead of copying them.
+
+    Args:
+        path: The file to read.
+
+    Yields:
+        The file's bytes, or a read-only mmap of them that is closed when
+        the context exits.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
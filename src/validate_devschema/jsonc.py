@@ -0,0 +1,70 @@
+import json
+import re
+from . import fastjson
+
+# One alternation so that strings are consumed whole and comment markers or
+# commas inside them are left alone. A comma is trailing when only
+# whitespace and comments separate it from a closing bracket.
+_TOKEN = re.compile(
+    r'"(?:[^"\\]|\\.)*"'
+    r"|//[^\r\n]*"
+    r"|/\*.*?\*/"
+    r"|,(?=(?:\s|//[^\r\n]*|/\*.*?\*/)*[\]}])",
+    re.DOTALL,
+)
+_NOT_NEWLINE = re.compile(r"[^\r\n]")
+
+
+def _blank(match: re.Match) -> str:
+    token = match.group()
+    if token[0] == '"':
+        return token
+    if token[0] == ",":
+        return " "
+    # Keep line breaks so that error positions still match the original.
+    return _NOT_NEWLINE.sub(" ", token)
+
+
+def strip_jsonc(text: str) -> str:
+    """
+    Blank out the comments and trailing commas of a JSONC document.
+
+    Every removed character is replaced by a space and line breaks are
+    kept, so line and column positions in the result match the original.
+
+    Args:
+        text: The JSONC document.
+
+    Returns:
+        The document as plain JSON.
+    """
+    return _TOKEN.sub(_blank, text)
+
+
+def loads(data):
+    """
+    Parse a JSONC document: JSON with `//` and `/* */` comments and
+    trailing commas, as used by devcontainer.json.
+
+    Every document is parsed as plain JSON with `fastjson.loads` first,
+    and only decoded and stripped if that fails. Comments and trailing
+    commas are never valid JSON, so this never changes the result, and
+    large plain documents are not scanned for comment markers.
+
+    Args:
+        data: The JSONC document as str, UTF-8 bytes or an mmap of them.
+
+    Returns:
+        The parsed JSON object.
+
+    Raises:
+        json.JSONDecodeError: If the document is invalid, with the line and
+            column of the error in the original text.
+    """
+    try:
+        return fastjson.loads(data)
+    except json.JSONDecodeError:
+        pass
+    if not isinstance(data, str):
+        data = str(data, "utf-8-sig")
+    return fastjson.loads(strip_jsonc(data))
@@ -1,11 +1,36 @@
+import os
+import time
 import click
-from .validate_schema import validate_schema
-from .utils import load_json, is_url
+from .batch import Preloader, check_files, schema_fingerprint, validate_files
+from .bundle import BUNDLE_ENV, load_bundle
+from .validate_schema import RESOLUTION_MODES, CompiledSchema, compile_schema
+from .watch import DEFAULT_POLL_INTERVAL, watch_files
+from .cache import CACHE_DIR_ENV, RESULT_CACHE_ENV, HttpCache, ResultCache
+from .fastjson import JSON_BACKEND_ENV, JSON_BACKENDS, set_backend
+from .report import REPORT_FORMATS, write_report
+from .profiling import (
+    PROFILE_ENV,
+    reset_profiler,
+    write_profile,
+    write_step_summary,
+)
+from .utils import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_RETRIES,
+    DEFAULT_RETRY_BACKOFF,
+    configure_session,
+    expand_data_paths,
+    get_http_cache,
+    is_url,
+    load_json,
+    set_http_cache,
+)
 
 
 @click.command()
 @click.argument("schema", required=False, type=str)
-@click.argument("data", required=False, type=str)
+@click.argument("data", nargs=-1, type=str)
 @click.option(
     "--schema",
     "-s",
@@ -14,18 +39,181 @@ from .utils import load_json, is_url
     help="Path or URL to the JSON schema.",
 )
 @click.option(
-    "--data", "-d", "data_flag", type=str, help="Path or URL to the JSON data."
+    "--data",
+    "-d",
+    "data_flag",
+    type=str,
+    multiple=True,
+    help="Path, URL, directory or glob of JSON data. Can be repeated.",
+)
+@click.option(
+    "--files-from",
+    type=click.File("r"),
+    help="Read data paths from a file, one per line ('-' for stdin).",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    envvar=CACHE_DIR_ENV,
+    help="Directory for caching fetched schemas between runs.",
+)
+@click.option(
+    "--result-cache",
+    type=click.Path(file_okay=False),
+    envvar=RESULT_CACHE_ENV,
+    help="Directory for caching validation results, so documents that did "
+    "not change since the last run are skipped.",
+)
+@click.option(
+    "--connect-timeout",
+    type=float,
+    default=DEFAULT_CONNECT_TIMEOUT,
+    show_default=True,
+    help="Seconds to wait for a connection when fetching a URL.",
+)
+@click.option(
+    "--read-timeout",
+    type=float,
+    default=DEFAULT_READ_TIMEOUT,
+    show_default=True,
+    help="Seconds to wait for data when fetching a URL.",
+)
+@click.option(
+    "--retries",
+    type=click.IntRange(min=0),
+    default=DEFAULT_RETRIES,
+    show_default=True,
+    help="Maximum number of retries for a failed fetch.",
+)
+@click.option(
+    "--retry-backoff",
+    type=float,
+    default=DEFAULT_RETRY_BACKOFF,
+    show_default=True,
+    help="Backoff factor in seconds between retries.",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Number of worker processes for validating many documents "
+    "(0 for one per CPU).",
+)
+@click.option(
+    "--resolution",
+    type=click.Choice(RESOLUTION_MODES),
+    default="eager",
+    show_default=True,
+    help="Expand every $ref up front (eager) or resolve refs only when "
+    "validation reaches them (lazy).",
+)
+@click.option(
+    "--bundle",
+    "bundle_path",
+    type=str,
+    envvar=BUNDLE_ENV,
+    help="Validate against a schema bundle instead of SCHEMA, without "
+    "fetching or resolving anything.",
+)
+@click.option(
+    "--json-backend",
+    type=click.Choice(JSON_BACKENDS),
+    default="auto",
+    show_default=True,
+    envvar=JSON_BACKEND_ENV,
+    help="Parser for JSON documents; auto uses orjson or msgspec when "
+    "installed and the standard library otherwise.",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Validate local data files member by member while reading them, "
+    "so memory use is bounded by the largest top-level value. Files must "
+    "be strict JSON.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(REPORT_FORMATS),
+    default="text",
+    show_default=True,
+    help="Report format. json and sarif collect every error of every "
+    "document, with JSON Pointers to the failing value and schema keyword, "
+    "and bypass the result cache.",
+)
+@click.option(
+    "--output",
+    type=click.File("w"),
+    default="-",
+    help="File to write the json or sarif report to (default: stdout).",
+)
+@click.option(
+    "--profile",
+    type=str,
+    envvar=PROFILE_ENV,
+    help="Write per-phase timings and counters as JSON to this file "
+    "('-' for stderr).",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Keep the compiled schema in memory and revalidate data files "
+    "whenever they change.",
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=0, min_open=True),
+    default=DEFAULT_POLL_INTERVAL,
+    show_default=True,
+    help="Seconds between checks for changed files in watch mode.",
 )
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output.")
-def main(schema, data, schema_flag, data_flag, verbose):
+def main(
+    schema,
+    data,
+    schema_flag,
+    data_flag,
+    files_from,
+    cache_dir,
+    result_cache,
+    connect_timeout,
+    read_timeout,
+    retries,
+    retry_backoff,
+    jobs,
+    resolution,
+    bundle_path,
+    json_backend,
+    stream,
+    output_format,
+    output,
+    profile,
+    watch,
+    poll_interval,
+    verbose,
+):
     """
-    Validate a JSON file or URL (DATA) against a JSON schema file or URL
+    Validate JSON files or URLs (DATA) against a JSON schema file or URL
     (SCHEMA).
+
+    DATA can be given several times and may name directories, which are
+    searched for devcontainer files, or glob patterns. The schema is loaded
+    and resolved once for all documents.
     """
+    profiler = reset_profiler()
     schema_path = schema_flag or schema
-    data_path = data_flag or data
+    data_args = list(data_flag) + list(data)
+    if bundle_path:
+        schema_path = bundle_path
+    if schema and (schema_flag or bundle_path):
+        # With --schema or a bundle every positional argument is a data path.
+        data_args.insert(len(data_flag), schema)
+    if files_from is not None:
+        data_args.extend(line.strip() for line in files_from if line.strip())
 
-    if not schema_path or not data_path:
+    if not schema_path or not data_args:
         click.secho(
             "ERROR: Either provide positional arguments <schema> <data> or "
             "use the --schema and --data options.",
@@ -33,41 +221,156 @@ def main(schema, data, schema_flag, data_flag, verbose):
         )
         exit(1)
 
+    if output_format != "text" and (stream or watch):
+        click.secho(
+            f"ERROR: --format {output_format} cannot be combined with "
+            "--stream or --watch.",
+            fg="red",
+        )
+        exit(1)
+
+    configure_session(
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        retries=retries,
+        retry_backoff=retry_backoff,
+    )
+    if cache_dir:
+        set_http_cache(HttpCache(cache_dir))
+    try:
+        backend = set_backend(json_backend)
+    except ValueError as e:
+        click.secho(f"ERROR: {e}", fg="red")
+        exit(1)
+    if verbose:
+        click.secho(f"INFO: Parsing JSON with {backend}.", fg="blue")
+
+    data_paths = expand_data_paths(data_args, verbose)
+    if not data_paths:
+        click.secho("ERROR: No data files matched the given paths.", fg="red")
+        exit(1)
+
     if verbose:
         schema_type = "URL" if is_url(schema_path) else "file"
-        data_type = "URL" if is_url(data_path) else "file"
         click.secho(
             f"INFO: Schema is a {schema_type}: {schema_path}", fg="blue"
         )
-        click.secho(f"INFO: Data is a {data_type}: {data_path}", fg="blue")
-        click.secho(
-            f"INFO: Validating {data_path} against {schema_path}...",
-            fg="yellow",
-        )
+
+    jobs = jobs or os.cpu_count() or 1
+    preloader = None
+    # Documents validated in this process are loaded while the schema loads
+    # and its references are prefetched, instead of after. Streamed and
+    # result-cached documents are read by their own code paths.
+    if (jobs == 1 or len(data_paths) == 1) and not stream:
+        if output_format != "text" or not result_cache:
+            preloader = Preloader(data_paths, verbose)
 
     try:
-        schema = load_json(schema_path, verbose=verbose)
-        data = load_json(data_path, verbose=verbose)
+        if bundle_path:
+            bundle = load_bundle(bundle_path, verbose)
+            compiled = CompiledSchema(
+                bundle["schema"], bundle.get("documents")
+            )
+        else:
+            schema = load_json(schema_path, verbose=verbose)
+            compiled = compile_schema(schema, schema_path, verbose, resolution)
+        if preloader is not None:
+            schema_seconds = time.monotonic() - preloader.started
+        if output_format != "text":
+            with profiler.phase("validate_files"):
+                outcomes = check_files(
+                    compiled, data_paths, jobs=jobs, preloader=preloader
+                )
+            if preloader is not None:
+                preloader.report_overlap(schema_seconds, verbose)
+            write_report(outcomes, schema_path, output_format, output)
+            exit(0 if all(outcome["valid"] for outcome in outcomes) else 1)
+
+        results = None
+        if result_cache:
+            results = ResultCache(result_cache, schema_fingerprint(compiled))
 
-        success = validate_schema(schema, data, schema_path, verbose)
+        # With several jobs the per-document phases run in the workers and
+        # only show up in this wall-clock total.
+        with profiler.phase("validate_files"):
+            failed = validate_files(
+                compiled,
+                data_paths,
+                schema_path,
+                verbose,
+                jobs=jobs,
+                results=results,
+                stream=stream,
+                preloader=preloader,
+            )
+        if preloader is not None:
+            preloader.report_overlap(schema_seconds, verbose)
+        report_cache_stats()
+        # Counters stay in the workers when validating on a process pool.
+        if results is not None and results.hits + results.misses:
+            stats = results.stats()
+            click.secho(
+                f"INFO: Result cache: {stats['hits']} unchanged, "
+                f"{stats['misses']} validated.",
+                fg="blue",
+            )
 
-        if success:
+        if not failed:
             click.secho(
                 "✅ INFO: Schema validation completed successfully.",
                 fg="green",
             )
         else:
+            if len(data_paths) > 1:
+                click.secho(
+                    f"ERROR: {len(failed)} of {len(data_paths)} documents "
+                    "failed validation:",
+                    fg="red",
+                )
+                for data_path in failed:
+                    click.secho(f"  - {data_path}", fg="red")
             click.secho(
                 "❌ ERROR: Schema validation failed. Please check the errors.",
                 fg="red",
             )
-        exit(0 if success else 1)
+        if watch:
+            watch_files(
+                compiled,
+                data_paths,
+                schema_path,
+                verbose,
+                poll_interval,
+                results=results,
+                stream=stream,
+            )
+            exit(0)
+        exit(0 if not failed else 1)
 
     except Exception as e:
         click.secho(f"ERROR: {e}", fg="red")
         if verbose:
             click.secho(f"DEBUG: Exception details: {e}", fg="red")
         exit(1)
+    finally:
+        if profile:
+            report = profiler.report()
+            write_profile(report, profile)
+            write_step_summary(report)
+
+
+def report_cache_stats() -> None:
+    """
+    Print the hit/miss counters of the HTTP cache, if one is configured.
+    """
+    cache = get_http_cache()
+    if cache is None:
+        return
+    stats = cache.stats()
+    click.secho(
+        f"INFO: Schema cache: {stats['hits']} hits "
+        f"({stats['revalidated']} revalidated), {stats['misses']} misses.",
+        fg="blue",
+    )
 
 
 if __name__ == "__main__":
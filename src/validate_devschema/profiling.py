@@ -0,0 +1,139 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+PROFILE_ENV = "VALIDATE_DEVSCHEMA_PROFILE"
+COUNTERS = ("documents_fetched", "bytes_read", "refs_resolved")
+
+
+class Profiler:
+    """
+    Accumulates monotonic wall-clock time per phase and run counters.
+
+    Phases may nest (fetching happens while resolving, for example) and
+    concurrent fetches each add their own time, so phase totals can add up
+    to more than the total run time.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.phases = {}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.savings = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time the enclosed block as one call of a phase.
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            with self._lock:
+                phase = self.phases.setdefault(
+                    name, {"seconds": 0.0, "calls": 0}
+                )
+                phase["seconds"] += elapsed
+                phase["calls"] += 1
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+        Increase a counter.
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def save(self, name: str, seconds: float) -> None:
+        """
+        Record wall-clock time saved by running work concurrently, such as
+        loading data while the schema loads.
+        """
+        with self._lock:
+            self.savings[name] = self.savings.get(name, 0.0) + seconds
+
+    def report(self) -> dict:
+        """
+        Return the collected timings and counters.
+        """
+        with self._lock:
+            return {
+                "total_seconds": time.monotonic() - self.started,
+                "phases": {
+                    name: dict(phase) for name, phase in self.phases.items()
+                },
+                "counters": dict(self.counters),
+                "saved_seconds": dict(self.savings),
+            }
+
+
+_profiler = Profiler()
+
+
+def get_profiler() -> Profiler:
+    """
+    Return the profiler of the current run.
+    """
+    return _profiler
+
+
+def reset_profiler() -> Profiler:
+    """
+    Start a new profiler for the current run and return it.
+    """
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+
+def write_profile(report: dict, destination: str) -> None:
+    """
+    Write a profile report as JSON.
+
+    Args:
+        report: The report from `Profiler.report`.
+        destination: The file to write to, or "-" for stderr.
+    """
+    if destination == "-":
+        json.dump(report, sys.stderr, indent=2)
+        sys.stderr.write("\n")
+        return
+    with open(destination, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+
+def write_step_summary(report: dict) -> None:
+    """
+    Append the profile as a Markdown table to the GitHub Actions step
+    summary, if running under GitHub Actions.
+    """
+    summary_path = os.environ.get("GITHUB_STEP_SUMMARY")
+    if not summary_path:
+        return
+
+    lines = [
+        "### validate-devschema profile",
+        "",
+        f"Total: {report['total_seconds']:.4f} s",
+        "",
+        "| Phase | Seconds | Calls |",
+        "| - | -: | -: |",
+    ]
+    for name, phase in report["phases"].items():
+        lines.append(f"| {name} | {phase['seconds']:.4f} | {phase['calls']} |")
+    lines += ["", "| Counter | Value |", "| - | -: |"]
+    for name, value in report["counters"].items():
+        lines.append(f"| {name} | {value} |")
+    if report.get("saved_seconds"):
+        lines += ["", "| Overlap | Seconds saved |", "| - | -: |"]
+        for name, seconds in report["saved_seconds"].items():
+            lines.append(f"| {name} | {seconds:.4f} |")
+
+    with open(summary_path, "a") as f:
+        f.write("\n".join(lines) + "\n")
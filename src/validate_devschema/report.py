@@ -0,0 +1,129 @@
+import json
+
+REPORT_FORMATS = ("text", "json", "sarif")
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+TOOL_NAME = "validate-devschema"
+TOOL_URI = "https://github.com/actionsforge/actions-validate-devschema"
+
+# Rule id for documents that could not be loaded or parsed, which have no
+# schema keyword to report.
+LOAD_RULE = "load"
+
+
+def build_report(results: list[dict], schema_path: str) -> dict:
+    """
+    Build the JSON report of a run.
+
+    Args:
+        results: The results of `batch.check_files`.
+        schema_path: The path or URL of the schema.
+
+    Returns:
+        A dict with the schema, the overall "valid" flag and the result of
+        every document.
+    """
+    return {
+        "schema": schema_path,
+        "valid": all(result["valid"] for result in results),
+        "results": results,
+    }
+
+
+def build_sarif(results: list[dict], schema_path: str) -> dict:
+    """
+    Build a SARIF 2.1.0 log of a run, for code scanning tools.
+
+    Each error becomes a result whose rule is the failing schema keyword,
+    located in the document's file and, logically, at the JSON Pointer of
+    the failing value.
+
+    Args:
+        results: The results of `batch.check_files`.
+        schema_path: The path or URL of the schema.
+
+    Returns:
+        The SARIF log.
+    """
+    rules = {}
+    sarif_results = []
+    for result in results:
+        uri = {"uri": result["path"]}
+        location = {"physicalLocation": {"artifactLocation": uri}}
+        if result["error"] is not None:
+            rules.setdefault(LOAD_RULE, "The document could not be loaded.")
+            sarif_results.append(
+                {
+                    "ruleId": LOAD_RULE,
+                    "level": "error",
+                    "message": {"text": result["error"]},
+                    "locations": [location],
+                }
+            )
+        for error in result["errors"]:
+            keyword = error["keyword"]
+            rules.setdefault(keyword, f"The '{keyword}' keyword failed.")
+            sarif_results.append(
+                {
+                    "ruleId": keyword,
+                    "level": "error",
+                    "message": {"text": error["message"]},
+                    "locations": [
+                        {
+                            **location,
+                            "logicalLocations": [
+                                {
+                                    "fullyQualifiedName": error[
+                                        "instance_path"
+                                    ],
+                                    "kind": "member",
+                                }
+                            ],
+                        }
+                    ],
+                    "properties": {
+                        "instancePath": error["instance_path"],
+                        "schemaPath": error["schema_path"],
+                        "schema": schema_path,
+                    },
+                }
+            )
+
+    return {
+        "$schema": SARIF_SCHEMA,
+        "version": "2.1.0",
+        "runs": [
+            {
+                "tool": {
+                    "driver": {
+                        "name": TOOL_NAME,
+                        "informationUri": TOOL_URI,
+                        "rules": [
+                            {"id": rule, "shortDescription": {"text": text}}
+                            for rule, text in rules.items()
+                        ],
+                    }
+                },
+                "results": sarif_results,
+            }
+        ],
+    }
+
+
+def write_report(
+    results: list[dict], schema_path: str, output_format: str, f
+) -> None:
+    """
+    Write the report of a run as JSON or SARIF.
+
+    Args:
+        results: The results of `batch.check_files`.
+        schema_path: The path or URL of the schema.
+        output_format: "json" or "sarif".
+        f: The text file to write to.
+    """
+    if output_format == "sarif":
+        report = build_sarif(results, schema_path)
+    else:
+        report = build_report(results, schema_path)
+    json.dump(report, f, indent=2)
+    f.write("\n")
@@ -0,0 +1,271 @@
+import io
+import json
+import os
+import stat
+import threading
+from collections import OrderedDict
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import UnixStreamServer
+import click
+from .batch import validate_file
+from .cache import CACHE_DIR_ENV, HttpCache
+from .utils import (
+    configure_session,
+    expand_data_paths,
+    is_url,
+    load_json,
+    set_http_cache,
+)
+from .validate_schema import RESOLUTION_MODES, CompiledSchema, compile_schema
+from .watch import file_state
+
+DEFAULT_MAX_SCHEMAS = 16
+DEFAULT_PORT = 8765
+SOCKET_ENV = "VALIDATE_DEVSCHEMA_SOCKET"
+
+
+class SchemaStore:
+    """
+    A bounded LRU of compiled schemas keyed by schema URL and resolution
+    mode. Schemas loaded from files are recompiled when the file changes.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SCHEMAS):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, schema_url: str, resolution: str = "eager", verbose=False
+    ) -> CompiledSchema:
+        """
+        Return the compiled schema for a URL or path, compiling it on a
+        miss.
+        """
+        key = (schema_url, resolution)
+        state = None if is_url(schema_url) else file_state(schema_url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == state:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        schema = load_json(schema_url, verbose=verbose)
+        compiled = compile_schema(schema, schema_url, verbose, resolution)
+        with self._lock:
+            self._entries[key] = (state, compiled)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def handle_request(store: SchemaStore, request: dict) -> dict:
+    """
+    Validate the documents of a request against its schema.
+
+    Args:
+        store: The compiled schemas.
+        request: A dict with the "schema" URL or path, the "data" paths,
+            directories or globs, and optionally the "resolution" mode and
+            a "verbose" flag.
+
+    Returns:
+        A dict with the overall "valid" flag and a "results" entry per
+        document, holding its path, flag and captured output.
+    """
+    schema_url = request["schema"]
+    data = request["data"]
+    resolution = request.get("resolution", "eager")
+    verbose = bool(request.get("verbose", False))
+    if resolution not in RESOLUTION_MODES:
+        raise ValueError(f"Unknown resolution mode: {resolution}")
+    if not isinstance(data, list) or not all(
+        isinstance(path, str) for path in data
+    ):
+        raise ValueError('"data" must be a list of paths')
+
+    compiled = store.get(schema_url, resolution, verbose)
+    results = []
+    for data_path in expand_data_paths(data, verbose):
+        output = io.StringIO()
+        # The server handles one request at a time, so redirecting the
+        # process-wide stdout is safe here.
+        with redirect_stdout(output):
+            valid = validate_file(compiled, data_path, schema_url, verbose)
+        results.append(
+            {"path": data_path, "valid": valid, "output": output.getvalue()}
+        )
+    return {
+        "valid": all(result["valid"] for result in results),
+        "results": results,
+    }
+
+
+class ValidationHandler(BaseHTTPRequestHandler):
+    """
+    Serves `POST /validate` with a JSON request for `handle_request`.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        if self.path != "/validate":
+            self._respond(404, {"error": f"Not found: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            response = handle_request(self.server.store, request)
+        except Exception as e:
+            self._respond(400, {"error": str(e)})
+            return
+        self._respond(200, response)
+
+    def _respond(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            click.secho(f"INFO: {format % args}", fg="blue", err=True)
+
+
+class ValidationServer(HTTPServer):
+    """
+    Validation server on a localhost TCP port.
+    """
+
+    def __init__(self, address, store: SchemaStore, verbose: bool = False):
+        self.store = store
+        self.verbose = verbose
+        super().__init__(address, ValidationHandler)
+
+
+class UnixValidationServer(UnixStreamServer):
+    """
+    Validation server on a Unix socket that only its owner can connect to.
+    """
+
+    def __init__(self, path: str, store: SchemaStore, verbose=False):
+        self.store = store
+        self.verbose = verbose
+        super().__init__(path, ValidationHandler)
+
+    def server_bind(self):
+        # Create the socket with mode 0600 rather than tightening it after
+        # bind, so no other user can connect in between.
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address.
+        return request, ("unix", 0)
+
+
+def remove_stale_socket(path: str) -> bool:
+    """
+    Remove a socket left behind by a previous daemon.
+
+    Args:
+        path: The socket path to listen on.
+
+    Returns:
+        False if the path exists and is not a socket, which is left alone,
+        True otherwise.
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return True
+    if not stat.S_ISSOCK(mode):
+        return False
+    os.unlink(path)
+    return True
+
+
+@click.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    envvar=SOCKET_ENV,
+    help="Listen on this Unix socket instead of a TCP port.",
+)
+@click.option(
+    "--port",
+    type=click.IntRange(min=0, max=65535),
+    default=DEFAULT_PORT,
+    show_default=True,
+    help=(
+        "Localhost TCP port to listen on. Any local user can send requests "
+        "to it; prefer --socket on shared machines."
+    ),
+)
+@click.option(
+    "--max-schemas",
+    type=click.IntRange(min=1),
+    default=DEFAULT_MAX_SCHEMAS,
+    show_default=True,
+    help="Number of compiled schemas to keep in memory.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    envvar=CACHE_DIR_ENV,
+    help="Directory for caching fetched schemas between runs.",
+)
+@click.option("--verbose", "-v", is_flag=True, help="Enable verbose output.")
+def serve(socket_path, port, max_schemas, cache_dir, verbose):
+    """
+    Run a local validation daemon that keeps resolved schemas and compiled
+    validators in memory between requests.
+
+    The daemon does not authenticate requests and reads any path it is
+    sent, and its error messages can quote the contents of those files.
+    The Unix socket is only accessible to its owner, but the TCP port is
+    open to every local user, so only use --port on single-user machines.
+    """
+    configure_session()
+    if cache_dir:
+        set_http_cache(HttpCache(cache_dir))
+    store = SchemaStore(max_schemas)
+
+    if socket_path:
+        if not remove_stale_socket(socket_path):
+            click.secho(
+                f"ERROR: {socket_path} exists and is not a socket.",
+                fg="red",
+            )
+            exit(1)
+        server = UnixValidationServer(socket_path, store, verbose)
+        address = socket_path
+    else:
+        server = ValidationServer(("127.0.0.1", port), store, verbose)
+        address = f"http://127.0.0.1:{server.server_port}"
+
+    click.secho(f"INFO: Serving validation requests on {address}", fg="blue")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        click.secho("INFO: Stopped serving.", fg="blue")
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+if __name__ == "__main__":
+    serve()
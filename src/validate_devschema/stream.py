@@ -0,0 +1,270 @@
+import codecs
+import json
+import re
+import click
+from . import fastjson
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Within a container only brackets and the start of strings matter; within
+# a string only its closing quote and escapes do.
+_STRUCTURE = re.compile(r'[\[\]{}"]')
+_STRING = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r"[,}\] \t\n\r]")
+_DECODER = json.JSONDecoder()
+
+
+class _Reader:
+    """
+    Reads a JSON document in chunks and cuts it into top-level values.
+
+    Only the current chunk, and the parts of the value being read, are held
+    in memory.
+    """
+
+    def __init__(self, f, chunk_size: int, hasher=None):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.hasher = hasher
+        self.decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.text = ""
+        self.pos = 0
+        # Line breaks before the current chunk, and the length of the line
+        # the chunk starts in, for error locations.
+        self.lines = 0
+        self.column = 0
+
+    def next_chunk(self) -> bool:
+        """
+        Replace the current chunk with the next one, returning False at the
+        end of the document.
+        """
+        while True:
+            data = self.f.read(self.chunk_size)
+            if self.hasher is not None:
+                self.hasher.update(data)
+            self.lines += self.text.count("\n")
+            last = self.text.rfind("\n")
+            if last == -1:
+                self.column += len(self.text)
+            else:
+                self.column = len(self.text) - last - 1
+            self.text = self.decoder.decode(data, final=not data)
+            self.pos = 0
+            # A chunk may end inside a multi-byte character and decode to
+            # nothing; keep reading until there is text or no more data.
+            if self.text or not data:
+                return bool(self.text)
+
+    def mark(self) -> tuple:
+        """
+        Return the current position, to be turned into a line and column
+        by `location` only if it is needed for an error.
+        """
+        return self.lines, self.column, self.text, self.pos
+
+    def location(self, mark: tuple | None = None) -> tuple[int, int]:
+        """
+        Return the line and column of a mark, or of the current position.
+        """
+        lines, column, text, pos = mark or self.mark()
+        line = lines + text.count("\n", 0, pos) + 1
+        last = text.rfind("\n", 0, pos)
+        if last == -1:
+            return line, column + pos + 1
+        return line, pos - last
+
+    def error(self, message: str) -> ValueError:
+        line, column = self.location()
+        return ValueError(f"{message}: line {line} column {column}")
+
+    def peek(self) -> str:
+        """
+        Skip whitespace and return the next character, or "" at the end of
+        the document.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.next_chunk():
+                return ""
+
+    def read_value(self) -> str:
+        """
+        Consume the JSON value at the current position and return its text.
+
+        The value is only delimited here, by tracking brackets and strings;
+        it is checked when it is decoded.
+        """
+        first = self.text[self.pos]
+        depth = 1 if first in "{[" else 0
+        in_string = first == '"'
+        scalar = not depth and not in_string
+        escaped = False
+        parts = []
+        begin = self.pos
+        i = self.pos + 1
+        while True:
+            text = self.text
+            end = -1
+            while i < len(text):
+                if escaped:
+                    i += 1
+                    escaped = False
+                    continue
+                if scalar:
+                    match = _SCALAR_END.search(text, i)
+                elif in_string:
+                    match = _STRING.search(text, i)
+                else:
+                    match = _STRUCTURE.search(text, i)
+                if match is None:
+                    break
+                char = match.group()
+                i = match.end()
+                if scalar:
+                    end = match.start()
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = not in_string
+                    if not in_string and not depth:
+                        end = i
+                elif char in "{[":
+                    depth += 1
+                else:
+                    depth -= 1
+                    if not depth:
+                        end = i
+                if end >= 0:
+                    parts.append(text[begin:end])
+                    self.pos = end
+                    return "".join(parts)
+            parts.append(text[begin:])
+            if not self.next_chunk():
+                if scalar:
+                    return "".join(parts)
+                raise self.error("Unterminated value")
+            begin = i = 0
+
+    def decode_value(self):
+        """
+        Consume and decode the JSON value at the current position.
+
+        Values that lie within the current chunk, and are followed by more
+        text in it, are decoded in place by the standard library's C
+        scanner. Only values that cross into the next chunk, or fail to
+        parse, are delimited by `read_value` and decoded with
+        `fastjson.loads`.
+
+        Raises:
+            ValueError: If the value is not valid JSON, with the line and
+                column of the error.
+        """
+        try:
+            value, end = _DECODER.raw_decode(self.text, self.pos)
+        except json.JSONDecodeError:
+            pass
+        else:
+            # A number at the end of the chunk may continue in the next,
+            # and one cut after its "." or exponent mark is only a prefix.
+            if end < len(self.text) and self.text[end] not in ".eE":
+                self.pos = end
+                return value
+        mark = self.mark()
+        text = self.read_value()
+        try:
+            return fastjson.loads(text)
+        except json.JSONDecodeError as e:
+            line, column = self.location(mark)
+            if e.lineno == 1:
+                column += e.colno - 1
+            else:
+                column = e.colno
+            raise ValueError(
+                f"{e.msg}: line {line + e.lineno - 1} column {column}"
+            ) from None
+
+
+def iter_items(f, chunk_size: int = DEFAULT_CHUNK_SIZE, hasher=None):
+    """
+    Iterate over the top-level members of a JSON object as they are read.
+
+    The document is read in chunks and each member value is decoded as
+    soon as it is complete, so memory use is bounded by the largest single
+    value rather than by the size of the document.
+    Duplicate keys are yielded once per occurrence.
+
+    Args:
+        f: A binary file object holding a UTF-8 JSON object.
+        chunk_size: Number of bytes to read at a time.
+        hasher: An optional hash object updated with every byte read.
+
+    Yields:
+        Tuples of key and decoded value, in document order.
+
+    Raises:
+        ValueError: If the document is not a valid JSON object, with the
+            line and column of the error.
+    """
+    reader = _Reader(f, chunk_size, hasher)
+    if reader.peek() != "{":
+        raise reader.error("Expecting a JSON object at the top level")
+    reader.pos += 1
+    char = reader.peek()
+    while char != "}":
+        if char != '"':
+            raise reader.error(
+                "Expecting property name enclosed in double quotes"
+            )
+        key = reader.decode_value()
+        if reader.peek() != ":":
+            raise reader.error("Expecting ':' delimiter")
+        reader.pos += 1
+        if not reader.peek():
+            raise reader.error("Expecting value")
+        yield key, reader.decode_value()
+
+        char = reader.peek()
+        if char == ",":
+            reader.pos += 1
+            char = reader.peek()
+            if char == "}":
+                raise reader.error(
+                    "Expecting property name enclosed in double quotes"
+                )
+        elif char != "}":
+            raise reader.error("Expecting ',' delimiter")
+    reader.pos += 1
+    if reader.peek():
+        raise reader.error("Extra data")
+
+
+def validate_stream(
+    compiled,
+    path: str,
+    verbose: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    hasher=None,
+) -> bool:
+    """
+    Validate a JSON document file member by member while it is read.
+
+    Args:
+        compiled: The `CompiledSchema` to validate against.
+        path: The path of the document.
+        verbose: Flag to enable verbose output.
+        chunk_size: Number of bytes to read at a time.
+        hasher: An optional hash object updated with the document's bytes.
+
+    Returns:
+        True if validation is successful, False otherwise.
+    """
+    if verbose:
+        click.secho(f"INFO: Streaming JSON from file: {path}", fg="blue")
+    with open(path, "rb") as f:
+        return compiled.validate_items(
+            iter_items(f, chunk_size, hasher), verbose
+        )
@@ -1,7 +1,123 @@
+import glob
 import json
-import requests
-from urllib.parse import urlparse
+import os
+from contextlib import ExitStack
+from urllib.parse import urljoin, urlparse
 import click
+from . import fastjson, jsonc
+from .profiling import get_profiler
+
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+DEVCONTAINER_FILENAMES = ("devcontainer.json", ".devcontainer.json")
+
+_http_cache = None
+_session = None
+_session_options = {}
+_timeout = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+
+
+def configure_session(
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    read_timeout: float = DEFAULT_READ_TIMEOUT,
+    retries: int = DEFAULT_RETRIES,
+    retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+    pool_size: int = 10,
+) -> None:
+    """
+    Configure the shared HTTP session used for every schema fetch.
+
+    The session keeps connections alive between requests to the same host
+    and retries failed connections and transient server errors with an
+    exponential backoff. It is only created, and requests only imported,
+    when the first URL is fetched.
+
+    Args:
+        connect_timeout: Seconds to wait for a connection to be established.
+        read_timeout: Seconds to wait for the server to send data.
+        retries: Maximum number of retries per request.
+        retry_backoff: Backoff factor between retries, in seconds.
+        pool_size: Maximum number of pooled connections per host.
+    """
+    global _session, _session_options, _timeout
+    if _session is not None:
+        _session.close()
+    _session = None
+    _session_options = {
+        "retries": retries,
+        "retry_backoff": retry_backoff,
+        "pool_size": pool_size,
+    }
+    _timeout = (connect_timeout, read_timeout)
+
+
+def get_session_config() -> dict:
+    """
+    Return the options of the last `configure_session` call, so another
+    process can be configured the same way.
+    """
+    return {
+        "connect_timeout": _timeout[0],
+        "read_timeout": _timeout[1],
+        **_session_options,
+    }
+
+
+def _create_session(
+    retries: int = DEFAULT_RETRIES,
+    retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+    pool_size: int = 10,
+):
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=retry_backoff,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    """
+    Return the shared `requests.Session`, creating it on first use.
+    """
+    global _session
+    if _session is None:
+        _session = _create_session(**_session_options)
+    return _session
+
+
+def set_http_cache(cache) -> None:
+    """
+    Set the HTTP cache used by `load_json` for URL fetches.
+
+    Args:
+        cache: An `HttpCache` instance, or None to disable caching.
+    """
+    global _http_cache
+    _http_cache = cache
+
+
+def get_http_cache():
+    """
+    Return the HTTP cache used by `load_json`, or None if caching is off.
+    """
+    return _http_cache
 
 
 def is_url(path: str) -> bool:
@@ -20,7 +136,11 @@ def is_url(path: str) -> bool:
 
 def load_json(path_or_url: str, verbose: bool = False) -> dict:
     """
-    Load JSON from a file or URL.
+    Load JSON from a file or URL. Files may be JSONC, with comments and
+    trailing commas.
+
+    Files are read as bytes, memory-mapped when large, and HTTP bodies are
+    parsed from the raw response bytes, both with the `fastjson` backend.
 
     Args:
         path_or_url: The path or URL to load JSON from.
@@ -30,15 +150,46 @@ def load_json(path_or_url: str, verbose: bool = False) -> dict:
         The loaded JSON object.
     """
     if is_url(path_or_url):
+        from requests import RequestException
+
         if verbose:
             click.secho(
                 f"INFO: Fetching JSON from URL: {path_or_url}", fg="blue"
             )
+        cache = _http_cache
         try:
-            response = requests.get(path_or_url)
+            entry = cache.lookup(path_or_url) if cache else None
+            if entry is not None and cache.is_fresh(entry):
+                if verbose:
+                    click.secho(
+                        f"INFO: Serving JSON from cache: {path_or_url}",
+                        fg="blue",
+                    )
+                return cache.serve(entry)
+
+            headers = cache.request_headers(entry) if cache else {}
+            profiler = get_profiler()
+            with profiler.phase("fetch"):
+                response = get_session().get(
+                    path_or_url, headers=headers, timeout=_timeout
+                )
+            profiler.count("documents_fetched")
+            profiler.count("bytes_read", len(response.content))
+
+            if entry is not None and response.status_code == 304:
+                if verbose:
+                    click.secho(
+                        f"INFO: Cached JSON not modified: {path_or_url}",
+                        fg="blue",
+                    )
+                return cache.revalidate(entry, response)
+
             response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
+            if cache is not None:
+                cache.store(path_or_url, response)
+            with profiler.phase("parse"):
+                return fastjson.loads(response.content)
+        except RequestException as e:
             if verbose:
                 click.secho(
                     f"ERROR: Failed to fetch JSON from URL: {e}", fg="red"
@@ -49,9 +200,14 @@ def load_json(path_or_url: str, verbose: bool = False) -> dict:
             click.secho(
                 f"INFO: Loading JSON from file: {path_or_url}", fg="blue"
             )
+        profiler = get_profiler()
         try:
-            with open(path_or_url, "r") as f:
-                return json.load(f)
+            with ExitStack() as stack:
+                with profiler.phase("read"):
+                    data = stack.enter_context(fastjson.read_file(path_or_url))
+                profiler.count("bytes_read", len(data))
+                with profiler.phase("parse"):
+                    return jsonc.loads(data)
         except (OSError, json.JSONDecodeError) as e:
             if verbose:
                 click.secho(
@@ -60,12 +216,92 @@ def load_json(path_or_url: str, verbose: bool = False) -> dict:
             raise
 
 
+def escape_pointer_token(token) -> str:
+    """
+    Escape a key or list index for use in a JSON Pointer.
+    """
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def json_pointer(path) -> str:
+    """
+    Build a JSON Pointer from a sequence of keys and list indices.
+    """
+    return "".join(f"/{escape_pointer_token(token)}" for token in path)
+
+
+def iter_refs(schema):
+    """
+    Iterate over the `$ref` objects of a schema in document order.
+
+    The schema is walked once with an explicit stack instead of recursion,
+    so nesting depth is not limited by the interpreter's recursion limit.
+    Containers holding only scalars are checked for a `$ref` but not
+    entered, and the path of a `$ref` object is only built once one is
+    found. Nested objects and arrays are expected to be plain dicts and
+    lists, as JSON parsers return them.
+
+    Args:
+        schema: The JSON schema to scan.
+
+    Yields:
+        Tuples of the path to each object holding a `$ref`, as a tuple of
+        keys and list indices for `json_pointer`, and the object itself.
+    """
+    if isinstance(schema, dict):
+        if "$ref" in schema:
+            yield (), schema
+        top = iter(schema.items())
+    elif isinstance(schema, list):
+        top = iter(enumerate(schema))
+    else:
+        return
+    stack = [top]
+    path = []
+    push, pop, enter, leave = stack.append, stack.pop, path.append, path.pop
+    while True:
+        for key, child in top:
+            kind = type(child)
+            if kind is dict:
+                if "$ref" in child:
+                    yield (*path, key), child
+                for value in child.values():
+                    kind = type(value)
+                    if kind is dict or kind is list:
+                        break
+                else:
+                    continue
+                top = iter(child.items())
+            elif kind is list:
+                for value in child:
+                    kind = type(value)
+                    if kind is dict or kind is list:
+                        break
+                else:
+                    continue
+                top = iter(enumerate(child))
+            else:
+                continue
+            enter(key)
+            push(top)
+            break
+        else:
+            pop()
+            if not stack:
+                return
+            leave()
+            top = stack[-1]
+
+
 def collect_refs(
     schema: dict, base_url: str = "", verbose: bool = False
 ) -> list[str]:
     """
     Collect all `$ref` URLs from a schema.
 
+    Relative references are resolved against `base_url` the same way
+    `resolve_references` resolves them.
+
     Args:
         schema: The JSON schema to scan.
         base_url: The base URL for resolving relative $refs.
@@ -75,24 +311,65 @@ def collect_refs(
         A list of all resolved `$ref` URLs.
     """
     refs = []
-
-    def _collect(schema_part, current_base_url):
-        if isinstance(schema_part, dict):
-            if "$ref" in schema_part:
-                ref = schema_part["$ref"]
-                if (
-                    not ref.startswith(("http://", "https://"))
-                    and current_base_url
-                ):
-                    ref = f"{current_base_url.rstrip('/')}/{ref.lstrip('./')}"
-                refs.append(ref)
-                if verbose:
-                    click.secho(f"INFO: Found $ref: {ref}", fg="cyan")
-            for value in schema_part.values():
-                _collect(value, current_base_url)
-        elif isinstance(schema_part, list):
-            for item in schema_part:
-                _collect(item, current_base_url)
-
-    _collect(schema, base_url)
+    # Schemas repeat the same references many times; join each once.
+    joined = {}
+    for path, node in iter_refs(schema):
+        ref = node["$ref"]
+        if not ref.startswith(("http://", "https://")) and base_url:
+            if ref not in joined:
+                joined[ref] = urljoin(base_url, ref)
+            ref = joined[ref]
+        refs.append(ref)
+        if verbose:
+            click.secho(
+                f"INFO: Found $ref: {ref} at #{json_pointer(path)}",
+                fg="cyan",
+            )
     return refs
+
+
+def expand_data_paths(paths, verbose: bool = False) -> list[str]:
+    """
+    Expand data arguments into the list of documents to validate.
+
+    URLs and plain file paths are kept as they are, glob patterns are
+    expanded (with `**` matching any number of directories), and
+    directories are searched recursively for devcontainer files.
+
+    Args:
+        paths: The data paths, URLs, directories or glob patterns.
+        verbose: Flag to enable verbose output.
+
+    Returns:
+        The expanded paths in argument order, without duplicates.
+    """
+    expanded = []
+    for path in paths:
+        if is_url(path):
+            expanded.append(path)
+        elif os.path.isdir(path):
+            expanded.extend(_find_devcontainer_files(path))
+        elif any(char in path for char in "*?["):
+            matches = sorted(glob.glob(path, recursive=True))
+            expanded.extend(m for m in matches if os.path.isfile(m))
+        else:
+            expanded.append(path)
+
+    expanded = list(dict.fromkeys(expanded))
+    if verbose:
+        click.secho(
+            f"INFO: Expanded {len(paths)} data arguments into "
+            f"{len(expanded)} documents.",
+            fg="blue",
+        )
+    return expanded
+
+
+def _find_devcontainer_files(directory: str) -> list[str]:
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name in DEVCONTAINER_FILENAMES:
+                found.append(os.path.join(root, name))
+    return found
@@ -1,8 +1,199 @@
 import json
+import re
 import click
-import jsonschema
-from urllib.parse import urljoin
-from .utils import load_json
+from urllib.parse import urldefrag, urljoin, urlparse
+from .profiling import get_profiler
+from .utils import escape_pointer_token, iter_refs, json_pointer, load_json
+
+# jsonschema and referencing are imported where validators are built, so
+# that the CLI starts without them for --help and argument errors.
+
+DEFAULT_PREFETCH_WORKERS = 8
+RESOLUTION_MODES = ("eager", "lazy")
+
+
+class ResolutionMemo:
+    """
+    Per-run memo of fetched documents and resolved `$ref` targets.
+
+    Documents are keyed by their absolute URL and resolved targets by their
+    absolute URL plus fragment, so every external document is fetched and
+    every reference target is resolved at most once. Documents that fail to
+    load are kept in `failed` with their error, so they are not fetched
+    again either. References currently
+    being resolved are tracked to detect cycles, and cut cycles that point
+    into fetched documents are recorded in `cycles`. Each document is walked
+    for references once, and the resulting `RefIndex` is shared by
+    prefetching and resolution.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        self.failed = {}
+        self.resolved = {}
+        self.in_progress = set()
+        self.cycles = set()
+        self.indexes = {}
+
+    def document(self, url: str, verbose: bool = False):
+        """
+        Return the document at a URL, fetching it on first use.
+
+        Raises:
+            Exception: The error of the first attempt to load the document,
+                if it failed.
+        """
+        if url in self.failed:
+            raise self.failed[url]
+        if url not in self.documents:
+            try:
+                self.documents[url] = load_json(url, verbose)
+            except Exception as e:
+                self.failed[url] = e
+                raise
+        return self.documents[url]
+
+    def cycle_documents(self) -> dict | None:
+        """
+        Return the documents that the cut cycles of a resolved schema refer
+        to, or None if no cycle was cut inside a fetched document.
+        """
+        # Targets within a document may refer on to any other document,
+        # so all of them are kept.
+        return dict(self.documents) if self.cycles else None
+
+    def ref_index(self, document) -> "RefIndex":
+        """
+        Return the reference index of a document, building it on first use.
+        """
+        entry = self.indexes.get(id(document))
+        if entry is None:
+            # Keep the document alive so its id is not reused.
+            entry = (document, RefIndex(document))
+            self.indexes[id(document)] = entry
+        return entry[1]
+
+
+class RefIndex:
+    """
+    The `$ref` objects of one document, found in a single walk.
+
+    `refs` holds their reference strings in document order, and `trie`
+    the keys leading to them: each key maps to the trie of the child below
+    it, and a child without references below it is absent. Resolution only
+    descends along the trie, so subtrees without references are never
+    walked again.
+    """
+
+    __slots__ = ("refs", "trie")
+
+    def __init__(self, document):
+        self.refs = []
+        self.trie = {}
+        for path, node in iter_refs(document):
+            self.refs.append(node["$ref"])
+            trie = self.trie
+            for key in path:
+                trie = trie.setdefault(key, {})
+
+    def subtrie(self, ref: str) -> dict:
+        """
+        Return the trie below the target of an internal reference.
+        """
+        trie = self.trie
+        pointer = ref[1:] if ref.startswith("#") else ref
+        if not pointer:
+            return trie
+        for part in pointer.lstrip("/").split("/"):
+            part = part.replace("~1", "/").replace("~0", "~")
+            child = trie.get(part)
+            if child is None and part.isdigit():
+                child = trie.get(int(part))
+            if child is None:
+                return {}
+            trie = child
+        return trie
+
+
+def prefetch_references(
+    schema: dict,
+    base_url: str,
+    memo: ResolutionMemo,
+    verbose: bool = False,
+    max_workers: int = DEFAULT_PREFETCH_WORKERS,
+) -> int:
+    """
+    Fetch every external document reachable through `$ref` into the memo.
+
+    The reference graph is walked breadth-first through the memo's
+    `RefIndex` of each document. All
+    documents of one level are fetched concurrently, so the number of
+    network round trips grows with the depth of the graph rather than with
+    the number of documents. Documents that fail to load are recorded in
+    the memo's `failed` and reported when `resolve_references` reaches
+    them.
+
+    Args:
+        schema: The root JSON schema.
+        base_url: The base URL for resolving relative `$ref` references.
+        memo: The memo to store fetched documents in.
+        verbose: Flag to enable verbose output.
+        max_workers: Maximum number of concurrent fetches.
+
+    Returns:
+        The number of documents fetched.
+    """
+    attempted = set(memo.documents) | set(memo.failed)
+    level = _external_documents(schema, base_url, memo) - attempted
+    fetched = 0
+    if not level:
+        return fetched
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while level:
+            if verbose:
+                click.secho(
+                    f"INFO: Prefetching {len(level)} referenced documents...",
+                    fg="blue",
+                )
+            attempted |= level
+            futures = {
+                url: executor.submit(load_json, url, verbose)
+                for url in sorted(level)
+            }
+            next_level = set()
+            for url, future in futures.items():
+                try:
+                    document = future.result()
+                except Exception as e:
+                    if verbose:
+                        print(f"Warning: Failed to prefetch {url}: {e}")
+                    memo.failed[url] = e
+                    continue
+                memo.documents[url] = document
+                fetched += 1
+                next_level |= _external_documents(document, url, memo)
+            level = next_level - attempted
+
+    return fetched
+
+
+def _external_documents(
+    schema, doc_url: str, memo: ResolutionMemo
+) -> set[str]:
+    documents = set()
+    for ref in memo.ref_index(schema).refs:
+        if not ref.startswith(("http://", "https://")) and doc_url:
+            ref = urljoin(doc_url, ref)
+        url = urldefrag(ref).url
+        if urlparse(url).scheme not in ("", "http", "https"):
+            continue
+        documents.add(url)
+    documents.discard(urldefrag(doc_url).url)
+    documents.discard("")
+    return documents
 
 
 def resolve_internal_ref(
@@ -23,125 +214,1072 @@ def resolve_internal_ref(
     Raises:
         ValueError: If the reference is invalid or cannot be resolved.
     """
-    parts = ref.lstrip("#/").split("/")
+    pointer = ref[1:] if ref.startswith("#") else ref
     resolved = schema
+    if not pointer:
+        return resolved
 
-    for part in parts:
-        if part not in resolved:
+    for part in pointer.lstrip("/").split("/"):
+        part = part.replace("~1", "/").replace("~0", "~")
+        if isinstance(resolved, list) and part.isdigit():
+            if int(part) >= len(resolved):
+                raise ValueError(f"Invalid internal reference: {ref}")
+            resolved = resolved[int(part)]
+        elif isinstance(resolved, dict) and part in resolved:
+            resolved = resolved[part]
+        else:
             raise ValueError(f"Invalid internal reference: {ref}")
-        resolved = resolved[part]
 
     return resolved
 
 
 def resolve_references(
-    schema: dict, base_url: str, verbose: bool = False
+    schema: dict,
+    base_url: str,
+    verbose: bool = False,
+    memo: ResolutionMemo | None = None,
 ) -> dict:
     """
     Recursively resolve `$ref` references within the schema. This function
     will handle both internal and external references, resolving them
     accordingly.
 
+    Internal references are resolved against the document they appear in.
+    Each reference target is resolved once per memo and the expanded object
+    is shared by every reference to it; cyclic references are left as
+    `$ref` entries instead of being expanded forever. Subtrees without
+    references are returned as they are, so the result shares them with
+    the input and with the memo's documents.
+
     Args:
         schema (dict): The JSON schema to resolve references within.
         base_url (str): The base URL for resolving relative `$ref` references.
         verbose (bool): Whether to output detailed information during the
             resolution process.
+        memo (ResolutionMemo): The memo to share fetched documents and
+            resolved targets through. A fresh one is used if omitted.
 
     Returns:
         dict: The schema with resolved references.
     """
-    if isinstance(schema, dict):
-        if "$ref" in schema:
-            ref = schema["$ref"]
+    if memo is None:
+        memo = ResolutionMemo()
+    with get_profiler().phase("resolve"):
+        return _Resolver(memo, verbose).resolve(schema, base_url)
+
+
+# Marks that `_Resolver.enter` pushed a frame instead of returning a value.
+_PUSHED = object()
+
+
+class _Frame:
+    """
+    A container being rebuilt by `_Resolver`, or the target of a `$ref`.
+    """
+
+    __slots__ = (
+        "node",
+        "items",
+        "result",
+        "root",
+        "doc_url",
+        "index",
+        "key",
+        "ref",
+        "external",
+        "wrapped",
+        "pending",
+    )
+
+    def __init__(
+        self,
+        node,
+        trie: dict,
+        root,
+        doc_url: str,
+        index: RefIndex,
+        key=None,
+        ref=None,
+        external=False,
+        wrapped=False,
+    ):
+        self.node = node
+        # Only the children with references below them are visited.
+        self.items = iter(trie.items())
+        # Copied only once a child changes.
+        self.result = node
+        self.root = root
+        self.doc_url = doc_url
+        self.index = index
+        # Memo key and `$ref` string when resolving a reference target.
+        self.key = key
+        self.ref = ref
+        self.external = external
+        self.wrapped = wrapped
+        # The (key, child) pair whose value is being resolved.
+        self.pending = None
+
+    def assign(self, key, child, value) -> None:
+        if value is child:
+            return
+        if self.result is self.node:
+            self.result = (
+                dict(self.node)
+                if isinstance(self.node, dict)
+                else list(self.node)
+            )
+        self.result[key] = value
+
+
+class _Resolver:
+    """
+    Expands `$ref` references with an explicit stack of frames instead of
+    recursion, so neither nesting depth nor reference chains are limited by
+    the interpreter's recursion limit. Only the paths to references in each
+    document's `RefIndex` are walked.
+    """
+
+    def __init__(self, memo: ResolutionMemo, verbose: bool = False):
+        self.memo = memo
+        self.verbose = verbose
+        self.stack = []
+        # Document URLs without their fragment, for memo keys.
+        self.bases = {}
+
+    def pointer(self) -> str:
+        """
+        Return the JSON Pointer of the node being resolved.
+        """
+        return json_pointer(
+            frame.pending[0]
+            for frame in self.stack
+            if frame.pending is not None and not frame.wrapped
+        )
+
+    def resolve(self, schema, base_url: str):
+        index = self.memo.ref_index(schema)
+        result = self.enter(schema, index.trie, schema, base_url, index)
+        stack = self.stack
+        while stack:
+            frame = stack[-1]
+            try:
+                for key, trie in frame.items:
+                    child = frame.node[key]
+                    frame.pending = (key, child)
+                    value = self.enter(
+                        child, trie, frame.root, frame.doc_url, frame.index
+                    )
+                    if value is _PUSHED:
+                        break
+                    frame.assign(key, child, value)
+                else:
+                    stack.pop()
+                    value = self.complete(frame)
+                    if not stack:
+                        result = value
+                        break
+                    stack[-1].assign(*stack[-1].pending, value)
+            except Exception as e:
+                value = self.unwind(e)
+                if not stack:
+                    return value
+                stack[-1].assign(*stack[-1].pending, value)
+        return result
+
+    def enter(self, node, trie: dict, root, doc_url: str, index: RefIndex):
+        """
+        Resolve a node, returning its value, or push a frame for it and
+        return `_PUSHED`.
+        """
+        if isinstance(node, dict) and "$ref" in node:
+            return self.enter_ref(node["$ref"], root, doc_url, index)
+        if not trie:
+            return node
+        self.stack.append(_Frame(node, trie, root, doc_url, index))
+        return _PUSHED
 
-            if ref.startswith("#"):
+    def enter_ref(self, ref: str, root, doc_url: str, index: RefIndex):
+        verbose = self.verbose
+        if ref.startswith("#"):
+            if doc_url not in self.bases:
+                self.bases[doc_url] = urldefrag(doc_url).url
+            key = self.bases[doc_url] + ref
+            target = trie = None
+            # The target is only located when it is not memoized yet.
+            if key not in self.memo.resolved:
                 try:
-                    resolved = resolve_internal_ref(schema, ref, verbose)
-                    return resolve_references(resolved, base_url, verbose)
+                    target = resolve_internal_ref(root, ref, verbose)
                 except ValueError as e:
                     if verbose:
                         print(f"Warning: {e}")
                     return {"$ref": ref}
+                trie = index.subtrie(ref)
+            return self.enter_target(
+                key, ref, target, trie, root, doc_url, index
+            )
 
-            if ref.startswith(("./", "../", "http://", "https://")):
-                try:
-                    full_url = urljoin(base_url, ref)
-                    external_schema = load_json(full_url, verbose)
-                    return resolve_references(
-                        external_schema, full_url, verbose
-                    )
-                except Exception as e:
-                    if verbose:
-                        print(f"Warning: Failed to resolve external refs: {e}")
-                    return {"$ref": ref}
-
-            if ref.startswith("vscode://"):
+        if ref.startswith(("./", "../", "http://", "https://")):
+            try:
+                url, fragment = urldefrag(urljoin(doc_url, ref))
+                document = self.memo.document(url, verbose)
+                target = resolve_internal_ref(
+                    document, f"#{fragment}", verbose
+                )
+                index = self.memo.ref_index(document)
+            except Exception as e:
                 if verbose:
-                    print(f"Skipping unsupported reference: {ref}")
+                    print(f"Warning: Failed to resolve external refs: {e}")
                 return {"$ref": ref}
+            return self.enter_target(
+                f"{url}#{fragment}",
+                ref,
+                target,
+                index.subtrie(f"#{fragment}"),
+                document,
+                url,
+                index,
+                external=True,
+            )
 
-            raise ValueError(f"Invalid reference: {ref}")
+        if ref.startswith("vscode://"):
+            if verbose:
+                print(f"Skipping unsupported reference: {ref}")
+            return {"$ref": ref}
 
-        return {
-            key: resolve_references(value, base_url, verbose)
-            for key, value in schema.items()
-        }
+        raise ValueError(f"Invalid reference: {ref}")
+
+    def enter_target(
+        self,
+        key: str,
+        ref: str,
+        target,
+        trie: dict,
+        root,
+        doc_url: str,
+        index: RefIndex,
+        external=False,
+    ):
+        memo = self.memo
+        get_profiler().count("refs_resolved")
+        if key in memo.resolved:
+            return memo.resolved[key]
+        if key in memo.in_progress:
+            if self.verbose:
+                print(f"Skipping cyclic reference: {ref} at {self.pointer()}")
+            # A reference within a fetched document is relative to that
+            # document, so it is left in its absolute form, which resolves
+            # against the documents registered with the validators.
+            if urldefrag(key).url in memo.documents:
+                memo.cycles.add(key)
+                return {"$ref": key}
+            return {"$ref": ref}
+        # A target that is itself a reference is wrapped in a one-item list,
+        # so that it still gets a frame to record its memo key on.
+        wrapped = isinstance(target, dict) and "$ref" in target
+        if wrapped:
+            target = [target]
+            trie = {0: trie}
+        elif not trie:
+            memo.resolved[key] = target
+            return target
+        memo.in_progress.add(key)
+        self.stack.append(
+            _Frame(
+                target, trie, root, doc_url, index, key, ref, external, wrapped
+            )
+        )
+        return _PUSHED
 
-    elif isinstance(schema, list):
-        return [resolve_references(item, base_url, verbose) for item in schema]
+    def complete(self, frame: _Frame):
+        value = frame.result[0] if frame.wrapped else frame.result
+        if frame.key is not None:
+            self.memo.in_progress.discard(frame.key)
+            self.memo.resolved[frame.key] = value
+        return value
+
+    def unwind(self, error: Exception):
+        """
+        Abandon the frames up to the innermost external reference target,
+        which is left unresolved, or re-raise if there is none.
+        """
+        while self.stack:
+            frame = self.stack.pop()
+            if frame.key is not None:
+                self.memo.in_progress.discard(frame.key)
+            if frame.external:
+                if self.verbose:
+                    print(f"Warning: Failed to resolve external refs: {error}")
+                return {"$ref": frame.ref}
+        raise error
 
-    return schema
 
+# Keywords that never affect validation; the first value is kept on merge.
+ANNOTATION_KEYWORDS = frozenset(
+    {
+        "$comment",
+        "default",
+        "deprecationMessage",
+        "description",
+        "errorMessage",
+        "examples",
+        "markdownDescription",
+        "title",
+    }
+)
+# Keywords whose meaning depends on their siblings. A schema holding one is
+# only merged with a schema that has nothing but annotations.
+_CONTEXT_KEYWORDS = frozenset(
+    {
+        "$dynamicRef",
+        "$recursiveRef",
+        "$ref",
+        "additionalItems",
+        "additionalProperties",
+        "contains",
+        "else",
+        "if",
+        "maxContains",
+        "minContains",
+        "then",
+        "unevaluatedItems",
+        "unevaluatedProperties",
+    }
+)
+_SCHEMA_MAP_KEYWORDS = frozenset(
+    {"$defs", "definitions", "dependentSchemas", "patternProperties"}
+)
+_SCHEMA_LIST_KEYWORDS = frozenset({"allOf", "anyOf", "oneOf", "prefixItems"})
+_SCHEMA_KEYWORDS = frozenset(
+    {
+        "additionalItems",
+        "additionalProperties",
+        "contains",
+        "else",
+        "if",
+        "items",
+        "not",
+        "propertyNames",
+        "then",
+        "unevaluatedItems",
+        "unevaluatedProperties",
+    }
+)
 
-def merge_all_of(schema: dict, base_url: str, verbose: bool = False) -> dict:
+
+def merge_all_of(
+    schema: dict,
+    base_url: str,
+    verbose: bool = False,
+    memo: ResolutionMemo | None = None,
+) -> dict:
     """
-    Resolve and merge all `allOf` schemas into a single schema.
+    Flatten `allOf` entries into their parent schema at every depth.
+
+    A member is merged into its parent when that cannot change what the
+    schema accepts: `properties` and `definitions` are combined, `required`
+    lists are joined, and equal keywords are kept once. Members that
+    conflict with the parent stay in a shorter `allOf`. Each subschema is
+    flattened once, however often it is shared in the resolved schema.
+
+    `$ref` members of the top-level `allOf` that are still unresolved are
+    resolved first, from the documents already in the memo where possible.
 
     Args:
         schema: The JSON schema to process.
         base_url: The base URL for resolving relative $refs.
         verbose: Flag to enable verbose output.
+        memo: The memo of fetched documents and resolved targets. A fresh
+            one is used if omitted.
 
     Returns:
-        The schema with merged `allOf` entries.
+        The schema with flattened `allOf` entries.
     """
-    if "allOf" not in schema:
-        return schema
+    if memo is None:
+        memo = ResolutionMemo()
 
     if verbose:
         click.secho(
             "INFO: Resolving and merging `allOf` entries...", fg="blue"
         )
 
-    merged = {}
-    for i, sub_schema in enumerate(schema["allOf"]):
-        if verbose:
-            click.secho(
-                f"DEBUG: Processing allOf[{i}]: {sub_schema}", fg="cyan"
-            )
-        if "$ref" in sub_schema:
-            ref_url = sub_schema["$ref"]
-            resolved_url = urljoin(base_url, ref_url)
+    if isinstance(schema.get("allOf"), list):
+        members = []
+        for i, sub_schema in enumerate(schema["allOf"]):
             if verbose:
                 click.secho(
-                    f"INFO: Resolving $ref in `allOf`: {resolved_url}",
-                    fg="yellow",
+                    f"DEBUG: Processing allOf[{i}]: {sub_schema}", fg="cyan"
+                )
+            if isinstance(sub_schema, dict) and "$ref" in sub_schema:
+                ref_url = sub_schema["$ref"]
+                if ref_url.startswith(("#", "vscode://")):
+                    members.append(sub_schema)
+                    continue
+                url, fragment = urldefrag(urljoin(base_url, ref_url))
+                if verbose:
+                    click.secho(
+                        f"INFO: Resolving $ref in `allOf`: {url}",
+                        fg="yellow",
+                    )
+                try:
+                    document = memo.document(url, verbose)
+                    sub_schema = resolve_references(
+                        resolve_internal_ref(document, f"#{fragment}"),
+                        url,
+                        verbose,
+                        memo,
+                    )
+                except Exception as e:
+                    if verbose:
+                        print(
+                            f"Warning: Failed to resolve $ref {ref_url}: {e}"
+                        )
+                    continue
+            members.append(sub_schema)
+        schema = {**schema, "allOf": members}
+
+    flattened = {}
+    result = _flatten(schema, flattened)
+    if verbose:
+        click.secho(f"INFO: Flattened {len(flattened)} subschemas.", fg="blue")
+    return result
+
+
+def _flatten(node, flattened: dict):
+    if not isinstance(node, dict):
+        return node
+    entry = flattened.get(id(node))
+    if entry is not None:
+        return entry[1]
+
+    result = {}
+    for key, value in node.items():
+        if key == "properties" or key in _SCHEMA_MAP_KEYWORDS:
+            if isinstance(value, dict):
+                value = _flatten_children(value, value.items(), flattened)
+        elif key in _SCHEMA_LIST_KEYWORDS or (
+            key == "items" and isinstance(value, list)
+        ):
+            if isinstance(value, list):
+                value = _flatten_children(value, enumerate(value), flattened)
+        elif key in _SCHEMA_KEYWORDS or key == "dependencies":
+            if key == "dependencies" and isinstance(value, dict):
+                value = _flatten_children(value, value.items(), flattened)
+            else:
+                value = _flatten(value, flattened)
+        result[key] = value
+
+    if isinstance(result.get("allOf"), list):
+        result = _merge_members(result, flattened)
+    elif all(result[key] is node[key] for key in node):
+        # Unchanged subtrees are shared instead of copied.
+        result = node
+
+    # Keep the node alive so its id is not reused during this pass.
+    flattened[id(node)] = (node, result)
+    return result
+
+
+def _flatten_children(container, items, flattened: dict):
+    changed = False
+    values = {}
+    for key, child in items:
+        values[key] = _flatten(child, flattened)
+        changed = changed or values[key] is not child
+    if not changed:
+        return container
+    if isinstance(container, list):
+        return list(values.values())
+    return values
+
+
+def _merge_members(schema: dict, flattened: dict) -> dict:
+    merged = {key: value for key, value in schema.items() if key != "allOf"}
+    remaining = []
+    for member in schema["allOf"]:
+        if isinstance(member, dict) and _can_merge(merged, member):
+            _merge(merged, member, flattened)
+        else:
+            remaining.append(member)
+    if remaining:
+        merged["allOf"] = remaining
+    return merged
+
+
+def _can_merge(target: dict, member: dict) -> bool:
+    target_keys = target.keys() - ANNOTATION_KEYWORDS
+    member_keys = member.keys() - ANNOTATION_KEYWORDS
+    if target_keys & _CONTEXT_KEYWORDS and member_keys:
+        return False
+    if member_keys & _CONTEXT_KEYWORDS and target_keys:
+        return False
+    # `items` applies only past `prefixItems`, so one must not be merged
+    # next to the other.
+    if {"items", "prefixItems"} <= target_keys | member_keys:
+        return False
+    for key in target_keys & member_keys:
+        if key in ("properties", "required"):
+            continue
+        if key in ("definitions", "$defs"):
+            shared = target[key].keys() & member[key].keys()
+            if any(target[key][name] != member[key][name] for name in shared):
+                return False
+        elif target[key] != member[key]:
+            return False
+    return True
+
+
+def _merge(target: dict, member: dict, flattened: dict) -> None:
+    for key, value in member.items():
+        if key not in target:
+            target[key] = value
+        elif key == "properties":
+            properties = dict(target[key])
+            for name, subschema in value.items():
+                if name not in properties:
+                    properties[name] = subschema
+                elif properties[name] != subschema:
+                    properties[name] = _flatten(
+                        {"allOf": [properties[name], subschema]}, flattened
+                    )
+            target[key] = properties
+        elif key == "required":
+            target[key] = target[key] + [
+                name for name in value if name not in target[key]
+            ]
+        elif key in ("definitions", "$defs"):
+            target[key] = {**target[key], **value}
+
+
+def compile_validators(schema: dict, documents: dict | None = None) -> dict:
+    """
+    Compile one validator for each top-level property of a schema.
+
+    The schema is checked against its metaschema once, and every property
+    validator shares the root's reference resolver, so internal references
+    left in the schema resolve against it.
+
+    Args:
+        schema: The resolved JSON schema.
+        documents: Fetched documents, keyed by URL, that references left in
+            the schema point into, from `ResolutionMemo.cycle_documents`.
+
+    Returns:
+        A mapping of property names to their compiled validators.
+    """
+    from jsonschema.validators import validator_for
+    from referencing import Registry
+
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    documents = documents or {}
+    cls = with_compiled_patterns(
+        cls, compile_patterns([schema, *documents.values()])
+    )
+    registry = Registry(retrieve=_retrieve_unsupported).with_resources(
+        _document_resources(schema, documents)
+    )
+    root = cls(schema, registry=registry)
+    return {
+        key: root.evolve(schema=subschema)
+        for key, subschema in schema.get("properties", {}).items()
+    }
+
+
+def compile_patterns(schemas, regexes: dict | None = None) -> dict:
+    """
+    Compile the regular expressions of `pattern` and `patternProperties`
+    keywords ahead of validation.
+
+    Besides each pattern, the alternation of every `patternProperties`
+    object's patterns is compiled, for checking `additionalProperties`.
+    Patterns that do not compile are left out; validation reports them.
+
+    Args:
+        schemas: The schemas or documents to scan.
+        regexes: A mapping to add the compiled patterns to.
+
+    Returns:
+        The mapping of pattern strings to compiled patterns.
+    """
+    regexes = {} if regexes is None else regexes
+    stack = list(schemas)
+    # Resolved schemas share subtrees; scan each object only once.
+    seen = set()
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if isinstance(node, list):
+            stack.extend(node)
+            continue
+        if not isinstance(node, dict):
+            continue
+        patterns = []
+        if isinstance(node.get("pattern"), str):
+            patterns.append(node["pattern"])
+        if isinstance(node.get("patternProperties"), dict):
+            patterns.extend(node["patternProperties"])
+            patterns.append("|".join(node["patternProperties"]))
+        for pattern in patterns:
+            if pattern not in regexes:
+                try:
+                    regexes[pattern] = re.compile(pattern)
+                except re.error:
+                    pass
+        stack.extend(node.values())
+    return regexes
+
+
+def with_compiled_patterns(cls, regexes: dict):
+    """
+    Extend a validator class to match patterns with precompiled regular
+    expressions.
+
+    jsonschema passes pattern strings to `re.search` on every check, which
+    looks them up in, or once its cache is full recompiles them into, the
+    `re` module's cache; the schema's patterns are compiled once instead.
+    Patterns missing from `regexes`, such as ones in documents fetched
+    during lazy validation, are compiled and added on first use. Failures
+    are reported by jsonschema's own keyword functions, so messages do not
+    change.
+
+    Args:
+        cls: The validator class.
+        regexes: The compiled patterns, from `compile_patterns`.
+
+    Returns:
+        The extended validator class.
+    """
+    from jsonschema.validators import extend
+
+    base = cls.VALIDATORS
+
+    def search(pattern: str, string: str):
+        regex = regexes.get(pattern)
+        if regex is None:
+            regex = regexes[pattern] = re.compile(pattern)
+        return regex.search(string)
+
+    def pattern(validator, patrn, instance, schema):
+        if validator.is_type(instance, "string") and not search(
+            patrn, instance
+        ):
+            yield from base["pattern"](validator, patrn, instance, schema)
+
+    def pattern_properties(validator, patternProperties, instance, schema):
+        if not validator.is_type(instance, "object"):
+            return
+        for patrn, subschema in patternProperties.items():
+            for key, value in instance.items():
+                if search(patrn, key):
+                    yield from validator.descend(
+                        value, subschema, path=key, schema_path=patrn
+                    )
+
+    def additional_properties(validator, aP, instance, schema):
+        if not validator.is_type(instance, "object"):
+            return
+        properties = schema.get("properties", {})
+        patterns = "|".join(schema.get("patternProperties", {}))
+        for key in instance:
+            if key not in properties and not (
+                patterns and search(patterns, key)
+            ):
+                # There are additional properties to check or report.
+                yield from base["additionalProperties"](
+                    validator, aP, instance, schema
                 )
+                return
+
+    keywords = {
+        "pattern": pattern,
+        "patternProperties": pattern_properties,
+        "additionalProperties": additional_properties,
+    }
+    return extend(
+        cls,
+        {name: func for name, func in keywords.items() if name in base},
+    )
+
+
+def compile_document_validator(validators: dict):
+    """
+    Combine property validators into one validator for whole instances.
+
+    The combined schema only holds the properties, so, like the property
+    validators, it checks the instance attributes present in the schema
+    and nothing else. It shares their registry, so references resolve as
+    they would for each property.
+
+    Args:
+        validators: The property validators, as from `compile_validators`.
+
+    Returns:
+        The validator, or None if the schema has no properties.
+    """
+    if not validators:
+        return None
+    first = next(iter(validators.values()))
+    return first.evolve(
+        schema={
+            "properties": {
+                key: validator.schema for key, validator in validators.items()
+            }
+        }
+    )
+
+
+def _document_resources(schema: dict, documents: dict) -> list:
+    from referencing import Resource
+    from referencing.jsonschema import DRAFT202012, specification_with
+
+    specification = specification_with(
+        schema.get("$schema", ""), default=DRAFT202012
+    )
+    return [
+        (url, Resource.from_contents(doc, default_specification=specification))
+        for url, doc in documents.items()
+    ]
+
+
+def _retrieve_unsupported(uri: str):
+    from referencing.exceptions import NoSuchResource
+    from referencing.jsonschema import DRAFT202012
+
+    # References skipped by `resolve_references` accept any value.
+    if uri.startswith("vscode://"):
+        return DRAFT202012.create_resource({})
+    raise NoSuchResource(ref=uri)
+
+
+class CompiledSchema:
+    """
+    A resolved schema together with its compiled property validators, ready
+    to validate any number of instances.
+    """
+
+    def __init__(self, schema: dict, documents: dict | None = None):
+        self.schema = schema
+        self.documents = documents
+        with get_profiler().phase("compile"):
+            self.validators = self._compile()
+            self.validator = compile_document_validator(self.validators)
+
+    def _compile(self) -> dict:
+        return compile_validators(self.schema, self.documents)
+
+    def __reduce__(self):
+        # Validators are rebuilt from the schema rather than pickled.
+        return (self.__class__, (self.schema, self.documents))
+
+    def validate(self, instance: dict, verbose: bool = False) -> bool:
+        """
+        Validate the instance attributes that are present in the schema.
+
+        Args:
+            instance: The JSON instance to validate.
+            verbose: Flag to enable verbose output.
+
+        Returns:
+            True if validation is successful, False otherwise.
+        """
+        return self.validate_items(instance.items(), verbose)
+
+    def check(self, instance: dict) -> list[dict]:
+        """
+        Collect every validation error of an instance in a single pass.
+
+        Unlike `validate`, which reports the best error of each property,
+        this runs one validator over the whole instance and keeps all of
+        its errors, without printing anything.
+
+        Args:
+            instance: The JSON instance to validate.
+
+        Returns:
+            A dict per error, with the JSON Pointer of the failing value
+            ("instance_path"), of the failing keyword in the schema
+            ("schema_path"), the keyword and the message. The list is empty
+            if the instance is valid.
+        """
+        if self.validator is None:
+            return []
+        with get_profiler().phase("validate"):
+            return [
+                {
+                    "instance_path": json_pointer(error.absolute_path),
+                    "schema_path": json_pointer(error.absolute_schema_path),
+                    "keyword": error.validator,
+                    "message": error.message,
+                }
+                for error in self.validator.iter_errors(instance)
+            ]
+
+    def validate_items(self, items, verbose: bool = False) -> bool:
+        """
+        Validate the top-level members of an instance one at a time, such
+        as the ones `stream.iter_items` reads from a file. Members that are
+        not in the schema are ignored.
+
+        Args:
+            items: An iterable of key and value pairs.
+            verbose: Flag to enable verbose output.
+
+        Returns:
+            True if validation is successful, False otherwise.
+        """
+        from jsonschema.exceptions import best_match
+
+        click.secho("INFO: Starting schema validation...", fg="blue")
+        valid = True
+        with get_profiler().phase("validate"):
+            for key, value in items:
+                validator = self.validators.get(key)
+                if validator is None:
+                    continue
+                error = best_match(validator.iter_errors(value))
+                if error is not None:
+                    click.secho(
+                        f"ERROR: Validation failed for {key}: "
+                        f"{error.message}",
+                        fg="red",
+                    )
+                    valid = False
+
+        if valid:
+            click.secho("INFO: Validation successful!", fg="green")
+        return valid
+
+
+class LazyCompiledSchema(CompiledSchema):
+    """
+    A schema whose `$ref` references are resolved only when validation
+    reaches them, instead of being expanded up front.
+    """
+
+    def __init__(
+        self,
+        schema: dict,
+        schema_url: str,
+        documents: dict | None = None,
+        verbose: bool = False,
+    ):
+        self.schema_url = schema_url
+        self.verbose = verbose
+        self.memo = ResolutionMemo()
+        self.memo.documents.update(documents or {})
+        super().__init__(schema)
+
+    def _compile(self) -> dict:
+        return compile_lazy_validators(
+            self.schema, self.schema_url, self.memo, self.verbose
+        )
+
+    def __reduce__(self):
+        return (
+            self.__class__,
+            (self.schema, self.schema_url, self.memo.documents, self.verbose),
+        )
+
+
+def compile_lazy_validators(
+    schema: dict,
+    schema_url: str,
+    memo: ResolutionMemo,
+    verbose: bool = False,
+) -> dict:
+    """
+    Compile property validators that resolve references on demand.
+
+    The root schema and every document in the memo are registered in a
+    `referencing.Registry`, and each property validator is just a reference
+    to the subschema that defines the property. Nothing is copied or
+    expanded up front; documents that were not prefetched are fetched
+    through the memo the first time validation follows a reference to them.
+
+    Properties are collected from the root schema and from its `allOf`
+    entries, including those nested in them or in the documents they
+    reference; a property defined by several of them must match all of
+    their definitions.
+
+    Args:
+        schema: The unresolved root JSON schema.
+        schema_url: The URL or path of the schema.
+        memo: The memo holding already fetched documents.
+        verbose: Flag to enable verbose output.
+
+    Returns:
+        A mapping of property names to their compiled validators.
+    """
+    from jsonschema.validators import validator_for
+    from referencing import Registry, Resource
+    from referencing.exceptions import NoSuchResource
+    from referencing.jsonschema import DRAFT202012, specification_with
+
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    cls = with_compiled_patterns(
+        cls, compile_patterns([schema, *memo.documents.values()])
+    )
+    specification = specification_with(
+        schema.get("$schema", ""), default=DRAFT202012
+    )
+    root_uri = schema_base_url(schema, schema_url)
+
+    def retrieve(uri: str):
+        if uri.startswith("vscode://"):
+            return _retrieve_unsupported(uri)
+        try:
+            document = memo.document(uri, verbose)
+        except Exception as e:
+            raise NoSuchResource(ref=uri) from e
+        return Resource.from_contents(
+            document, default_specification=specification
+        )
+
+    resources = _document_resources(schema, memo.documents)
+    resources.append(
+        (root_uri, specification.create_resource(schema)),
+    )
+    registry = Registry(retrieve=retrieve).with_resources(resources)
+
+    validators = {}
+    for key, uris in _property_refs(schema, root_uri, memo, verbose).items():
+        refs = [{"$ref": uri} for uri in uris]
+        subschema = refs[0] if len(refs) == 1 else {"allOf": refs}
+        validators[key] = cls(subschema, registry=registry)
+    return validators
+
+
+def _property_refs(
+    schema: dict, root_uri: str, memo: ResolutionMemo, verbose: bool
+) -> dict:
+    # Each member is the pointer to a subschema, its document's URL and the
+    # document itself, so its references resolve as `referencing` would.
+    root_url = urldefrag(root_uri).url
+    members = [(f"{root_url}#", schema, root_url, schema)]
+    seen = set()
+    refs = {}
+    while members:
+        pointer, member, doc_url, document = members.pop()
+        if pointer in seen or not isinstance(member, dict):
+            continue
+        seen.add(pointer)
+        for key in member.get("properties", {}):
+            escaped = escape_pointer_token(key)
+            refs.setdefault(key, []).append(f"{pointer}/properties/{escaped}")
+
+        for i, entry in enumerate(member.get("allOf", [])):
+            if not (isinstance(entry, dict) and "$ref" in entry):
+                members.append(
+                    (f"{pointer}/allOf/{i}", entry, doc_url, document)
+                )
+                continue
+            url, fragment = urldefrag(urljoin(doc_url, entry["$ref"]))
             try:
-                sub_schema = load_json(resolved_url, verbose)
-                sub_schema = resolve_references(sub_schema, base_url, verbose)
+                # References within a document need not fetch it again.
+                target_document = (
+                    document if url == doc_url else memo.document(url, verbose)
+                )
+                target = resolve_internal_ref(
+                    target_document, f"#{fragment}", verbose
+                )
             except Exception as e:
                 if verbose:
-                    print(f"Warning: Failed to resolve $ref {ref_url}: {e}")
+                    print(
+                        f"Warning: Failed to resolve $ref {entry['$ref']}: "
+                        f"{e}"
+                    )
                 continue
-        merged.update(sub_schema)
+            members.append((f"{url}#{fragment}", target, url, target_document))
+    return refs
+
+
+def schema_base_url(schema: dict, schema_url: str) -> str:
+    """
+    Return the URL that relative references of a schema resolve against:
+    its `$id`, or the URL or path it was loaded from. References are joined
+    to it with `urljoin`, as `referencing` does in lazy mode, so eager and
+    lazy resolution find the same documents.
+    """
+    return schema.get("$id", schema_url)
+
+
+def resolve_schema(
+    schema: dict,
+    schema_url: str,
+    verbose: bool = False,
+    memo: ResolutionMemo | None = None,
+) -> dict:
+    """
+    Resolve the references of a schema and merge its `allOf` entries.
+
+    Args:
+        schema: The JSON schema.
+        schema_url: The URL or path of the schema (for resolving references).
+        verbose: Flag to enable verbose output.
+        memo: The memo to resolve through, whose `cycle_documents` the
+            resolved schema needs for validation. A fresh one is used if
+            omitted.
+
+    Returns:
+        The resolved schema.
+    """
+    base_url = schema_base_url(schema, schema_url)
+    if verbose:
+        click.secho(
+            f"INFO: Base URL for schema resolution: {base_url}",
+            fg="yellow",
+        )
 
-    schema.pop("allOf", None)
-    schema.update(merged)
+    profiler = get_profiler()
+    if memo is None:
+        memo = ResolutionMemo()
+    with profiler.phase("prefetch"):
+        prefetch_references(schema, base_url, memo, verbose)
+    schema = resolve_references(schema, base_url, verbose, memo)
+
+    with profiler.phase("merge"):
+        schema = merge_all_of(schema, base_url, verbose, memo)
+
+    if verbose:
+        click.secho("INFO: Resolved Schema:", fg="blue")
+        click.echo(json.dumps(schema, indent=2))
     return schema
 
 
+def compile_schema(
+    schema: dict,
+    schema_url: str,
+    verbose: bool = False,
+    resolution: str = "eager",
+) -> CompiledSchema:
+    """
+    Prepare a schema for validating any number of instances.
+
+    Args:
+        schema: The JSON schema.
+        schema_url: The URL or path of the schema (for resolving references).
+        verbose: Flag to enable verbose output.
+        resolution: "eager" to expand every reference up front, or "lazy"
+            to resolve references only when validation reaches them.
+
+    Returns:
+        The compiled schema.
+    """
+    if resolution == "lazy":
+        memo = ResolutionMemo()
+        with get_profiler().phase("prefetch"):
+            prefetch_references(
+                schema, schema_base_url(schema, schema_url), memo, verbose
+            )
+        return LazyCompiledSchema(schema, schema_url, memo.documents, verbose)
+    memo = ResolutionMemo()
+    resolved = resolve_schema(schema, schema_url, verbose, memo)
+    return CompiledSchema(resolved, memo.cycle_documents())
+
+
 def validate_schema(
     schema: dict, instance: dict, schema_url: str, verbose: bool = False
 ) -> bool:
@@ -158,40 +1296,13 @@ def validate_schema(
     Returns:
         True if validation is successful, False otherwise.
     """
-    try:
-        base_url = schema.get("$id", schema_url).rsplit("/", 1)[0] + "/"
-        if verbose:
-            click.secho(
-                f"INFO: Base URL for schema resolution: {base_url}",
-                fg="yellow",
-            )
+    import jsonschema
 
-        schema = resolve_references(schema, base_url, verbose)
-
-        schema = merge_all_of(schema, base_url, verbose)
-
-        if verbose:
-            click.secho("INFO: Resolved Schema:", fg="blue")
-            click.echo(json.dumps(schema, indent=2))
-
-        click.secho("INFO: Starting schema validation...", fg="blue")
-        valid = True
-        for key, value in instance.items():
-            if "properties" in schema and key in schema["properties"]:
-                try:
-                    jsonschema.validate(
-                        {key: value}, {key: schema["properties"][key]}
-                    )
-                except jsonschema.ValidationError as e:
-                    click.secho(
-                        f"ERROR: Validation failed for {key}: {e.message}",
-                        fg="red",
-                    )
-                    valid = False
-
-        if valid:
-            click.secho("INFO: Validation successful!", fg="green")
-        return valid
+    try:
+        memo = ResolutionMemo()
+        schema = resolve_schema(schema, schema_url, verbose, memo)
+        compiled = CompiledSchema(schema, memo.cycle_documents())
+        return compiled.validate(instance, verbose)
 
     except jsonschema.ValidationError as e:
         print(f"DEBUG: Caught ValidationError: {e}")
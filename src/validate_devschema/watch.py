@@ -0,0 +1,102 @@
+import os
+import time
+import click
+from .batch import validate_files
+from .cache import ResultCache
+from .utils import is_url
+from .validate_schema import CompiledSchema
+
+DEFAULT_POLL_INTERVAL = 0.05
+
+
+def file_state(path: str):
+    """
+    Return the modification time and size of a file, or None if it does
+    not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def changed_files(states: dict) -> list[str]:
+    """
+    Poll watched files and update their recorded states.
+
+    Args:
+        states: The recorded state of each watched path, updated in place.
+
+    Returns:
+        The paths whose state changed since the last poll.
+    """
+    changed = []
+    for path, previous in states.items():
+        current = file_state(path)
+        if current != previous:
+            states[path] = current
+            changed.append(path)
+    return changed
+
+
+def watch_files(
+    compiled: CompiledSchema,
+    data_paths: list[str],
+    schema_path: str,
+    verbose: bool = False,
+    interval: float = DEFAULT_POLL_INTERVAL,
+    rounds: int | None = None,
+    results: ResultCache | None = None,
+    stream: bool = False,
+) -> None:
+    """
+    Revalidate data files whenever they change, reusing a compiled schema.
+
+    Files are polled with `os.stat`, which is cheap enough for the handful
+    of files edited by hand, and only the files that changed are
+    revalidated. URLs are not watched.
+
+    Args:
+        compiled: The compiled schema.
+        data_paths: The paths of the documents to watch.
+        schema_path: The path or URL of the schema, for messages.
+        verbose: Flag to enable verbose output.
+        interval: Seconds between polls.
+        rounds: Number of polls before returning, or None to watch until
+            interrupted.
+        results: Cache of verdicts for unchanged local files.
+        stream: Validate files member by member while reading them.
+    """
+    states = {
+        path: file_state(path) for path in data_paths if not is_url(path)
+    }
+    click.secho(
+        f"INFO: Watching {len(states)} file(s) for changes. "
+        "Press Ctrl+C to stop.",
+        fg="blue",
+    )
+    try:
+        while rounds is None or rounds > 0:
+            if rounds is not None:
+                rounds -= 1
+            time.sleep(interval)
+            # Deleted files are skipped until they reappear.
+            changed = [path for path in changed_files(states) if states[path]]
+            for path in changed:
+                start = time.monotonic()
+                failed = validate_files(
+                    compiled,
+                    [path],
+                    schema_path,
+                    verbose,
+                    results=results,
+                    stream=stream,
+                )
+                elapsed = (time.monotonic() - start) * 1000
+                if failed:
+                    click.secho(f"❌ {path} ({elapsed:.0f} ms)", fg="red")
+                else:
+                    click.secho(f"✅ {path} ({elapsed:.0f} ms)", fg="green")
+    except KeyboardInterrupt:
+        click.secho("INFO: Stopped watching.", fg="blue")
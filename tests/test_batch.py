@@ -0,0 +1,327 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import get_context
+from unittest.mock import patch
+import pytest
+from validate_devschema import fastjson
+from validate_devschema.batch import (
+    Preloader,
+    _init_worker,
+    _worker_config,
+    check_files,
+    schema_fingerprint,
+    validate_file,
+    validate_files,
+    validate_files_parallel,
+)
+from validate_devschema.cache import HttpCache, ResultCache
+from validate_devschema.profiling import reset_profiler
+from validate_devschema.utils import (
+    configure_session,
+    get_http_cache,
+    get_session_config,
+    set_http_cache,
+)
+from validate_devschema.validate_schema import CompiledSchema
+
+SCHEMA = {"properties": {"age": {"type": "integer"}}}
+
+
+def write_documents(tmp_path, ages):
+    paths = []
+    for i, age in enumerate(ages):
+        path = tmp_path / f"doc{i}.json"
+        path.write_text(f'{{"age": {age}}}')
+        paths.append(str(path))
+    return paths
+
+
+@patch("validate_devschema.batch.click.secho")
+def test_validate_file_reports_load_error(mock_secho):
+    compiled = CompiledSchema(SCHEMA)
+
+    assert validate_file(compiled, "missing.json", "schema.json") is False
+    mock_secho.assert_any_call(
+        "ERROR: missing.json: [Errno 2] No such file or directory: "
+        "'missing.json'",
+        fg="red",
+    )
+
+
+def test_validate_files_sequential(tmp_path):
+    paths = write_documents(tmp_path, ["1", '"two"', "3"])
+
+    failed = validate_files(CompiledSchema(SCHEMA), paths, "schema.json")
+
+    assert failed == [paths[1]]
+
+
+def test_validate_files_parallel_keeps_input_order(tmp_path):
+    ages = ["1", '"two"', "3", '"four"', "5", "6"]
+    paths = write_documents(tmp_path, ages)
+
+    results = list(
+        validate_files_parallel(
+            CompiledSchema(SCHEMA), paths, "schema.json", jobs=2
+        )
+    )
+
+    assert [path for path, _, _ in results] == paths
+    assert [success for _, success, _ in results] == [
+        True,
+        False,
+        True,
+        False,
+        True,
+        True,
+    ]
+    assert "ERROR: Validation failed for age" in results[1][2]
+
+
+def test_validate_files_with_jobs_matches_sequential(tmp_path):
+    paths = write_documents(tmp_path, ["1", '"two"', "3", '"four"'])
+    compiled = CompiledSchema(SCHEMA)
+
+    assert validate_files(
+        compiled, paths, "schema.json", jobs=2
+    ) == validate_files(compiled, paths, "schema.json")
+
+
+def test_validate_files_skips_unchanged_documents(tmp_path, capsys):
+    compiled = CompiledSchema(SCHEMA)
+    paths = write_documents(tmp_path, [1, '"x"'])
+    results = ResultCache(
+        str(tmp_path / "results"), schema_fingerprint(compiled)
+    )
+
+    assert validate_files(compiled, paths, "s.json", results=results) == [
+        paths[1]
+    ]
+    first = capsys.readouterr().out
+
+    with patch.object(compiled, "validate") as mock_validate:
+        failed = validate_files(compiled, paths, "s.json", results=results)
+
+    mock_validate.assert_not_called()
+    assert failed == [paths[1]]
+    assert capsys.readouterr().out == first
+    assert results.stats() == {"hits": 2, "misses": 2}
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_cached_result_names_the_replayed_document(tmp_path, capsys, stream):
+    compiled = CompiledSchema(SCHEMA)
+    paths = []
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        path = tmp_path / name / "devcontainer.json"
+        path.write_text('{"age": "x"} trailing')
+        paths.append(str(path))
+    results = ResultCache(
+        str(tmp_path / "results"), schema_fingerprint(compiled)
+    )
+
+    assert not validate_file(
+        compiled, paths[0], "s.json", True, results, stream
+    )
+    first = capsys.readouterr().out
+    assert not validate_file(compiled, paths[1], "s.json", False, results)
+    second = capsys.readouterr().out
+
+    assert results.stats() == {"hits": 1, "misses": 1}
+    assert f"ERROR: {paths[0]}:" in first
+    assert f"ERROR: {paths[1]}:" in second
+    assert paths[0] not in second
+    assert "Streaming JSON" not in second
+
+
+def test_validate_files_revalidates_changed_document(tmp_path):
+    compiled = CompiledSchema(SCHEMA)
+    paths = write_documents(tmp_path, [1])
+    results = ResultCache(
+        str(tmp_path / "results"), schema_fingerprint(compiled)
+    )
+    validate_files(compiled, paths, "s.json", results=results)
+
+    with open(paths[0], "w") as f:
+        f.write('{"age": "x"}')
+
+    assert validate_files(compiled, paths, "s.json", results=results) == [
+        paths[0]
+    ]
+
+
+def test_schema_fingerprint_changes_with_schema():
+    assert schema_fingerprint(CompiledSchema(SCHEMA)) != schema_fingerprint(
+        CompiledSchema({"properties": {"age": {"type": "string"}}})
+    )
+
+
+def test_validate_files_stream_matches_load(tmp_path, capsys):
+    compiled = CompiledSchema(SCHEMA)
+    paths = write_documents(tmp_path, ["1", '"two"', "3"])
+
+    loaded = validate_files(compiled, paths, "s.json", verbose=True)
+    expected = capsys.readouterr().out
+
+    assert (
+        validate_files(compiled, paths, "s.json", verbose=True, stream=True)
+        == loaded
+    )
+    assert capsys.readouterr().out == expected.replace(
+        "Loading JSON from file", "Streaming JSON from file"
+    )
+
+
+def test_validate_files_stream_shares_result_cache(tmp_path):
+    compiled = CompiledSchema(SCHEMA)
+    paths = write_documents(tmp_path, [1, '"x"'])
+    results = ResultCache(
+        str(tmp_path / "results"), schema_fingerprint(compiled)
+    )
+    validate_files(compiled, paths, "s.json", results=results, stream=True)
+
+    with patch.object(compiled, "validate_items") as mock_validate:
+        failed = validate_files(compiled, paths, "s.json", results=results)
+
+    mock_validate.assert_not_called()
+    assert failed == [paths[1]]
+    assert results.stats() == {"hits": 2, "misses": 2}
+
+
+def test_check_files_collects_errors_in_input_order(tmp_path):
+    compiled = CompiledSchema(SCHEMA)
+    paths = write_documents(tmp_path, ["1", '"two"', "3"])
+    paths.append(str(tmp_path / "missing.json"))
+
+    results = check_files(compiled, paths)
+
+    assert [result["path"] for result in results] == paths
+    assert [result["valid"] for result in results] == [
+        True,
+        False,
+        True,
+        False,
+    ]
+    assert results[1]["errors"] == [
+        {
+            "instance_path": "/age",
+            "schema_path": "/properties/age/type",
+            "keyword": "type",
+            "message": "'two' is not of type 'integer'",
+        }
+    ]
+    assert "No such file or directory" in results[3]["error"]
+    assert check_files(compiled, paths, jobs=2) == results
+
+
+def slow_load_json(path, verbose=False):
+    time.sleep(0.2)
+    if path == "missing.json":
+        raise OSError("missing.json not found")
+    return {"age": 1}
+
+
+@patch("validate_devschema.batch.load_json", side_effect=slow_load_json)
+def test_preloader_overlaps_loading_with_schema(mock_load_json):
+    profiler = reset_profiler()
+    paths = ["a.json", "b.json", "missing.json", "c.json"]
+
+    preloader = Preloader(paths, limit=3)
+    time.sleep(0.2)  # Stands in for loading the schema.
+    schema_seconds = time.monotonic() - preloader.started
+    failed = validate_files(
+        CompiledSchema(SCHEMA), paths, "s.json", preloader=preloader
+    )
+    saved = preloader.report_overlap(schema_seconds)
+
+    assert failed == ["missing.json"]
+    assert mock_load_json.call_count == 4
+    assert preloader.take("a.json") is None
+    # Three loads and the schema, 0.8 s in sequence, overlapped in 0.2 s.
+    assert 0.4 < saved <= 0.6 + 0.05
+    assert profiler.report()["saved_seconds"] == {"load": saved}
+
+
+def test_check_files_uses_preloaded_documents(tmp_path):
+    paths = write_documents(tmp_path, ['"x"'])
+    preloader = Preloader(paths)
+
+    with patch("validate_devschema.batch.load_json") as mock_load_json:
+        results = check_files(
+            CompiledSchema(SCHEMA), paths, preloader=preloader
+        )
+
+    mock_load_json.assert_not_called()
+    assert results[0]["errors"][0]["instance_path"] == "/age"
+
+
+@pytest.fixture
+def reset_worker_config():
+    yield
+    configure_session()
+    set_http_cache(None)
+    fastjson.set_backend()
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/slow.json":
+            time.sleep(2)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b'{"age": 1}')
+
+    def log_message(self, *args):
+        pass
+
+
+def test_init_worker_applies_parent_configuration(
+    tmp_path, reset_worker_config
+):
+    configure_session(read_timeout=0.5, retries=0)
+    set_http_cache(HttpCache(str(tmp_path)))
+    fastjson.set_backend("json")
+    config = _worker_config()
+    configure_session()
+    set_http_cache(None)
+    fastjson.set_backend()
+
+    _init_worker(CompiledSchema(SCHEMA), config=config)
+
+    assert get_session_config()["read_timeout"] == 0.5
+    assert get_session_config()["retries"] == 0
+    assert get_http_cache().directory == str(tmp_path)
+    assert fastjson.get_backend() == "json"
+
+
+def test_validate_files_parallel_configures_forkserver_workers(
+    tmp_path, reset_worker_config
+):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    paths = [f"{base}/slow.json", f"{base}/fast.json"]
+    configure_session(read_timeout=0.5, retries=0)
+    set_http_cache(HttpCache(str(tmp_path)))
+
+    try:
+        with patch(
+            "concurrent.futures.ProcessPoolExecutor",
+            partial(ProcessPoolExecutor, mp_context=get_context("forkserver")),
+        ):
+            results = list(
+                validate_files_parallel(
+                    CompiledSchema(SCHEMA), paths, "schema.json", jobs=2
+                )
+            )
+    finally:
+        server.shutdown()
+
+    assert [success for _, success, _ in results] == [False, True]
+    assert "timed out" in results[0][2]
+    assert list(tmp_path.iterdir())
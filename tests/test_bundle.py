@@ -0,0 +1,107 @@
+import json
+import pytest
+from unittest.mock import patch
+from click.testing import CliRunner
+from validate_devschema.bundle import (
+    bundle,
+    create_bundle,
+    load_bundle,
+    schema_hash,
+    write_bundle,
+)
+from validate_devschema.main import main
+from validate_devschema.validate_schema import CompiledSchema
+
+SCHEMA = {
+    "properties": {"mount": {"$ref": "#/definitions/Mount"}},
+    "definitions": {"Mount": {"type": "string"}},
+}
+
+
+def test_schema_hash_ignores_key_order():
+    assert schema_hash({"a": 1, "b": [1, 2]}) == schema_hash(
+        {"b": [1, 2], "a": 1}
+    )
+    assert schema_hash({"a": 1}) != schema_hash({"a": 2})
+
+
+def test_create_and_load_bundle_roundtrip(tmp_path):
+    path = str(tmp_path / "bundle.json")
+
+    created = create_bundle(SCHEMA, "schemas/schema.json")
+    write_bundle(created, path)
+    loaded = load_bundle(path)
+
+    assert loaded == created
+    assert loaded["schema"]["properties"]["mount"] == {"type": "string"}
+    assert loaded["hash"] == schema_hash(loaded["schema"])
+
+
+@patch("validate_devschema.validate_schema.load_json")
+def test_bundle_keeps_documents_of_cyclic_references(mock_load_json, tmp_path):
+    documents = {
+        "http://mocked-schemas.local/a.json": {
+            "properties": {"b": {"$ref": "./b.json"}, "n": {"type": "string"}}
+        },
+        "http://mocked-schemas.local/b.json": {
+            "properties": {"a": {"$ref": "./a.json"}}
+        },
+    }
+    mock_load_json.side_effect = lambda url, verbose: json.loads(
+        json.dumps(documents[url])
+    )
+    path = str(tmp_path / "bundle.json")
+
+    created = create_bundle(
+        {"properties": {"a": {"$ref": "./a.json"}}},
+        "http://mocked-schemas.local/schema.json",
+    )
+    write_bundle(created, path)
+    loaded = load_bundle(path)
+
+    assert loaded["documents"] == documents
+    compiled = CompiledSchema(loaded["schema"], loaded["documents"])
+    assert compiled.validate({"a": {"b": {"a": {"n": "x"}}}}) is True
+    assert compiled.validate({"a": {"b": {"a": {"n": 1}}}}) is False
+
+
+def test_load_bundle_rejects_modified_schema(tmp_path):
+    path = tmp_path / "bundle.json"
+    created = create_bundle(SCHEMA, "schemas/schema.json")
+    created["schema"]["properties"]["mount"] = {"type": "integer"}
+    write_bundle(created, str(path))
+
+    with pytest.raises(ValueError, match="Schema bundle hash mismatch"):
+        load_bundle(str(path))
+
+
+def test_bundle_command_writes_bundle(tmp_path):
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(SCHEMA))
+    output = tmp_path / "bundle.json"
+
+    result = CliRunner().invoke(
+        bundle, [str(schema_path), "--output", str(output)]
+    )
+
+    assert result.exit_code == 0, f"Test failed with output: {result.output}"
+    assert json.loads(output.read_text())["source"] == str(schema_path)
+
+
+def test_main_with_bundle_skips_resolution(tmp_path):
+    bundle_path = tmp_path / "bundle.json"
+    write_bundle(create_bundle(SCHEMA, "schema.json"), str(bundle_path))
+    good = tmp_path / "good.json"
+    good.write_text('{"mount": "/src"}')
+    bad = tmp_path / "bad.json"
+    bad.write_text('{"mount": 1}')
+
+    with patch("validate_devschema.main.compile_schema") as mock_compile:
+        result = CliRunner().invoke(
+            main, ["--bundle", str(bundle_path), str(good), str(bad)]
+        )
+
+    assert result.exit_code == 1, f"Test failed with output: {result.output}"
+    mock_compile.assert_not_called()
+    assert f"✅ {good}" in result.output
+    assert f"❌ {bad}" in result.output
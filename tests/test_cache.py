@@ -0,0 +1,117 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from validate_devschema.cache import (
+    HttpCache,
+    ResultCache,
+    freshness_deadline,
+    parse_cache_control,
+)
+from validate_devschema.utils import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    load_json,
+    set_http_cache,
+)
+
+DEFAULT_TIMEOUT = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+
+
+def make_response(status_code=200, text='{"key": "value"}', headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.text = text
+    response.headers = headers or {}
+    response.content = text.encode("utf-8")
+    return response
+
+
+@pytest.fixture
+def http_cache(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    set_http_cache(cache)
+    yield cache
+    set_http_cache(None)
+
+
+def test_parse_cache_control():
+    directives = parse_cache_control('max-age=300, no-cache, private="x"')
+    assert directives == {"max-age": "300", "no-cache": True, "private": "x"}
+
+
+def test_freshness_deadline_uses_max_age_and_age():
+    headers = {"Cache-Control": "max-age=300", "Age": "100"}
+    assert freshness_deadline(headers, 1000.0) == 1200.0
+
+
+def test_freshness_deadline_no_cache():
+    headers = {"Cache-Control": "no-cache, max-age=300"}
+    assert freshness_deadline(headers, 1000.0) is None
+
+
+def test_store_and_lookup_roundtrip(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    url = "http://example.com/schema.json"
+    cache.store(url, make_response(headers={"ETag": '"abc"'}))
+
+    entry = cache.lookup(url)
+    assert entry["etag"] == '"abc"'
+    assert cache.request_headers(entry) == {"If-None-Match": '"abc"'}
+    assert cache.serve(entry) == {"key": "value"}
+    assert cache.stats() == {"hits": 1, "misses": 1, "revalidated": 0}
+
+
+def test_store_respects_no_store(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    url = "http://example.com/schema.json"
+    cache.store(url, make_response(headers={"Cache-Control": "no-store"}))
+    assert cache.lookup(url) is None
+
+
+@patch("requests.Session.get")
+def test_load_json_serves_fresh_entry_from_disk(mock_get, http_cache):
+    url = "http://example.com/schema.json"
+    mock_get.return_value = make_response(
+        headers={"Cache-Control": "max-age=300"}
+    )
+
+    assert load_json(url) == {"key": "value"}
+    assert load_json(url) == {"key": "value"}
+
+    mock_get.assert_called_once_with(url, headers={}, timeout=DEFAULT_TIMEOUT)
+    assert http_cache.stats() == {"hits": 1, "misses": 1, "revalidated": 0}
+
+
+@patch("requests.Session.get")
+def test_load_json_revalidates_stale_entry(mock_get, http_cache):
+    url = "http://example.com/schema.json"
+    mock_get.side_effect = [
+        make_response(headers={"ETag": '"v1"'}),
+        make_response(status_code=304, text=""),
+    ]
+
+    load_json(url)
+    assert load_json(url) == {"key": "value"}
+
+    mock_get.assert_called_with(
+        url, headers={"If-None-Match": '"v1"'}, timeout=DEFAULT_TIMEOUT
+    )
+    assert http_cache.stats() == {"hits": 1, "misses": 1, "revalidated": 1}
+
+
+def test_result_cache_roundtrip(tmp_path):
+    cache = ResultCache(str(tmp_path), "schema-a")
+    key = cache.key(b'{"age": 1}')
+
+    assert cache.lookup(key) is None
+    cache.store(key, False, "ERROR: age\n")
+
+    assert cache.lookup(key) == {"valid": False, "output": "ERROR: age\n"}
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_result_cache_is_keyed_by_schema(tmp_path):
+    cache = ResultCache(str(tmp_path), "schema-a")
+    key = cache.key(b"{}")
+    cache.store(key, True, "")
+
+    assert ResultCache(str(tmp_path), "schema-b").lookup(key) is None
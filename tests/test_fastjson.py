@@ -0,0 +1,78 @@
+import json
+import pytest
+from validate_devschema import fastjson, jsonc
+
+DOCUMENTS = [
+    '{"a": [1, 2.5, -3e2, true, false, null], "b": {"c": "d"}}',
+    '{"unicode": "caf\\u00e9 \\ud83d\\ude00 ✓", "escaped": "a\\"b\\\\c"}',
+    '{"dup": 1, "dup": 2}',
+    "[9223372036854775807, -9223372036854775808, 18446744073709551615]",
+    "[123456789012345678901234567890, -98765432109876543210]",
+    "[NaN, Infinity, -Infinity, 1e400]",
+    '"\\ud800"',
+    "  [ ]  ",
+]
+
+
+@pytest.fixture(params=["json", "orjson", "msgspec"])
+def backend(request, monkeypatch):
+    monkeypatch.setattr(fastjson, "_backend", None)
+    pytest.importorskip(request.param)
+    return fastjson.set_backend(request.param)
+
+
+@pytest.mark.parametrize("text", DOCUMENTS)
+def test_loads_matches_stdlib(backend, text):
+    expected = json.loads(text)
+
+    for data in (text, text.encode("utf-8")):
+        result = fastjson.loads(data)
+        assert repr(result) == repr(expected)
+
+
+def test_loads_detects_other_encodings(backend):
+    text = '{"name": "dév"}'
+
+    assert fastjson.loads(text.encode("utf-16")) == {"name": "dév"}
+    assert fastjson.loads(b"\xef\xbb\xbf" + text.encode()) == {"name": "dév"}
+
+
+def test_errors_match_stdlib(backend):
+    text = '{\n  "a": 1,\n  "b": oops\n}'
+
+    with pytest.raises(json.JSONDecodeError) as exc_info:
+        fastjson.loads(text.encode("utf-8"))
+
+    assert (exc_info.value.lineno, exc_info.value.colno) == (3, 8)
+
+
+def test_read_file_maps_large_files(tmp_path, monkeypatch, backend):
+    path = tmp_path / "devcontainer.json"
+    path.write_text('{\n  // comment\n  "name": "dev",\n}')
+    monkeypatch.setattr(fastjson, "MMAP_THRESHOLD", 0)
+
+    with fastjson.read_file(str(path)) as data:
+        assert not isinstance(data, bytes)
+        assert jsonc.loads(data) == {"name": "dev"}
+
+    plain = tmp_path / "plain.json"
+    plain.write_text('{"name": "dev"}')
+    with fastjson.read_file(str(plain)) as data:
+        assert fastjson.loads(data) == {"name": "dev"}
+
+
+def test_backend_from_environment(monkeypatch):
+    monkeypatch.setattr(fastjson, "_backend", None)
+    monkeypatch.setenv(fastjson.JSON_BACKEND_ENV, "json")
+
+    assert fastjson.get_backend() == "json"
+
+
+def test_set_backend_rejects_unknown_and_missing(monkeypatch):
+    monkeypatch.setattr(fastjson, "_backend", None)
+    monkeypatch.setattr(fastjson, "_import_backend", lambda name: None)
+
+    with pytest.raises(ValueError, match="Unknown JSON backend: yaml"):
+        fastjson.set_backend("yaml")
+    with pytest.raises(ValueError, match="not installed: orjson"):
+        fastjson.set_backend("orjson")
@@ -0,0 +1,52 @@
+import json
+import pytest
+from validate_devschema import jsonc
+
+
+def test_loads_plain_json():
+    assert jsonc.loads('{"a": [1, 2]}') == {"a": [1, 2]}
+
+
+def test_loads_comments_and_trailing_commas():
+    text = """{
+    // The container name.
+    "name": "dev", /* inline */
+    "forwardPorts": [3000, 8080,],
+    /* a block
+       comment */
+    "features": {
+        "ghcr.io/devcontainers/features/git:1": {}, // trailing
+    },
+}
+"""
+    assert jsonc.loads(text) == {
+        "name": "dev",
+        "forwardPorts": [3000, 8080],
+        "features": {"ghcr.io/devcontainers/features/git:1": {}},
+    }
+
+
+def test_loads_trailing_comma_without_comments():
+    assert jsonc.loads('{"a": [1, 2,],}') == {"a": [1, 2]}
+
+
+def test_comment_markers_inside_strings_are_kept():
+    text = '{"url": "https://example.com/*x*/", "q": "a\\\\", "c": ",]"}'
+    assert jsonc.loads(text) == json.loads(text)
+
+
+def test_strip_jsonc_keeps_positions():
+    text = '{\n  "a": 1, // note\n  /* x\n  y */ "b": [2,],\n}'
+
+    assert jsonc.strip_jsonc(text) == (
+        '{\n  "a": 1,        \n      \n       "b": [2 ] \n}'
+    )
+
+
+def test_error_position_matches_original():
+    text = '{\n  // comment\n  "a": 1,\n  "b": oops\n}'
+
+    with pytest.raises(json.JSONDecodeError) as exc_info:
+        jsonc.loads(text)
+
+    assert (exc_info.value.lineno, exc_info.value.colno) == (4, 8)
@@ -1,21 +1,31 @@
+import json
 import pytest
 from unittest.mock import patch
 from click.testing import CliRunner
 from validate_devschema.main import main
+from validate_devschema.utils import set_http_cache
 
 
 @pytest.fixture
 def mock_load_json():
-    with patch("validate_devschema.main.load_json") as mock:
+    with (
+        patch("validate_devschema.main.load_json") as mock,
+        patch("validate_devschema.batch.load_json", new=mock),
+    ):
         yield mock
 
 
 @pytest.fixture
-def mock_validate_schema():
-    with patch("validate_devschema.main.validate_schema") as mock:
+def mock_compile_schema():
+    with patch("validate_devschema.main.compile_schema") as mock:
         yield mock
 
 
+@pytest.fixture
+def mock_validate_schema(mock_compile_schema):
+    yield mock_compile_schema.return_value.validate
+
+
 @pytest.fixture
 def runner():
     return CliRunner()
@@ -61,12 +71,12 @@ def test_main_with_missing_arguments(runner):
 
 def test_main_with_schema_validation_failure(runner):
     with patch("validate_devschema.main.load_json") as mock_load_json, patch(
-        "validate_devschema.main.validate_schema"
-    ) as mock_validate_schema:
+        "validate_devschema.batch.load_json", new=mock_load_json
+    ), patch("validate_devschema.main.compile_schema") as mock_compile_schema:
 
         mock_load_json.return_value = {"key": "value"}
 
-        mock_validate_schema.return_value = False
+        mock_compile_schema.return_value.validate.return_value = False
 
         result = runner.invoke(main, ["schema.json", "data.json", "--verbose"])
 
@@ -100,3 +110,210 @@ def test_main_with_exception(runner):
             mock_secho.assert_any_call(
                 "DEBUG: Exception details: Simulated Exception", fg="red"
             )
+
+
+def test_main_reports_cache_stats(
+    tmp_path, mock_load_json, mock_validate_schema, runner
+):
+    mock_load_json.return_value = {"key": "value"}
+    mock_validate_schema.return_value = True
+
+    try:
+        result = runner.invoke(
+            main,
+            ["schema.json", "data.json", "--cache-dir", str(tmp_path)],
+        )
+    finally:
+        set_http_cache(None)
+
+    assert result.exit_code == 0, f"Test failed with output: {result.output}"
+    assert "INFO: Schema cache: 0 hits (0 revalidated), 0 misses." in (
+        result.output
+    )
+
+
+def test_main_configures_http_session(
+    mock_load_json, mock_validate_schema, runner
+):
+    mock_load_json.return_value = {"key": "value"}
+    mock_validate_schema.return_value = True
+
+    with patch("validate_devschema.main.configure_session") as mock_configure:
+        result = runner.invoke(
+            main,
+            [
+                "schema.json",
+                "data.json",
+                "--connect-timeout",
+                "2",
+                "--read-timeout",
+                "10",
+                "--retries",
+                "1",
+                "--retry-backoff",
+                "0.2",
+            ],
+        )
+
+    assert result.exit_code == 0, f"Test failed with output: {result.output}"
+    mock_configure.assert_called_once_with(
+        connect_timeout=2.0, read_timeout=10.0, retries=1, retry_backoff=0.2
+    )
+
+
+def test_main_resolves_schema_once_for_many_files(
+    tmp_path, mock_load_json, mock_compile_schema, mock_validate_schema, runner
+):
+    for name in ("a", "b", "c"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "devcontainer.json").write_text("{}")
+    mock_load_json.return_value = {"key": "value"}
+    mock_validate_schema.side_effect = [True, False, True]
+
+    result = runner.invoke(main, ["schema.json", str(tmp_path)])
+
+    assert result.exit_code == 1, f"Test failed with output: {result.output}"
+    mock_compile_schema.assert_called_once()
+    assert mock_validate_schema.call_count == 3
+    assert "1 of 3 documents failed validation" in result.output
+    assert f"❌ {tmp_path / 'b' / 'devcontainer.json'}" in result.output
+
+
+def test_main_reads_data_paths_from_stdin(
+    mock_load_json, mock_validate_schema, runner
+):
+    mock_load_json.return_value = {"key": "value"}
+    mock_validate_schema.return_value = True
+
+    result = runner.invoke(
+        main,
+        ["--schema", "schema.json", "--files-from", "-"],
+        input="one.json\n\ntwo.json\n",
+    )
+
+    assert result.exit_code == 0, f"Test failed with output: {result.output}"
+    mock_load_json.assert_any_call("one.json", verbose=False)
+    mock_load_json.assert_any_call("two.json", verbose=False)
+    assert mock_validate_schema.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "args",
+    [["a.json"], ["a.json", "b.json"], ["-d", "a.json", "b.json"]],
+)
+def test_main_treats_positionals_as_data_with_schema_option(
+    mock_load_json, mock_compile_schema, mock_validate_schema, runner, args
+):
+    mock_load_json.return_value = {"key": "value"}
+    mock_validate_schema.return_value = True
+
+    result = runner.invoke(main, ["--schema", "schema.json", *args])
+
+    assert result.exit_code == 0, f"Test failed with output: {result.output}"
+    assert mock_compile_schema.call_args.args[1] == "schema.json"
+    assert mock_validate_schema.call_count == len(args) - args.count("-d")
+    for path in args:
+        if path != "-d":
+            mock_load_json.assert_any_call(path, verbose=False)
+
+
+def test_main_continues_after_data_load_error(
+    mock_load_json, mock_validate_schema, runner
+):
+    def load_json(path, verbose=False):
+        if path == "missing.json":
+            raise OSError("missing.json not found")
+        return {"key": "value"}
+
+    # The schema and data documents load concurrently, in any order.
+    mock_load_json.side_effect = load_json
+    mock_validate_schema.return_value = True
+
+    result = runner.invoke(main, ["schema.json", "missing.json", "ok.json"])
+
+    assert result.exit_code == 1, f"Test failed with output: {result.output}"
+    assert "ERROR: missing.json: missing.json not found" in result.output
+    assert "✅ ok.json" in result.output
+
+
+def test_main_passes_resolution_mode(
+    mock_load_json, mock_compile_schema, mock_validate_schema, runner
+):
+    mock_load_json.return_value = {"key": "value"}
+    mock_validate_schema.return_value = True
+
+    result = runner.invoke(
+        main, ["schema.json", "data.json", "--resolution", "lazy"]
+    )
+
+    assert result.exit_code == 0, f"Test failed with output: {result.output}"
+    mock_compile_schema.assert_called_once_with(
+        {"key": "value"}, "schema.json", False, "lazy"
+    )
+
+
+@patch("validate_devschema.main.watch_files")
+def test_main_watches_with_compiled_schema(
+    mock_watch_files,
+    mock_load_json,
+    mock_compile_schema,
+    mock_validate_schema,
+    runner,
+):
+    mock_load_json.return_value = {"key": "value"}
+    mock_validate_schema.return_value = False
+
+    result = runner.invoke(
+        main, ["schema.json", "data.json", "--watch", "--poll-interval", "0.2"]
+    )
+
+    assert result.exit_code == 0, f"Test failed with output: {result.output}"
+    mock_watch_files.assert_called_once_with(
+        mock_compile_schema.return_value,
+        ["data.json"],
+        "schema.json",
+        False,
+        0.2,
+        results=None,
+        stream=False,
+    )
+
+
+def test_main_streams_data_files(tmp_path, mock_load_json, runner):
+    mock_load_json.return_value = {"properties": {"age": {"type": "integer"}}}
+    data = tmp_path / "data.json"
+    data.write_text('{"age": "one"}')
+
+    result = runner.invoke(
+        main, ["schema.json", str(data), "--stream", "--verbose"]
+    )
+
+    assert result.exit_code == 1, f"Test failed with output: {result.output}"
+    mock_load_json.assert_called_once_with("schema.json", verbose=True)
+    assert f"INFO: Streaming JSON from file: {data}" in result.output
+    assert "'one' is not of type 'integer'" in result.output
+
+
+def test_main_writes_json_report(mock_load_json, runner):
+    schema = {"properties": {"age": {"type": "integer"}}}
+    mock_load_json.side_effect = lambda path, verbose=False: (
+        schema if path == "schema.json" else {"age": "one"}
+    )
+
+    result = runner.invoke(
+        main, ["schema.json", "data.json", "--format", "json"]
+    )
+
+    assert result.exit_code == 1, f"Test failed with output: {result.output}"
+    report = json.loads(result.output)
+    assert report["valid"] is False
+    assert report["results"][0]["errors"][0]["instance_path"] == "/age"
+
+
+def test_main_rejects_report_format_with_stream(runner):
+    result = runner.invoke(
+        main, ["schema.json", "data.json", "--format", "sarif", "--stream"]
+    )
+
+    assert result.exit_code == 1
+    assert "cannot be combined with --stream or --watch" in result.output
@@ -0,0 +1,99 @@
+import json
+import pytest
+from click.testing import CliRunner
+from validate_devschema.main import main
+from validate_devschema.profiling import (
+    Profiler,
+    write_profile,
+    write_step_summary,
+)
+
+SCHEMA = {
+    "properties": {"mount": {"$ref": "#/definitions/Mount"}},
+    "definitions": {"Mount": {"type": "string"}},
+}
+
+
+def test_profiler_accumulates_phases_and_counters():
+    profiler = Profiler()
+    with profiler.phase("parse"):
+        pass
+    with profiler.phase("parse"):
+        pass
+    profiler.count("bytes_read", 10)
+    profiler.count("bytes_read", 5)
+
+    report = profiler.report()
+
+    assert report["phases"]["parse"]["calls"] == 2
+    assert report["phases"]["parse"]["seconds"] >= 0
+    assert report["counters"]["bytes_read"] == 15
+    assert report["counters"]["documents_fetched"] == 0
+    assert report["total_seconds"] >= 0
+
+
+def test_profiler_records_phase_on_exception():
+    profiler = Profiler()
+    with pytest.raises(ValueError):
+        with profiler.phase("resolve"):
+            raise ValueError("boom")
+
+    assert profiler.report()["phases"]["resolve"]["calls"] == 1
+
+
+def test_write_profile_to_file(tmp_path):
+    path = tmp_path / "profile.json"
+    report = Profiler().report()
+
+    write_profile(report, str(path))
+
+    assert json.loads(path.read_text()) == report
+
+
+def test_write_step_summary(tmp_path, monkeypatch):
+    summary = tmp_path / "summary.md"
+    monkeypatch.setenv("GITHUB_STEP_SUMMARY", str(summary))
+    profiler = Profiler()
+    with profiler.phase("fetch"):
+        pass
+    profiler.count("documents_fetched", 3)
+    profiler.save("load", 0.25)
+
+    write_step_summary(profiler.report())
+
+    content = summary.read_text()
+    assert "| fetch |" in content
+    assert "| documents_fetched | 3 |" in content
+    assert "| load | 0.2500 |" in content
+
+
+def test_write_step_summary_outside_actions(monkeypatch):
+    monkeypatch.delenv("GITHUB_STEP_SUMMARY", raising=False)
+    write_step_summary(Profiler().report())
+
+
+def test_main_writes_profile(tmp_path, monkeypatch):
+    monkeypatch.delenv("GITHUB_STEP_SUMMARY", raising=False)
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(SCHEMA))
+    data_path = tmp_path / "data.json"
+    data_path.write_text(json.dumps({"mount": "/src"}))
+    profile_path = tmp_path / "profile.json"
+
+    result = CliRunner().invoke(
+        main,
+        [
+            str(schema_path),
+            str(data_path),
+            "--profile",
+            str(profile_path),
+        ],
+    )
+
+    assert result.exit_code == 0
+    report = json.loads(profile_path.read_text())
+    for phase in ("read", "parse", "resolve", "compile", "validate"):
+        assert report["phases"][phase]["calls"] >= 1
+    assert report["counters"]["refs_resolved"] == 1
+    assert report["counters"]["bytes_read"] > 0
+    assert report["saved_seconds"]["load"] >= 0
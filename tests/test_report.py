@@ -0,0 +1,74 @@
+import io
+import json
+from validate_devschema.report import build_report, build_sarif, write_report
+
+RESULTS = [
+    {"path": "ok.json", "valid": True, "errors": [], "error": None},
+    {
+        "path": "bad.json",
+        "valid": False,
+        "errors": [
+            {
+                "instance_path": "/ports/1",
+                "schema_path": "/properties/ports/items/type",
+                "keyword": "type",
+                "message": "'x' is not of type 'integer'",
+            }
+        ],
+        "error": None,
+    },
+    {
+        "path": "broken.json",
+        "valid": False,
+        "errors": [],
+        "error": "Expecting value: line 1 column 1 (char 0)",
+    },
+]
+
+
+def test_build_report():
+    report = build_report(RESULTS, "schema.json")
+
+    assert report == {
+        "schema": "schema.json",
+        "valid": False,
+        "results": RESULTS,
+    }
+    assert build_report(RESULTS[:1], "schema.json")["valid"] is True
+
+
+def test_build_sarif():
+    log = build_sarif(RESULTS, "schema.json")
+
+    assert log["version"] == "2.1.0"
+    (run,) = log["runs"]
+    assert [rule["id"] for rule in run["tool"]["driver"]["rules"]] == [
+        "type",
+        "load",
+    ]
+    error, load = run["results"]
+    assert error["ruleId"] == "type"
+    assert error["message"] == {"text": "'x' is not of type 'integer'"}
+    (location,) = error["locations"]
+    assert location["physicalLocation"] == {
+        "artifactLocation": {"uri": "bad.json"}
+    }
+    assert location["logicalLocations"][0]["fullyQualifiedName"] == (
+        "/ports/1"
+    )
+    assert error["properties"]["schemaPath"] == (
+        "/properties/ports/items/type"
+    )
+    assert load["ruleId"] == "load"
+    assert load["locations"][0]["physicalLocation"] == {
+        "artifactLocation": {"uri": "broken.json"}
+    }
+
+
+def test_write_report_formats():
+    for output_format, key in (("json", "results"), ("sarif", "runs")):
+        f = io.StringIO()
+
+        write_report(RESULTS, "schema.json", output_format, f)
+
+        assert key in json.loads(f.getvalue())
@@ -0,0 +1,172 @@
+import json
+import os
+import stat
+import threading
+import pytest
+from click.testing import CliRunner
+from validate_devschema.client import client, request_validation
+from validate_devschema.server import (
+    SchemaStore,
+    UnixValidationServer,
+    ValidationServer,
+    handle_request,
+    serve,
+)
+
+SCHEMA = {"properties": {"name": {"type": "string"}}}
+
+
+@pytest.fixture
+def files(tmp_path):
+    schema = tmp_path / "schema.json"
+    schema.write_text(json.dumps(SCHEMA))
+    valid = tmp_path / "valid.json"
+    valid.write_text('{"name": "dev"}')
+    invalid = tmp_path / "invalid.json"
+    invalid.write_text('{"name": 1}')
+    return str(schema), str(valid), str(invalid)
+
+
+@pytest.fixture
+def tcp_server():
+    server = ValidationServer(("127.0.0.1", 0), SchemaStore())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", server
+    server.shutdown()
+    server.server_close()
+
+
+def test_schema_store_reuses_and_evicts(files, tmp_path):
+    schema, _, _ = files
+    other = tmp_path / "other.json"
+    other.write_text(json.dumps(SCHEMA))
+    store = SchemaStore(max_size=1)
+
+    compiled = store.get(schema)
+    assert store.get(schema) is compiled
+
+    store.get(str(other))
+    assert len(store) == 1
+    assert store.get(schema) is not compiled
+
+
+def test_schema_store_recompiles_changed_file(files):
+    schema, _, _ = files
+    store = SchemaStore()
+    compiled = store.get(schema)
+
+    with open(schema, "w") as f:
+        json.dump({"properties": {"name": {"type": "integer"}}}, f)
+
+    assert store.get(schema) is not compiled
+
+
+def test_handle_request_reports_each_document(files):
+    schema, valid, invalid = files
+
+    response = handle_request(
+        SchemaStore(), {"schema": schema, "data": [valid, invalid]}
+    )
+
+    assert response["valid"] is False
+    assert [r["valid"] for r in response["results"]] == [True, False]
+    assert "1 is not of type 'string'" in response["results"][1]["output"]
+
+
+@pytest.mark.parametrize("data", ["valid.json", [["valid.json"]], [1]])
+def test_handle_request_rejects_data_that_is_not_paths(files, data):
+    schema, _, _ = files
+
+    with pytest.raises(ValueError, match='"data" must be a list of paths'):
+        handle_request(SchemaStore(), {"schema": schema, "data": data})
+
+
+def test_request_validation_over_tcp(files, tcp_server):
+    schema, valid, _ = files
+    address, server = tcp_server
+
+    response = request_validation(address, {"schema": schema, "data": [valid]})
+    request_validation(address, {"schema": schema, "data": [valid]})
+
+    assert response["valid"] is True
+    assert len(server.store) == 1
+
+
+def test_request_validation_rejects_bad_request(tcp_server):
+    address, _ = tcp_server
+
+    with pytest.raises(ValueError, match="Unknown resolution mode"):
+        request_validation(
+            address, {"schema": "s.json", "data": [], "resolution": "x"}
+        )
+
+
+def test_request_validation_over_unix_socket(files, tmp_path):
+    schema, _, invalid = files
+    path = str(tmp_path / "daemon.sock")
+    server = UnixValidationServer(path, SchemaStore())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        response = request_validation(
+            path, {"schema": schema, "data": [invalid]}
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert response["valid"] is False
+
+
+def test_unix_socket_is_only_accessible_to_its_owner(tmp_path):
+    path = str(tmp_path / "daemon.sock")
+    server = UnixValidationServer(path, SchemaStore())
+    try:
+        mode = os.stat(path).st_mode
+    finally:
+        server.server_close()
+
+    assert stat.S_ISSOCK(mode)
+    assert stat.S_IMODE(mode) == 0o600
+
+
+def test_serve_refuses_to_replace_a_regular_file(tmp_path):
+    path = tmp_path / "daemon.sock"
+    path.write_text("keep me")
+
+    result = CliRunner().invoke(serve, ["--socket", str(path)])
+
+    assert result.exit_code == 1
+    assert "is not a socket" in result.output
+    assert path.read_text() == "keep me"
+
+
+def test_request_validation_without_daemon(tmp_path):
+    assert request_validation(str(tmp_path / "missing.sock"), {}) is None
+
+
+def test_client_uses_daemon(files, tcp_server):
+    schema, valid, invalid = files
+    address, server = tcp_server
+
+    result = CliRunner().invoke(
+        client, [schema, valid, invalid, "--daemon", address]
+    )
+
+    assert result.exit_code == 1
+    assert f"❌ {invalid}" in result.output
+    assert len(server.store) == 1
+
+
+def test_client_falls_back_to_in_process(files, tmp_path):
+    schema, valid, _ = files
+
+    result = CliRunner().invoke(
+        client,
+        [schema, valid, "--daemon", str(tmp_path / "missing.sock"), "-v"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "validating in-process" in result.output
+    assert "completed successfully" in result.output
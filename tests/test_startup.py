@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+
+# Import time of validate_devschema.main without click, in microseconds.
+STARTUP_BUDGET_US = 100_000
+HEAVY_MODULES = ("jsonschema", "referencing", "requests", "urllib3")
+
+
+def run_python(*args):
+    env = dict(os.environ)
+    src = os.path.join(os.path.dirname(__file__), "..", "src")
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [os.path.abspath(src), env.get("PYTHONPATH")])
+    )
+    return subprocess.run(
+        [sys.executable, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+
+
+def import_time_us():
+    result = run_python(
+        "-X", "importtime", "-c", "import validate_devschema.main"
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        if total.strip().isdigit():
+            cumulative[name.strip()] = int(total)
+    return cumulative["validate_devschema.main"] - cumulative.get("click", 0)
+
+
+def test_main_does_not_import_heavy_modules():
+    result = run_python(
+        "-c",
+        "import sys, validate_devschema.main; "
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])",
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_startup_import_time_within_budget():
+    # The best of a few runs keeps a busy machine from failing the test.
+    best = min(import_time_us() for _ in range(3))
+
+    assert best < STARTUP_BUDGET_US, f"startup took {best} us"
@@ -0,0 +1,88 @@
+import hashlib
+import io
+import json
+import pytest
+from validate_devschema.stream import iter_items, validate_stream
+from validate_devschema.validate_schema import CompiledSchema
+
+DOCUMENT = """﻿{
+  "name": "café \\u00e9 \\"quoted\\" {not} [a] \\\\",
+  "nested": {"list": [1, [2, {"x": "]"}], -3.5e2], "empty": {}},
+  "flags": [true, false, null],
+  "count": 12345678901234567890,
+  "emoji": "\U0001f600",
+  "last": 0
+}
+"""
+
+
+def items(text: str, chunk_size: int = 7) -> list:
+    f = io.BytesIO(text.encode("utf-8"))
+    return list(iter_items(f, chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 1 << 20])
+def test_iter_items_matches_json_loads(chunk_size):
+    expected = json.loads(DOCUMENT.lstrip("﻿"))
+
+    assert items(DOCUMENT, chunk_size) == list(expected.items())
+
+
+FLOATS = '{"p0": -2500.0, "p1": 1, "p2": 1.5e-3, "p3": 2E+10, "p4": 7}'
+
+
+@pytest.mark.parametrize("chunk_size", range(1, len(FLOATS) + 1))
+def test_iter_items_reads_numbers_split_across_chunks(chunk_size):
+    assert items(FLOATS, chunk_size) == list(json.loads(FLOATS).items())
+
+
+def test_iter_items_yields_duplicate_keys_and_empty_objects():
+    assert items('{"a": 1, "a": 2}') == [("a", 1), ("a", 2)]
+    assert items(" { } ") == []
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        (
+            "[1, 2]",
+            "Expecting a JSON object at the top level: line 1 column 1",
+        ),
+        (
+            '{\n  "a": 1,\n}',
+            "Expecting property name enclosed in double "
+            "quotes: line 3 column 1",
+        ),
+        ('{\n  "a" 1}', "Expecting ':' delimiter: line 2 column 7"),
+        ('{"a": 1 "b": 2}', "Expecting ',' delimiter: line 1 column 9"),
+        ('{\n  "a": [1,\n  2,, 3]}', "Expecting value: line 3 column 5"),
+        ('{"a": {"b": 1', "Unterminated value: line 1 column 14"),
+        ('{"a": 1} {}', "Extra data: line 1 column 10"),
+    ],
+)
+def test_iter_items_reports_error_location(text, message):
+    with pytest.raises(ValueError) as exc_info:
+        items(text)
+
+    assert str(exc_info.value) == message
+
+
+def test_iter_items_updates_hasher(tmp_path):
+    data = DOCUMENT.encode("utf-8")
+    hasher = hashlib.sha256()
+
+    list(iter_items(io.BytesIO(data), 5, hasher))
+
+    assert hasher.hexdigest() == hashlib.sha256(data).hexdigest()
+
+
+def test_validate_stream(tmp_path, capsys):
+    compiled = CompiledSchema({"properties": {"age": {"type": "integer"}}})
+    valid = tmp_path / "valid.json"
+    valid.write_text('{"age": 1, "name": "dev"}')
+    invalid = tmp_path / "invalid.json"
+    invalid.write_text('{"name": "dev", "age": "one"}')
+
+    assert validate_stream(compiled, str(valid), chunk_size=4) is True
+    assert validate_stream(compiled, str(invalid), chunk_size=4) is False
+    assert "'one' is not of type 'integer'" in capsys.readouterr().out
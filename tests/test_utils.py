@@ -2,13 +2,22 @@ import pytest
 from unittest.mock import patch, mock_open
 from requests.exceptions import RequestException
 from validate_devschema.utils import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
     collect_refs,
+    configure_session,
+    expand_data_paths,
+    get_session,
+    iter_refs,
+    json_pointer,
     load_json,
 )
 
+DEFAULT_TIMEOUT = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+
 
 @patch("validate_devschema.validate_schema.click.secho")
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_fetching_json_verbose_logging(mock_requests_get, mock_secho):
     """
     Test that `click.secho` logs the correct message when fetching JSON
@@ -16,18 +25,20 @@ def test_fetching_json_verbose_logging(mock_requests_get, mock_secho):
     """
     url = "http://example.com/schema.json"
     mock_requests_get.return_value.status_code = 200
-    mock_requests_get.return_value.json.return_value = {"key": "value"}
+    mock_requests_get.return_value.content = b'{"key": "value"}'
 
     load_json(url, verbose=True)
 
     mock_secho.assert_any_call(
         f"INFO: Fetching JSON from URL: {url}", fg="blue"
     )
-    mock_requests_get.assert_called_once_with(url)
+    mock_requests_get.assert_called_once_with(
+        url, headers={}, timeout=DEFAULT_TIMEOUT
+    )
 
 
 @patch("validate_devschema.validate_schema.click.secho")
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_fetching_json_logs_error(mock_requests_get, mock_secho):
     """
     Test that `click.secho` logs the correct error message when fetching
@@ -83,24 +94,26 @@ def test_loading_json_logs_info(mock_open_func, mock_secho):
     )
 
 
-@patch("builtins.open", new_callable=mock_open, read_data='{"key": "value"}')
+@patch("builtins.open", new_callable=mock_open, read_data=b'{"key": "value"}')
 def test_load_json_from_file(mock_file):
     result = load_json("fake_file.json", verbose=False)
     assert result == {"key": "value"}
-    mock_file.assert_called_once_with("fake_file.json", "r")
+    mock_file.assert_called_once_with("fake_file.json", "rb")
 
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_load_json_from_url_success(mock_get):
-    mock_get.return_value.json.return_value = {"key": "value"}
+    mock_get.return_value.content = b'{"key": "value"}'
     mock_get.return_value.status_code = 200
 
     result = load_json("http://example.com", verbose=False)
     assert result == {"key": "value"}
-    mock_get.assert_called_once_with("http://example.com")
+    mock_get.assert_called_once_with(
+        "http://example.com", headers={}, timeout=DEFAULT_TIMEOUT
+    )
 
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_load_json_from_url_failure(mock_get):
     mock_get.side_effect = Exception("Request failed")
 
@@ -158,10 +171,108 @@ def test_collect_refs_iterates_over_list(mock_secho):
         "http://example.com/schema2.json",
     ]
 
-    expected_ref1 = "INFO: Found $ref: http://example.com/schema1.json"
-    expected_ref2 = "INFO: Found $ref: http://example.com/schema2.json"
+    expected_ref1 = (
+        "INFO: Found $ref: http://example.com/schema1.json"
+        " at #/properties/name/items/0"
+    )
+    expected_ref2 = (
+        "INFO: Found $ref: http://example.com/schema2.json"
+        " at #/properties/name/items/1"
+    )
 
     mock_secho.assert_any_call(expected_ref1, fg="cyan")
     mock_secho.assert_any_call(expected_ref2, fg="cyan")
 
     assert mock_secho.call_count == 2
+
+
+def test_configure_session_mounts_retrying_adapter():
+    configure_session(
+        connect_timeout=1, read_timeout=2, retries=4, retry_backoff=0.1
+    )
+    try:
+        session = get_session()
+        assert get_session() is session
+        adapter = session.get_adapter("https://example.com")
+        assert adapter.max_retries.total == 4
+        assert adapter.max_retries.backoff_factor == 0.1
+    finally:
+        configure_session()
+
+
+@patch("requests.Session.get")
+def test_load_json_uses_configured_timeouts(mock_get):
+    mock_get.return_value.content = b'{"key": "value"}'
+    configure_session(connect_timeout=1, read_timeout=2)
+    try:
+        load_json("http://example.com")
+    finally:
+        configure_session()
+
+    mock_get.assert_called_once_with(
+        "http://example.com", headers={}, timeout=(1, 2)
+    )
+
+
+def test_expand_data_paths(tmp_path):
+    (tmp_path / "a" / ".devcontainer").mkdir(parents=True)
+    (tmp_path / "a" / ".devcontainer" / "devcontainer.json").write_text("{}")
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / ".devcontainer.json").write_text("{}")
+    (tmp_path / "b" / "other.json").write_text("{}")
+    url = "http://example.com/devcontainer.json"
+
+    paths = expand_data_paths(
+        [
+            str(tmp_path),
+            str(tmp_path / "b" / "*.json"),
+            url,
+            "missing.json",
+        ]
+    )
+
+    assert paths == [
+        str(tmp_path / "a" / ".devcontainer" / "devcontainer.json"),
+        str(tmp_path / "b" / ".devcontainer.json"),
+        str(tmp_path / "b" / "other.json"),
+        url,
+        "missing.json",
+    ]
+
+
+def test_iter_refs_reports_paths_in_document_order():
+    schema = {
+        "$ref": "#/definitions/root",
+        "properties": {
+            "a/b": {"$ref": "#/definitions/slash"},
+            "c~d": {"items": [{"type": "string"}, {"$ref": "#/tilde"}]},
+        },
+    }
+
+    found = [(json_pointer(path), node) for path, node in iter_refs(schema)]
+
+    assert found == [
+        ("", schema),
+        ("/properties/a~1b", {"$ref": "#/definitions/slash"}),
+        ("/properties/c~0d/items/1", {"$ref": "#/tilde"}),
+    ]
+
+
+def test_iter_refs_enters_only_containers_with_containers():
+    inner = {"$ref": "#/inner"}
+    outer = {"$ref": "#/outer", "items": inner, "enum": [1, "a", None]}
+    schema = {"a": [[], {}, [outer]], "b": {"type": "string"}}
+
+    found = [(json_pointer(path), node) for path, node in iter_refs(schema)]
+
+    assert found == [("/a/2/0", outer), ("/a/2/0/items", inner)]
+
+
+def test_collect_refs_beyond_recursion_limit():
+    schema = node = {}
+    for _ in range(5000):
+        node["items"] = [{}]
+        node = node["items"][0]
+    node["$ref"] = "http://example.com/leaf.json"
+
+    assert collect_refs(schema) == ["http://example.com/leaf.json"]
@@ -1,9 +1,19 @@
+import copy
+import pickle
 import jsonschema
 import pytest
 from jsonschema import ValidationError
-from unittest.mock import call, patch
+from unittest.mock import patch
+from validate_devschema.utils import iter_refs
 from validate_devschema.validate_schema import (
+    CompiledSchema,
+    LazyCompiledSchema,
+    ResolutionMemo,
+    compile_schema,
+    compile_patterns,
+    compile_validators,
     merge_all_of,
+    prefetch_references,
     resolve_references,
     resolve_internal_ref,
     validate_schema,
@@ -324,12 +334,13 @@ def test_merge_all_of_ref_resolution_simple(
     }
 
     mock_load_json.return_value = resolved_schema1
-    mock_resolve_references.side_effect = lambda s, b, v: s
+    mock_resolve_references.side_effect = lambda s, b, v, m: s
 
     result = merge_all_of(schema, base_url, verbose=False)
 
     expected = {
         "properties": {
+            "name": {"type": "string"},
             "age": {"type": "integer"},
         },
         "type": "object",
@@ -354,10 +365,7 @@ def test_merge_all_of_ref_resolution_simple(
         "properties": {"name": {"type": "string"}, "age": {"type": "integer"}}
     },
 )
-@patch("validate_devschema.validate_schema.jsonschema.validate")
-def test_validate_schema_success(
-    mock_validate, mock_merge_all_of, mock_resolve_references
-):
+def test_validate_schema_success(mock_merge_all_of, mock_resolve_references):
     schema = {"$id": "http://mocked-schemas.local/schema.json"}
     instance = {"name": "Alice", "age": 30}
     result = validate_schema(
@@ -378,32 +386,164 @@ def test_validate_schema_success(
         "properties": {"name": {"type": "string"}, "age": {"type": "integer"}}
     },
 )
-@patch(
-    "validate_devschema.validate_schema.jsonschema.validate",
-    side_effect=[
-        None,
-        jsonschema.ValidationError("Validation failed for age"),
-    ],
-)
+@patch("validate_devschema.validate_schema.click.secho")
 def test_validate_schema_failure(
-    mock_validate, mock_merge_all_of, mock_resolve_references
+    mock_secho, mock_merge_all_of, mock_resolve_references
 ):
     schema = {"$id": "http://mocked-schemas.local/schema.json"}
-    instance = {"name": "Alice", "age": "invalid"}
+    instance = {"name": "Alice", "age": "invalid", "extra": 1}
 
     result = validate_schema(
         schema, instance, schema_url=schema["$id"], verbose=True
     )
 
-    expected_calls = [
-        call({"name": "Alice"}, {"name": {"type": "string"}}),
-        call({"age": "invalid"}, {"age": {"type": "integer"}}),
+    mock_secho.assert_any_call(
+        "ERROR: Validation failed for age: "
+        "'invalid' is not of type 'integer'",
+        fg="red",
+    )
+    assert result is False
+
+
+def test_compile_validators_builds_one_validator_per_property():
+    schema = {
+        "properties": {
+            "name": {"type": "string"},
+            "mount": {"$ref": "#/definitions/Mount"},
+            "settings": {"$ref": "vscode://schemas/settings/machine"},
+        },
+        "definitions": {"Mount": {"type": "object"}},
+    }
+
+    validators = compile_validators(schema)
+
+    assert set(validators) == {"name", "mount", "settings"}
+    assert validators["name"].is_valid("Alice")
+    assert not validators["name"].is_valid(1)
+    assert validators["mount"].is_valid({})
+    assert not validators["mount"].is_valid("mount")
+    assert validators["settings"].is_valid({"any": "value"})
+
+
+def test_compiled_schema_is_reused_across_instances():
+    compiled = CompiledSchema(
+        {"properties": {"age": {"type": "integer", "minimum": 0}}}
+    )
+
+    with patch(
+        "validate_devschema.validate_schema.compile_validators"
+    ) as mock_compile:
+        assert compiled.validate({"age": 1}) is True
+        assert compiled.validate({"age": -1}) is False
+        assert compiled.validate({"other": "ignored"}) is True
+
+    mock_compile.assert_not_called()
+
+
+def test_check_collects_every_error_in_one_pass():
+    compiled = CompiledSchema(
+        {
+            "properties": {
+                "name": {"type": "string"},
+                "ports": {"type": "array", "items": {"type": "integer"}},
+                "a/b": {"$ref": "#/definitions/Mount"},
+            },
+            "definitions": {"Mount": {"type": "object", "required": ["x"]}},
+        }
+    )
+    instance = {"name": 1, "ports": [1, "two", 3.5], "a/b": {}, "extra": 1}
+
+    errors = compiled.check(instance)
+
+    assert errors == [
+        {
+            "instance_path": "/name",
+            "schema_path": "/properties/name/type",
+            "keyword": "type",
+            "message": "1 is not of type 'string'",
+        },
+        {
+            "instance_path": "/ports/1",
+            "schema_path": "/properties/ports/items/type",
+            "keyword": "type",
+            "message": "'two' is not of type 'integer'",
+        },
+        {
+            "instance_path": "/ports/2",
+            "schema_path": "/properties/ports/items/type",
+            "keyword": "type",
+            "message": "3.5 is not of type 'integer'",
+        },
+        {
+            "instance_path": "/a~1b",
+            "schema_path": "/properties/a~1b/required",
+            "keyword": "required",
+            "message": "'x' is a required property",
+        },
     ]
-    print(mock_validate.mock_calls)
-    assert mock_validate.call_count == 2
-    mock_validate.assert_has_calls(expected_calls, any_order=False)
+    assert compiled.check({"name": "x", "extra": 1}) == []
+    assert CompiledSchema({"type": "object"}).check({"any": 1}) == []
 
-    assert result is False
+
+def test_compile_patterns_collects_pattern_keywords():
+    shared = {"type": "string", "pattern": "^[a-z]+$"}
+    schema = {
+        "properties": {
+            "pattern": {"type": "string"},
+            "name": shared,
+            "alias": shared,
+            "env": {
+                "patternProperties": {"^A": {}, "^B": {"pattern": "(unclosed"}}
+            },
+        }
+    }
+
+    regexes = compile_patterns([schema])
+
+    assert set(regexes) == {"^[a-z]+$", "^A", "^B", "^A|^B"}
+    assert regexes["^A|^B"].search("Bx")
+
+
+def test_compiled_patterns_match_jsonschema():
+    schema = {
+        "properties": {
+            "name": {"type": "string", "pattern": "^[a-z]+$"},
+            "env": {
+                "type": "object",
+                "patternProperties": {"^[A-Z_]+$": {"type": "string"}},
+                "additionalProperties": False,
+            },
+            "labels": {
+                "type": "object",
+                "properties": {"team": {"type": "string"}},
+                "additionalProperties": {"type": "integer"},
+            },
+        }
+    }
+    compiled = CompiledSchema(schema)
+    instances = [
+        {"name": "abc", "env": {"HOME": "/root"}, "labels": {"team": "a"}},
+        {"name": "ABC", "env": {"HOME": 1, "lower": "x", "other": "y"}},
+        {"labels": {"team": "a", "size": "big", "count": 2}},
+    ]
+
+    for instance in instances:
+        expected = sorted(
+            error.message
+            for error in jsonschema.Draft202012Validator(schema).iter_errors(
+                instance
+            )
+        )
+        actual = sorted(error["message"] for error in compiled.check(instance))
+        assert actual == expected
+
+    with patch("re.search", side_effect=AssertionError("not precompiled")):
+        assert compiled.check(instances[0]) == []
+
+
+def test_compile_validators_rejects_invalid_schema():
+    with pytest.raises(jsonschema.SchemaError):
+        compile_validators({"properties": {"age": {"type": 12}}})
 
 
 @patch("validate_devschema.validate_schema.load_json")
@@ -476,3 +616,660 @@ def dummy_jsonschema_validate(instance, schema):
         raise jsonschema.ValidationError("Validation failed")
     if "age" in instance and instance["age"] == "unexpected":
         raise Exception("Unexpected error occurred")
+
+
+@patch("validate_devschema.validate_schema.load_json")
+def test_resolve_references_fetches_shared_ref_once(mock_load_json):
+    mock_load_json.return_value = {
+        "definitions": {"Mount": {"type": "string"}}
+    }
+    schema = {
+        "properties": {
+            f"mount{i}": {"$ref": "./defs.json#/definitions/Mount"}
+            for i in range(50)
+        }
+    }
+
+    memo = ResolutionMemo()
+    resolved = resolve_references(
+        schema, "http://mocked-schemas.local/", memo=memo
+    )
+
+    mock_load_json.assert_called_once_with(
+        "http://mocked-schemas.local/defs.json", False
+    )
+    assert resolved["properties"]["mount0"] == {"type": "string"}
+    assert (
+        resolved["properties"]["mount0"] is resolved["properties"]["mount49"]
+    )
+    assert list(memo.resolved) == [
+        "http://mocked-schemas.local/defs.json#/definitions/Mount"
+    ]
+
+
+@patch("validate_devschema.validate_schema.load_json")
+def test_resolve_references_mutual_external_cycle(mock_load_json):
+    documents = {
+        "http://mocked-schemas.local/a.json": {
+            "properties": {"b": {"$ref": "./b.json"}}
+        },
+        "http://mocked-schemas.local/b.json": {
+            "properties": {"a": {"$ref": "./a.json"}}
+        },
+    }
+    mock_load_json.side_effect = lambda url, verbose: documents[url]
+
+    resolved = resolve_references(
+        {"$ref": "./a.json"}, "http://mocked-schemas.local/"
+    )
+
+    # The cut reference is absolute, as it is relative to b.json.
+    assert resolved == {
+        "properties": {
+            "b": {
+                "properties": {
+                    "a": {"$ref": "http://mocked-schemas.local/a.json#"}
+                }
+            }
+        }
+    }
+    assert mock_load_json.call_count == 2
+
+
+def test_internal_ref_resolves_against_document_root():
+    schema = {
+        "properties": {"mount": {"$ref": "#/definitions/Mount"}},
+        "definitions": {"Mount": {"type": "string"}},
+    }
+    resolved = resolve_references(schema, "http://mocked-schemas.local/")
+    assert resolved["properties"]["mount"] == {"type": "string"}
+
+
+def test_resolve_internal_ref_unescapes_pointer():
+    schema = {"definitions": {"a/b": [{"type": "string"}]}}
+    assert resolve_internal_ref(schema, "#/definitions/a~1b/0") == {
+        "type": "string"
+    }
+
+
+@patch("validate_devschema.validate_schema.load_json")
+def test_prefetch_references_walks_graph_by_level(mock_load_json):
+    documents = {
+        "http://mocked-schemas.local/a.json": {
+            "properties": {"c": {"$ref": "./c.json#/definitions/C"}}
+        },
+        "http://mocked-schemas.local/b.json": {"type": "string"},
+        "http://mocked-schemas.local/c.json": {
+            "definitions": {"C": {"$ref": "#/definitions/D"}, "D": {}},
+            "properties": {"a": {"$ref": "./a.json"}},
+        },
+    }
+    mock_load_json.side_effect = lambda url, verbose: documents[url]
+    schema = {
+        "properties": {
+            "a": {"$ref": "./a.json"},
+            "b": {"$ref": "./b.json"},
+            "config": {"$ref": "vscode://schemas/settings/machine"},
+        }
+    }
+    base_url = "http://mocked-schemas.local/"
+
+    memo = ResolutionMemo()
+    fetched = prefetch_references(schema, base_url, memo)
+
+    assert fetched == 3
+    assert memo.documents == documents
+    assert mock_load_json.call_count == 3
+
+    resolve_references(schema, base_url, memo=memo)
+    assert mock_load_json.call_count == 3
+
+
+@patch("validate_devschema.validate_schema.load_json")
+def test_prefetch_references_skips_failed_documents(mock_load_json):
+    mock_load_json.side_effect = Exception("Network error")
+    schema = {"properties": {"a": {"$ref": "./a.json"}}}
+
+    memo = ResolutionMemo()
+    fetched = prefetch_references(schema, "http://mocked-schemas.local/", memo)
+
+    assert fetched == 0
+    assert memo.documents == {}
+    mock_load_json.assert_called_once_with(
+        "http://mocked-schemas.local/a.json", False
+    )
+
+
+@patch("validate_devschema.validate_schema.load_json")
+def test_failed_document_is_loaded_once(mock_load_json):
+    mock_load_json.side_effect = ConnectionError("unreachable")
+    dead = "http://mocked-schemas.local/dead.json"
+    schema = {
+        "properties": {
+            f"p{i}": {"$ref": f"{dead}#/definitions/d{i}"} for i in range(10)
+        },
+        "allOf": [{"$ref": dead}],
+    }
+
+    compiled = compile_schema(schema, "http://mocked-schemas.local/s.json")
+
+    assert mock_load_json.call_count == 1
+    assert compiled.schema["properties"]["p0"] == {
+        "$ref": f"{dead}#/definitions/d0"
+    }
+    memo = ResolutionMemo()
+    with pytest.raises(ConnectionError):
+        memo.document(dead)
+    with pytest.raises(ConnectionError):
+        memo.document(dead)
+    assert mock_load_json.call_count == 2
+
+
+LAZY_DOCUMENTS = {
+    "http://mocked-schemas.local/base.json": {
+        "properties": {
+            "mount": {"$ref": "#/definitions/Mount"},
+            "ports": {"$ref": "./ports.json"},
+        },
+        "definitions": {"Mount": {"type": "string"}},
+    },
+    "http://mocked-schemas.local/ports.json": {
+        "type": "array",
+        "items": {"type": "integer"},
+    },
+}
+LAZY_SCHEMA = {
+    "$id": "http://mocked-schemas.local/schema.json",
+    "allOf": [
+        {"$ref": "./base.json"},
+        {"properties": {"name": {"type": "string"}}},
+    ],
+}
+
+
+@patch("validate_devschema.validate_schema.load_json")
+def test_lazy_schema_resolves_refs_on_demand(mock_load_json):
+    mock_load_json.side_effect = lambda url, verbose: LAZY_DOCUMENTS[url]
+
+    compiled = LazyCompiledSchema(LAZY_SCHEMA, LAZY_SCHEMA["$id"])
+
+    assert set(compiled.validators) == {"mount", "ports", "name"}
+    mock_load_json.assert_called_once_with(
+        "http://mocked-schemas.local/base.json", False
+    )
+
+    assert compiled.validate({"mount": "/src", "name": "x"}) is True
+    assert mock_load_json.call_count == 1
+
+    assert compiled.validate({"ports": [1, "two"]}) is False
+    assert mock_load_json.call_count == 2
+    assert compiled.validate({"ports": [1, 2]}) is True
+    assert mock_load_json.call_count == 2
+
+
+@patch("validate_devschema.validate_schema.load_json")
+def test_lazy_and_eager_resolution_agree(mock_load_json):
+    mock_load_json.side_effect = lambda url, verbose: copy.deepcopy(
+        LAZY_DOCUMENTS[url]
+    )
+    schema = {
+        "$id": "http://mocked-schemas.local/schema.json",
+        "allOf": [{"$ref": "./base.json"}, {"type": "object"}],
+    }
+    instances = [
+        {"mount": "/src", "ports": [1, 2]},
+        {"mount": 1},
+        {"ports": ["a"]},
+        {"unknown": 1},
+    ]
+
+    lazy = compile_schema(
+        copy.deepcopy(schema), schema["$id"], resolution="lazy"
+    )
+    eager = compile_schema(
+        copy.deepcopy(schema), schema["$id"], resolution="eager"
+    )
+
+    assert isinstance(lazy, LazyCompiledSchema)
+    for instance in instances:
+        assert lazy.validate(instance) == eager.validate(instance)
+        assert [error["instance_path"] for error in lazy.check(instance)] == [
+            error["instance_path"] for error in eager.check(instance)
+        ]
+
+
+def test_lazy_schema_applies_every_definition_of_a_property():
+    schema = {
+        "$id": "http://mocked-schemas.local/schema.json",
+        "properties": {"n": {"type": "integer"}},
+        "allOf": [{"properties": {"n": {"minimum": 5}}}],
+    }
+
+    lazy = compile_schema(
+        copy.deepcopy(schema), schema["$id"], resolution="lazy"
+    )
+    eager = compile_schema(
+        copy.deepcopy(schema), schema["$id"], resolution="eager"
+    )
+
+    for instance, expected in [({"n": 7}, True), ({"n": "x"}, False)]:
+        assert lazy.validate(instance) is expected
+        assert eager.validate(instance) is expected
+    assert lazy.validate({"n": 1}) is False
+
+
+NESTED_DOCUMENTS = {
+    "base.json": {
+        "allOf": [
+            {"$ref": "./ports.json"},
+            {"allOf": [{"properties": {"name": {"type": "string"}}}]},
+        ]
+    },
+    "ports.json": {
+        "allOf": [{"$ref": "#/definitions/port"}],
+        "definitions": {"port": {"properties": {"port": {"type": "integer"}}}},
+    },
+}
+
+
+@pytest.mark.parametrize(
+    "instance, expected",
+    [
+        ({"port": 1, "name": "x"}, True),
+        ({"port": "1"}, False),
+        ({"name": 2}, False),
+        ({"other": 1}, True),
+    ],
+)
+@patch("validate_devschema.validate_schema.load_json")
+def test_lazy_and_eager_agree_on_nested_all_of(
+    mock_load_json, instance, expected
+):
+    mock_load_json.side_effect = lambda url, verbose: copy.deepcopy(
+        NESTED_DOCUMENTS[url]
+    )
+    schema = {"allOf": [{"$ref": "./base.json"}]}
+
+    lazy = compile_schema(
+        copy.deepcopy(schema), "schema.json", resolution="lazy"
+    )
+    eager = compile_schema(
+        copy.deepcopy(schema), "schema.json", resolution="eager"
+    )
+
+    assert set(lazy.validators) == set(eager.validators) == {"port", "name"}
+    assert lazy.validate(instance) is expected
+    assert eager.validate(instance) is expected
+
+
+@patch("validate_devschema.validate_schema.load_json")
+def test_lazy_schema_resolves_internal_all_of_refs_in_place(mock_load_json):
+    schema = {
+        "$id": "http://mocked-schemas.local/schema.json",
+        "allOf": [{"$ref": "#/definitions/base"}],
+        "definitions": {"base": {"properties": {"name": {"type": "string"}}}},
+    }
+
+    compiled = compile_schema(schema, schema["$id"], resolution="lazy")
+
+    assert set(compiled.validators) == {"name"}
+    assert compiled.validate({"name": 1}) is False
+    mock_load_json.assert_not_called()
+
+
+@patch("validate_devschema.validate_schema.load_json")
+def test_lazy_schema_fetches_verbosely(mock_load_json):
+    mock_load_json.side_effect = lambda url, verbose: LAZY_DOCUMENTS[url]
+
+    compiled = LazyCompiledSchema(
+        LAZY_SCHEMA, LAZY_SCHEMA["$id"], verbose=True
+    )
+
+    assert compiled.validate({"ports": [1]}) is True
+    mock_load_json.assert_any_call(
+        "http://mocked-schemas.local/base.json", True
+    )
+    mock_load_json.assert_any_call(
+        "http://mocked-schemas.local/ports.json", True
+    )
+
+
+CYCLIC_DOCUMENTS = {
+    "http://mocked-schemas.local/tree.json": {
+        "definitions": {
+            "node": {
+                "type": "object",
+                "properties": {
+                    "value": {"type": "integer"},
+                    "children": {
+                        "type": "array",
+                        "items": {"$ref": "#/definitions/node"},
+                    },
+                },
+            }
+        }
+    },
+    "http://mocked-schemas.local/a.json": {
+        "type": "object",
+        "properties": {"b": {"$ref": "./b.json"}, "n": {"type": "integer"}},
+    },
+    "http://mocked-schemas.local/b.json": {
+        "type": "object",
+        "properties": {"a": {"$ref": "./a.json"}},
+    },
+}
+
+
+@pytest.mark.parametrize(
+    "ref, valid, invalid",
+    [
+        (
+            "./tree.json#/definitions/node",
+            {"value": 1, "children": [{"value": 2, "children": []}]},
+            {"value": 1, "children": [{"value": "two"}]},
+        ),
+        (
+            "./a.json",
+            {"n": 1, "b": {"a": {"n": 2, "b": {}}}},
+            {"b": {"a": {"n": "two"}}},
+        ),
+    ],
+)
+@patch("validate_devschema.validate_schema.load_json")
+def test_eager_schema_validates_cycles_in_fetched_documents(
+    mock_load_json, ref, valid, invalid
+):
+    mock_load_json.side_effect = lambda url, verbose: copy.deepcopy(
+        CYCLIC_DOCUMENTS[url]
+    )
+    schema = {
+        "$id": "http://mocked-schemas.local/schema.json",
+        "properties": {"tree": {"$ref": ref}},
+    }
+
+    eager = compile_schema(
+        copy.deepcopy(schema), schema["$id"], resolution="eager"
+    )
+    lazy = compile_schema(
+        copy.deepcopy(schema), schema["$id"], resolution="lazy"
+    )
+
+    assert eager.documents
+    for instance, expected in [
+        ({"tree": valid}, True),
+        ({"tree": invalid}, False),
+    ]:
+        assert eager.validate(instance) is expected
+        assert lazy.validate(instance) is expected
+        assert bool(eager.check(instance)) is not expected
+    restored = pickle.loads(pickle.dumps(eager))
+    assert restored.validate({"tree": valid}) is True
+
+
+def test_lazy_schema_survives_pickling():
+    compiled = LazyCompiledSchema(
+        LAZY_SCHEMA, LAZY_SCHEMA["$id"], documents=LAZY_DOCUMENTS
+    )
+
+    restored = pickle.loads(pickle.dumps(compiled))
+
+    assert restored.memo.documents == LAZY_DOCUMENTS
+    assert restored.validate({"ports": [1, 2], "mount": "/src"}) is True
+    assert restored.validate({"mount": 1}) is False
+
+
+def test_merge_all_of_flattens_nested_blocks():
+    schema = {
+        "properties": {
+            "build": {
+                "allOf": [
+                    {"properties": {"context": {"type": "string"}}},
+                    {
+                        "properties": {"target": {"type": "string"}},
+                        "required": ["target"],
+                    },
+                ]
+            },
+            "allOf": {"type": "string"},
+        },
+        "definitions": {
+            "Port": {"allOf": [{"type": "integer"}, {"minimum": 0}]}
+        },
+    }
+
+    result = merge_all_of(schema, "http://mocked-schemas.local/")
+
+    assert result["properties"]["build"] == {
+        "properties": {
+            "context": {"type": "string"},
+            "target": {"type": "string"},
+        },
+        "required": ["target"],
+    }
+    assert result["properties"]["allOf"] == {"type": "string"}
+    assert result["definitions"]["Port"] == {"type": "integer", "minimum": 0}
+
+
+def test_merge_all_of_keeps_conflicting_members():
+    strict = {
+        "properties": {"a": {"type": "string"}},
+        "additionalProperties": False,
+    }
+    schema = {
+        "allOf": [
+            {"type": "string"},
+            {"type": "integer"},
+            strict,
+            {"properties": {"b": {"type": "string"}}},
+        ]
+    }
+
+    result = merge_all_of(schema, "http://mocked-schemas.local/")
+
+    assert result == {
+        "type": "string",
+        "properties": {"b": {"type": "string"}},
+        "allOf": [{"type": "integer"}, strict],
+    }
+
+
+@pytest.mark.parametrize(
+    "schema, instances",
+    [
+        (
+            {
+                "else": {"type": "string"},
+                "allOf": [{"if": {"type": "integer"}, "then": {"minimum": 5}}],
+            },
+            [[1], 1, 7, "x"],
+        ),
+        (
+            {
+                "contains": {"type": "string"},
+                "allOf": [{"minContains": 2}],
+            },
+            [["a"], ["a", "b"], [1]],
+        ),
+        (
+            {
+                "prefixItems": [{"type": "string"}],
+                "allOf": [{"items": {"type": "integer"}}],
+            },
+            [["a", 1], [1, 2], ["a", "b"]],
+        ),
+        (
+            {
+                "items": {"type": "integer"},
+                "allOf": [{"prefixItems": [{"type": "string"}]}],
+            },
+            [["a", 1], [1, 2], ["a", "b"]],
+        ),
+    ],
+)
+def test_merge_all_of_keeps_what_the_schema_accepts(schema, instances):
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        **schema,
+    }
+
+    result = merge_all_of(schema, "http://mocked-schemas.local/")
+
+    for instance in instances:
+        assert jsonschema.Draft202012Validator(result).is_valid(
+            instance
+        ) == jsonschema.Draft202012Validator(schema).is_valid(instance)
+
+
+def test_merge_all_of_combines_shared_property_schemas():
+    schema = {
+        "allOf": [
+            {"properties": {"a": {"type": "string"}}},
+            {"properties": {"a": {"maxLength": 3}}},
+        ]
+    }
+
+    result = merge_all_of(schema, "http://mocked-schemas.local/")
+
+    assert result == {"properties": {"a": {"type": "string", "maxLength": 3}}}
+
+
+def test_merge_all_of_flattens_shared_subschemas_once():
+    shared = {"allOf": [{"type": "string"}, {"minLength": 1}]}
+    schema = {"properties": {"a": shared, "b": shared, "c": {"type": "x"}}}
+
+    result = merge_all_of(schema, "http://mocked-schemas.local/")
+
+    assert result["properties"]["a"] is result["properties"]["b"]
+    assert result["properties"]["c"] is schema["properties"]["c"]
+
+
+@patch("validate_devschema.validate_schema.load_json")
+def test_merge_all_of_reuses_memo_documents(mock_load_json):
+    memo = ResolutionMemo()
+    memo.documents["http://mocked-schemas.local/base.json"] = {
+        "properties": {"name": {"type": "string"}}
+    }
+    schema = {"allOf": [{"$ref": "./base.json"}]}
+
+    result = merge_all_of(schema, "http://mocked-schemas.local/", memo=memo)
+
+    assert result == {"properties": {"name": {"type": "string"}}}
+    mock_load_json.assert_not_called()
+
+
+def test_resolve_references_shares_unchanged_subtrees():
+    schema = {
+        "properties": {
+            "a": {"$ref": "#/definitions/Mount"},
+            "b": {"$ref": "#/definitions/Mount"},
+            "c": {"type": "object", "properties": {"d": {"type": "string"}}},
+        },
+        "definitions": {"Mount": {"type": "string"}},
+    }
+
+    resolved = resolve_references(schema, "http://mocked-schemas.local/")
+
+    assert resolved is not schema
+    assert resolved["definitions"] is schema["definitions"]
+    assert resolved["properties"]["c"] is schema["properties"]["c"]
+    assert resolved["properties"]["a"] is resolved["properties"]["b"]
+    assert schema["properties"]["a"] == {"$ref": "#/definitions/Mount"}
+
+
+def test_resolve_references_beyond_recursion_limit():
+    depth = 5000
+    schema = {"definitions": {"leaf": {"type": "string"}}}
+    node = schema
+    for _ in range(depth):
+        node["child"] = {}
+        node = node["child"]
+    node["$ref"] = "#/definitions/leaf"
+
+    resolved = resolve_references(schema, "http://mocked-schemas.local/")
+
+    node = resolved
+    for _ in range(depth):
+        node = node["child"]
+    assert node == {"type": "string"}
+
+
+def test_resolve_references_follows_long_ref_chains():
+    length = 3000
+    schema = {
+        "definitions": {
+            f"d{i}": {"$ref": f"#/definitions/d{i + 1}"} for i in range(length)
+        },
+        "$ref": "#/definitions/d0",
+    }
+    schema["definitions"][f"d{length}"] = {"type": "integer"}
+
+    resolved = resolve_references(schema, "http://mocked-schemas.local/")
+
+    assert resolved == {"type": "integer"}
+
+
+@patch("validate_devschema.validate_schema.load_json")
+def test_resolve_references_keeps_ref_of_failed_external_target(
+    mock_load_json,
+):
+    mock_load_json.return_value = {
+        "definitions": {"Bad": {"items": [{"$ref": "defs.json"}]}}
+    }
+    schema = {
+        "properties": {
+            "a": {"$ref": "./defs.json#/definitions/Bad"},
+            "b": {"$ref": "#/definitions/Ok"},
+        },
+        "definitions": {"Ok": {"type": "string"}},
+    }
+
+    resolved = resolve_references(schema, "http://mocked-schemas.local/")
+
+    assert resolved["properties"] == {
+        "a": {"$ref": "./defs.json#/definitions/Bad"},
+        "b": {"type": "string"},
+    }
+    with pytest.raises(ValueError, match="Invalid reference: defs.json"):
+        resolve_references(
+            {"items": [{"$ref": "defs.json"}]}, "http://mocked-schemas.local/"
+        )
+
+
+def test_resolve_references_reports_cycle_pointer(capsys):
+    schema = {
+        "properties": {"head": {"$ref": "#/definitions/node"}},
+        "definitions": {
+            "node": {"properties": {"next": {"$ref": "#/definitions/node"}}}
+        },
+    }
+
+    resolve_references(schema, "http://mocked-schemas.local/", verbose=True)
+
+    assert (
+        "Skipping cyclic reference: #/definitions/node at "
+        "/properties/head/properties/next" in capsys.readouterr().out
+    )
+
+
+@patch("validate_devschema.validate_schema.load_json")
+def test_prefetch_and_resolve_walk_each_document_once(mock_load_json):
+    mock_load_json.return_value = {
+        "definitions": {"Mount": {"type": "string"}}
+    }
+    schema = {
+        "properties": {"mount": {"$ref": "./defs.json#/definitions/Mount"}}
+    }
+    memo = ResolutionMemo()
+
+    with patch(
+        "validate_devschema.validate_schema.iter_refs",
+        wraps=iter_refs,
+    ) as mock_iter_refs:
+        prefetch_references(schema, "http://mocked-schemas.local/", memo)
+        resolved = resolve_references(
+            schema, "http://mocked-schemas.local/", memo=memo
+        )
+
+    assert resolved["properties"]["mount"] == {"type": "string"}
+    assert mock_iter_refs.call_count == 2
+    assert memo.ref_index(schema).refs == ["./defs.json#/definitions/Mount"]
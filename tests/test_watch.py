@@ -0,0 +1,105 @@
+import json
+from unittest.mock import MagicMock, patch
+from validate_devschema.batch import schema_fingerprint
+from validate_devschema.cache import ResultCache
+from validate_devschema.stream import validate_stream
+from validate_devschema.validate_schema import CompiledSchema
+from validate_devschema.watch import changed_files, file_state, watch_files
+
+SCHEMA = {"properties": {"name": {"type": "string"}}}
+
+
+def test_changed_files_detects_modification_and_deletion(tmp_path):
+    path = tmp_path / "devcontainer.json"
+    path.write_text("{}")
+    states = {str(path): file_state(str(path))}
+
+    assert changed_files(states) == []
+
+    path.write_text('{"name": "dev"}')
+    assert changed_files(states) == [str(path)]
+    assert changed_files(states) == []
+
+    path.unlink()
+    assert changed_files(states) == [str(path)]
+    assert states[str(path)] is None
+
+
+@patch("validate_devschema.watch.click.secho")
+def test_watch_files_revalidates_only_changed_files(mock_secho, tmp_path):
+    changed = tmp_path / "changed.json"
+    untouched = tmp_path / "untouched.json"
+    changed.write_text('{"name": "dev"}')
+    untouched.write_text('{"name": "dev"}')
+    compiled = CompiledSchema(SCHEMA)
+
+    def edit(interval):
+        if edit.calls == 0:
+            changed.write_text(json.dumps({"name": 1}))
+        edit.calls += 1
+
+    edit.calls = 0
+    with patch("validate_devschema.watch.time.sleep", side_effect=edit):
+        with patch(
+            "validate_devschema.watch.validate_files",
+            MagicMock(return_value=[str(changed)]),
+        ) as mock_validate_files:
+            watch_files(
+                compiled,
+                [str(changed), str(untouched)],
+                "schema.json",
+                rounds=3,
+            )
+
+    mock_validate_files.assert_called_once_with(
+        compiled,
+        [str(changed)],
+        "schema.json",
+        False,
+        results=None,
+        stream=False,
+    )
+    messages = [call.args[0] for call in mock_secho.call_args_list]
+    assert any(message.startswith(f"❌ {changed}") for message in messages)
+
+
+@patch("validate_devschema.watch.click.secho")
+def test_watch_files_streams_through_result_cache(mock_secho, tmp_path):
+    path = tmp_path / "devcontainer.json"
+    path.write_text('{"name": "dev"}')
+    compiled = CompiledSchema(SCHEMA)
+    results = ResultCache(
+        str(tmp_path / "cache"), schema_fingerprint(compiled)
+    )
+
+    def edit(interval):
+        path.write_text(json.dumps({"name": "dev", "edits": edit.calls}))
+        edit.calls += 1
+
+    edit.calls = 0
+    with patch("validate_devschema.watch.time.sleep", side_effect=edit):
+        with patch(
+            "validate_devschema.batch.validate_stream",
+            wraps=validate_stream,
+        ) as mock_validate_stream:
+            watch_files(
+                compiled,
+                [str(path)],
+                "schema.json",
+                rounds=3,
+                results=results,
+                stream=True,
+            )
+
+    assert mock_validate_stream.call_count == 3
+    assert results.stats()["misses"] == 3
+
+
+@patch("validate_devschema.watch.click.secho")
+def test_watch_files_stops_on_keyboard_interrupt(mock_secho, tmp_path):
+    with patch(
+        "validate_devschema.watch.time.sleep", side_effect=KeyboardInterrupt
+    ):
+        watch_files(CompiledSchema(SCHEMA), [], "schema.json")
+
+    mock_secho.assert_called_with("INFO: Stopped watching.", fg="blue")